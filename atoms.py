@@ -0,0 +1,559 @@
+from bisect import bisect_right
+from collections.abc import Mapping
+
+EQUALS = "="
+NEQUALS = "!="
+COMPARISONS = (NEQUALS, EQUALS)
+NEGATION = "not "
+
+
+def is_negated(name):
+    return name.startswith(NEGATION)
+
+
+def positive(name):
+    '''
+
+    Return a predicate name (or atom string) without its negation prefix,
+    and the sign (1 or -1) of the literals it denotes.
+
+    '''
+
+    if is_negated(name):
+        return name[len(NEGATION):].strip(), -1
+    return name, 1
+
+
+class AtomTable:
+    '''
+
+    Intern ground atoms as flat integer tuples (predicate id, constant id,
+    constant id, ...) and assign each distinct atom a DIMACS variable.
+
+    Predicate and constant names are interned once, so grounding never
+    needs to build or hash an atom string. Strings are only rendered
+    (and parsed back) at the boundary with code that works on readable
+    atoms, like HornSolver.show_model() or HornSolver.add_assertion().
+
+    Atoms of a predicate whose argument sorts are known can be given a
+    contiguous block of variables (see AtomTable.reserve()), in which case
+    their variables are computed arithmetically instead of being stored.
+
+    '''
+
+    def __init__(self):
+
+        self.predicates = []
+        self.predicate_ids = {}
+        self.arities = {}
+        self.constants = []
+        self.constant_ids = {}
+        self.sort_positions = {}
+        self.keys = {}
+        self.variables = {}
+        self.blocks = []
+        self.block_bases = []
+        self.predicate_blocks = {}
+        self.top = 0
+
+    def __len__(self):
+        return self.top
+
+    def predicate(self, name):
+        '''
+
+        Return the integer id of the predicate called 'name', interning
+        it if it has not been seen before.
+
+        '''
+
+        if name not in self.predicate_ids:
+            self.predicate_ids[name] = len(self.predicates)
+            self.predicates.append(name)
+        return self.predicate_ids[name]
+
+    def constant(self, name):
+        '''
+
+        Return the integer id of the constant called 'name', interning
+        it if it has not been seen before.
+
+        '''
+
+        if name not in self.constant_ids:
+            self.constant_ids[name] = len(self.constants)
+            self.constants.append(name)
+        return self.constant_ids[name]
+
+    def sort(self, sort, members):
+        '''
+
+        Intern all members of a sort, in order, and return their ids as a
+        tuple. The position of each (distinct) constant within the sort is
+        recorded in self.sort_positions[sort].
+
+        '''
+
+        ids = tuple(self.constant(m) for m in members)
+        positions = {}
+        for c in ids:
+            positions.setdefault(c, len(positions))
+        self.sort_positions[sort] = positions
+        return ids
+
+    def learn_predicate(self, name, arity):
+        '''
+
+        Record that 'name' is a predicate taking 'arity' arguments, so
+        that strings using it can be split into predicate and arguments.
+
+        '''
+
+        self.predicate(name)
+        self.arities.setdefault(name, set()).add(arity)
+
+    def key(self, terms):
+        '''
+
+        Return the integer key of the ground atom whose (already evaluated)
+        parts are 'terms', e.g. ["p", "a", "b"] or ["a", "!=", "b"].
+
+        '''
+
+        if len(terms) == 3 and terms[1] in COMPARISONS:
+            left, comparison, right = terms
+            return (self.predicate(comparison),
+                    self.constant(left),
+                    self.constant(right))
+
+        constant = self.constant
+        return (self.predicate(terms[0]), *[constant(t) for t in terms[1:]])
+
+    def find(self, key):
+        '''
+
+        Return the DIMACS variable of the atom with the given key, or 0 if
+        the atom has not been assigned one.
+
+        '''
+
+        if key[0] in self.predicate_blocks:
+            for block in self.predicate_blocks[key[0]]:
+                variable = block.find(key)
+                if variable:
+                    return variable
+
+        return self.variables.get(key, 0)
+
+    def add(self, key):
+        '''
+
+        Assign the next free DIMACS variable to the atom with the given key
+        and return it.
+
+        '''
+
+        self.top += 1
+        self.keys[self.top] = key
+        self.variables[key] = self.top
+        return self.top
+
+    def literal(self, terms):
+        '''
+
+        Return the DIMACS variable of the atom whose parts are 'terms',
+        assigning a new variable if necessary.
+
+        If the predicate is negated (e.g. "not p"), return the negative
+        literal of the positive atom instead.
+
+        '''
+
+        predicate, sign = positive(terms[0])
+
+        if sign < 0:
+            return -self.literal([predicate, *terms[1:]])
+
+        key = self.key(terms)
+        variable = self.find(key)
+        if not variable:
+            variable = self.add(key)
+        return variable
+
+    def truncate(self, top):
+        '''
+
+        Forget the atoms numbered after 'top', none of which can be in a
+        block of variables.
+
+        '''
+
+        assert all(b.base + b.size <= top + 1 for b in self.blocks)
+
+        for variable in range(top + 1, self.top + 1):
+            del self.variables[self.keys.pop(variable)]
+
+        self.top = top
+
+    def reserve(self, predicate, sorts):
+        '''
+
+        Reserve a contiguous block of variables for all atoms of the
+        predicate called 'predicate' whose arguments range over 'sorts',
+        a list of sort names whose members must have been interned with
+        AtomTable.sort().
+
+        Return the new Block, or None if the predicate has no arguments,
+        some sort is empty, or some atom in the block already has a
+        variable (in which case the atoms keep their current variables).
+
+        '''
+
+        positions = [self.sort_positions.get(s, {}) for s in sorts]
+
+        if not positions or not all(positions):
+            return None
+
+        predicate_id = self.predicate(predicate)
+        block = Block(predicate_id, positions, self.top + 1)
+
+        for other in self.predicate_blocks.get(predicate_id, []):
+            if block.overlaps(other):
+                return None
+
+        for key in self.variables:
+            if key[0] == predicate_id and block.find(key):
+                return None
+
+        self.top += block.size
+        self.blocks.append(block)
+        self.block_bases.append(block.base)
+        self.predicate_blocks.setdefault(predicate_id, []).append(block)
+
+        return block
+
+    def cover(self, predicate, members):
+        '''
+
+        Find a block of variables of the predicate with id 'predicate' that
+        holds every atom whose argument number k is in members[k] (a list
+        of constant ids), and return a pair (block, offsets), where
+        offsets[k] lists the contribution of each of those constants to
+        the atom's variable (see Block.offsets()), or None if there is no
+        such block.
+
+        '''
+
+        for block in self.predicate_blocks.get(predicate, []):
+
+            if len(block.positions) != len(members):
+                continue
+
+            offsets = [block.offsets(k, m) for k, m in enumerate(members)]
+
+            if None not in offsets:
+                return block, offsets
+
+        return None
+
+    def key_of(self, variable):
+        '''
+
+        Return the key of the atom encoded by a DIMACS variable.
+
+        '''
+
+        if variable in self.keys:
+            return self.keys[variable]
+
+        block = self.blocks[bisect_right(self.block_bases, variable) - 1]
+        return block.key(variable)
+
+    def names(self, variable):
+        '''
+
+        Return the atom encoded by a DIMACS variable as a tuple of names
+        (predicate name first, followed by argument names).
+
+        '''
+
+        predicate, *arguments = self.key_of(variable)
+        return (self.predicates[predicate],
+                *[self.constants[a] for a in arguments])
+
+    def render(self, variable):
+        '''
+
+        Return the human-readable string form of the atom encoded by a
+        DIMACS variable (e.g. "p a b" or "a != b").
+
+        '''
+
+        predicate, *arguments = self.names(variable)
+
+        if predicate in COMPARISONS and len(arguments) == 2:
+            return f"{arguments[0]} {predicate} {arguments[1]}"
+
+        return " ".join([predicate] + arguments)
+
+    def parse(self, string, create=False):
+        '''
+
+        Return the key of the atom written as 'string' (in the same format
+        produced by AtomTable.render()), or None if some name in it is
+        unknown and 'create' is False.
+
+        Since names can contain whitespace, the predicate is taken to be
+        the longest known predicate name prefixing the string, and its
+        arguments are split into known constant names, preferring splits
+        matching an arity the predicate has been used with.
+
+        '''
+
+        parts = self.split(string)
+
+        if create:
+            return self.key(parts)
+
+        if len(parts) == 3 and parts[1] in COMPARISONS:
+            predicate, arguments = parts[1], [parts[0], parts[2]]
+        else:
+            predicate, arguments = parts[0], parts[1:]
+
+        if predicate not in self.predicate_ids:
+            return None
+
+        if any(a not in self.constant_ids for a in arguments):
+            return None
+
+        return self.key(parts)
+
+    def split(self, string):
+        '''
+
+        Split an atom string into its parts, in the format used by
+        Relation.parts (e.g. ["p", "a", "b"] or ["a", "!=", "b"]).
+
+        '''
+
+        string = string.strip()
+
+        for comparison in COMPARISONS:
+            separator = f" {comparison} "
+            if separator in string:
+                left, right = string.split(separator, 1)
+                return [left.strip(), comparison, right.strip()]
+
+        tokens = string.split()
+
+        for i in range(len(tokens), 0, -1):
+            name = " ".join(tokens[:i])
+            if name in self.predicate_ids:
+                arities = self.arities.get(name, set())
+                arguments = self.split_arguments(tokens[i:], arities)
+                if arguments is not None:
+                    return [name] + arguments
+
+        for i in range(1, len(tokens)):
+            arguments = self.split_arguments(tokens[i:], set())
+            if arguments is not None:
+                return [" ".join(tokens[:i])] + arguments
+
+        return tokens
+
+    def split_arguments(self, tokens, arities):
+        '''
+
+        Split a list of tokens into constant names. Return None if there
+        is no way to split them into known constants and the number of
+        tokens is not a known arity.
+
+        '''
+
+        if len(tokens) in arities:
+            if all(t in self.constant_ids for t in tokens):
+                return list(tokens)
+
+        splits = list(self.known_splits(tuple(tokens)))
+
+        for s in splits:
+            if len(s) in arities:
+                return s
+
+        if splits:
+            return splits[0]
+
+        if len(tokens) in arities:
+            return list(tokens)
+
+        return None
+
+    def known_splits(self, tokens):
+
+        if not tokens:
+            yield []
+            return
+
+        for i in range(len(tokens), 0, -1):
+            name = " ".join(tokens[:i])
+            if name in self.constant_ids:
+                for rest in self.known_splits(tokens[i:]):
+                    yield [name] + rest
+
+
+class Block:
+    '''
+
+    A contiguous range of DIMACS variables holding every atom of a single
+    predicate whose arguments range over a fixed tuple of sorts.
+
+    The atom p(c1, ..., cn), where each ci is the constant in position
+    ki of its sort, is numbered in mixed radix as
+
+        base + k1 * stride1 + ... + kn * striden
+
+    where the stride of an argument is the product of the sizes of the
+    sorts of the arguments to its right.
+
+    '''
+
+    def __init__(self, predicate, positions, base):
+
+        self.predicate = predicate
+        self.positions = positions
+        self.members = [sorted(p, key=p.get) for p in positions]
+        self.base = base
+        self.strides = []
+
+        stride = 1
+        for p in reversed(positions):
+            self.strides.insert(0, stride)
+            stride *= len(p)
+
+        self.size = stride
+
+    def find(self, key):
+        '''
+
+        Return the variable of the atom with the given key, or 0 if the atom
+        is not in this block.
+
+        '''
+
+        if len(key) != len(self.positions) + 1:
+            return 0
+
+        index = 0
+
+        for position, stride, c in zip(self.positions, self.strides, key[1:]):
+            k = position.get(c)
+            if k is None:
+                return 0
+            index += k * stride
+
+        return self.base + index
+
+    def key(self, variable):
+        '''
+
+        Return the key of the atom numbered 'variable' in this block.
+
+        '''
+
+        index = variable - self.base
+        arguments = []
+
+        for members, stride in zip(self.members, self.strides):
+            k, index = divmod(index, stride)
+            arguments.append(members[k])
+
+        return (self.predicate, *arguments)
+
+    def offsets(self, argument, members):
+        '''
+
+        Return a list with the contribution k * stride of each constant id
+        in 'members' when it is given as argument number 'argument' (from
+        zero), or None if some constant is not in the argument's sort.
+
+        '''
+
+        position = self.positions[argument]
+        stride = self.strides[argument]
+
+        if any(c not in position for c in members):
+            return None
+
+        return [position[c] * stride for c in members]
+
+    def overlaps(self, other):
+        '''
+
+        Check if some atom belongs both to this block and to 'other'.
+
+        '''
+
+        if len(self.positions) != len(other.positions):
+            return False
+
+        return all(p.keys() & q.keys()
+                   for p, q in zip(self.positions, other.positions))
+
+
+class LiteralMap(Mapping):
+    '''
+
+    Read-only view of an AtomTable mapping atom strings to DIMACS variables.
+
+    Negated atom strings (e.g. "not p a") are mapped to the negative
+    literal of their positive atom, but only positive atoms are listed.
+
+    '''
+
+    def __init__(self, atoms):
+        self.atoms = atoms
+
+    def __getitem__(self, string):
+        atom, sign = positive(string)
+        key = self.atoms.parse(atom)
+        variable = self.atoms.find(key) if key is not None else 0
+        if not variable:
+            raise KeyError(string)
+        return sign * variable
+
+    def __contains__(self, string):
+        key = self.atoms.parse(positive(string)[0])
+        return key is not None and self.atoms.find(key) > 0
+
+    def __iter__(self):
+        for variable in range(1, len(self.atoms) + 1):
+            yield self.atoms.render(variable)
+
+    def __len__(self):
+        return len(self.atoms)
+
+
+class ReverseLiteralMap(Mapping):
+    '''
+
+    Read-only view of an AtomTable mapping DIMACS variables to atom strings,
+    which are rendered on demand.
+
+    '''
+
+    def __init__(self, atoms):
+        self.atoms = atoms
+
+    def __getitem__(self, variable):
+        if variable not in self:
+            raise KeyError(variable)
+        return self.atoms.render(variable)
+
+    def __contains__(self, variable):
+        return isinstance(variable, int) and 0 < variable <= len(self.atoms)
+
+    def __iter__(self):
+        return iter(range(1, len(self.atoms) + 1))
+
+    def __len__(self):
+        return len(self.atoms)
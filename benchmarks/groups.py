@@ -0,0 +1,54 @@
+'''
+
+Compare the time taken to unfold the trees spec and the typed boulders
+spec rule by rule and grouping rules by sort signature (see
+HornSolver.unfold_groups()), with compiled kernels and with the generic
+grounding path.
+
+Usage: python -m artale.benchmarks.groups [nodes] [grid side]
+
+'''
+
+import sys
+import time
+
+from artale.benchmarks.ingest import boulders_solver, trees_solver
+from artale.models import group_rules
+
+
+def measure(make_solver, compiled, grouped):
+    solver = make_solver()
+    solver.options.compiled_grounding = compiled
+    solver.options.grouped_grounding = grouped
+    solver.options.retain_clauses = False
+    start = time.perf_counter()
+    solver.unfold_instance()
+    solver.flush_clauses()
+    elapsed = time.perf_counter() - start
+    return solver.solver.nof_clauses(), elapsed
+
+
+def main(nodes=20, side=30):
+
+    cases = [
+        (f"trees ({nodes} nodes)", lambda: trees_solver(nodes)),
+        (f"boulders ({side}x{side} tiles)", lambda: boulders_solver(side)),
+    ]
+
+    for name, make_solver in cases:
+
+        groups = group_rules(make_solver().rules)
+        shared = sum(len(g) for g in groups.values() if len(g) > 1)
+        print(f"{name}: {shared} rules in {len(groups)} signatures share loops")
+
+        for compiled in [True, False]:
+            for grouped in [False, True]:
+                clauses, elapsed = measure(make_solver, compiled, grouped)
+                mode = "compiled" if compiled else "generic"
+                unfolding = "grouped" if grouped else "per rule"
+                print(f"  {mode:<9} {unfolding:<9}: "
+                      f"{clauses} clauses in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
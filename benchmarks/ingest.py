@@ -0,0 +1,103 @@
+'''
+
+Measure the rate at which ground clauses are added to the SAT solver
+when unfolding the trees spec and a typed version of the boulders spec,
+adding clauses one at a time (batch size 1) and in batches.
+
+Usage: python -m artale.benchmarks.ingest [nodes] [grid side]
+
+'''
+
+import sys
+import time
+
+from artale.models import HornSolver
+from artale.parser import read_into
+from artale.specs import trees
+
+# The boulders spec in specs.py relies on sort declarations, which
+# read_into() ignores, so its rules are restated with typed variables
+
+boulders = '''
+at (c : character, t : tile), go (c, d : direction), free (t.d) => at (c.next, t.d)
+
+at (c : character, t : tile), go (c, d : direction), blocked (t.d) => bonk (c.next)
+
+wall (t : tile) => blocked (t)
+
+boulder (t : tile) => blocked (t)
+
+blocked (t : tile), free (t) => False
+
+wall (t : tile) => wall (t.next)
+
+at (c : character, t : tile), boulder (t.d), go (c, d : direction), free (t.d.d) => kicked (t.d, d)
+
+exit (t : tile), t != s => not exit (s : tile)
+
+free (t : tile), not acted on (t) => free (t.next)
+
+boulder (t : tile), not acted on (t) => boulder (t.next)
+
+go (c : character, d : direction), go (c, e : direction), d != e => False
+
+kicked (t : tile, d : direction), kicked (t, e : direction), d != e => False
+'''
+
+DIRECTIONS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+
+
+def trees_solver(nodes):
+    solver = HornSolver()
+    read_into(trees, solver)
+    solver.fill_sort("node", nodes)
+    return solver
+
+
+def boulders_solver(side):
+    solver = HornSolver()
+    read_into(boulders, solver)
+    solver.fill_sort("character", 4)
+    solver.fill_sort("tile", side * side)
+    solver.sorts["direction"] = list(DIRECTIONS)
+    for k in range(side * side):
+        x, y = k % side, k // side
+        tile = f"tile{k + 1}"
+        solver.assign("next", tile, tile)
+        for d, (dx, dy) in DIRECTIONS.items():
+            neighbour = ((y + dy) % side) * side + (x + dx) % side
+            solver.assign(d, tile, f"tile{neighbour + 1}")
+    for c in range(4):
+        solver.assign("next", f"character{c + 1}", f"character{c + 1}")
+    return solver
+
+
+def measure(make_solver, batch_size):
+    solver = make_solver()
+    solver.options.batch_size = batch_size
+    solver.options.retain_clauses = False
+    start = time.perf_counter()
+    solver.unfold_instance()
+    solver.flush_clauses()
+    elapsed = time.perf_counter() - start
+    clauses = solver.solver.nof_clauses()
+    return clauses, elapsed
+
+
+def main(nodes=30, side=40):
+
+    cases = [
+        (f"trees ({nodes} nodes)", lambda: trees_solver(nodes)),
+        (f"boulders ({side}x{side} tiles)", lambda: boulders_solver(side)),
+    ]
+
+    for name, make_solver in cases:
+        for batch_size in [1, HornSolver().options.batch_size]:
+            clauses, elapsed = measure(make_solver, batch_size)
+            rate = clauses / elapsed
+            print(f"{name:<26} batch {batch_size:>5}: "
+                  f"{clauses} clauses in {elapsed:.2f}s ({rate:,.0f} clauses/s)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,255 @@
+from itertools import product
+
+from artale import joins, kernels, models
+from artale.atoms import COMPARISONS, is_negated
+
+DOT = "."
+
+
+def is_comparison(parts):
+    return len(parts) == 3 and parts[1] in COMPARISONS
+
+
+def has_definite_body(rule):
+    '''
+
+    Check if a rule's body only has positive relations and comparisons,
+    and the rule has no 'any' variables.
+
+    '''
+
+    if models.IS_DISJUNCTION in rule.flags:
+        return False
+
+    if any(models.is_any(v) for v in rule.variables):
+        return False
+
+    for relation in rule.body:
+        parts = [p.strip() for p in relation.parts]
+        if not is_comparison(parts) and is_negated(parts[0]):
+            return False
+
+    return True
+
+
+def is_definite(rule):
+    '''
+
+    Check if a rule is a definite Horn rule: its heads are positive
+    relations (not comparisons) and its body is definite (see
+    has_definite_body()).
+
+    '''
+
+    if not rule.heads or not has_definite_body(rule):
+        return False
+
+    for relation in rule.heads:
+        parts = [p.strip() for p in relation.parts]
+        if is_comparison(parts) or is_negated(parts[0]):
+            return False
+
+    return True
+
+
+def is_constraint(rule):
+    return not rule.heads and has_definite_body(rule)
+
+
+def is_horn(rules):
+    '''
+
+    Check if every rule in a list is either definite or a constraint
+    with a definite body, so that a program made of them (and positive
+    and negative assertions) has a model if and only if the least model
+    of its definite rules and facts violates no constraint.
+
+    '''
+
+    return all(is_definite(r) or is_constraint(r) for r in rules)
+
+
+def is_indexed(rule):
+    '''
+
+    Check if every positive relation in the body of a rule can be
+    matched against known atoms by joins.join_assignments(), so that
+    joining with the atoms derived in the last round finds every
+    assignment that can derive something new.
+
+    '''
+
+    for relation in rule.body:
+        parts = [p.strip() for p in relation.parts]
+        if is_comparison(parts):
+            continue
+        if any(DOT in p for p in parts) or parts[0] in rule.variables:
+            return False
+
+    return True
+
+
+class LeastModel:
+    '''
+
+    The least model of the definite rules in a list (see is_definite())
+    and a set of atoms (given by their keys in solver.atoms), as a set of
+    DIMACS variables, computed bottom-up by semi-naive evaluation: every
+    round joins the rules' bodies with the atoms derived in the previous
+    round (see joins.join_assignments()), and the heads of the clauses
+    whose body atoms all hold are derived.
+
+    Rules are ground with flat kernels (see kernels.py), so derived
+    atoms use the same variables (and function and comparison semantics)
+    as the clauses of HornSolver.unfold_rule(). Every atom in the least
+    model holds in every model of a program including these rules and
+    atoms.
+
+    Constraints (see is_constraint()) are kept to check if the model
+    violates them (see LeastModel.violates()).
+
+    '''
+
+    def __init__(self, solver, rules):
+
+        self.solver = solver
+        self.rules = [r for r in rules if is_definite(r)]
+        self.constraints = [r for r in rules if is_constraint(r)]
+        self.kernels = {}
+        self.variables = set()
+        self.keys = set()
+        self.index = joins.FactIndex(())
+        self.rounds = 0
+
+    def kernel(self, rule):
+
+        if id(rule) not in self.kernels:
+            self.kernels[id(rule)] = kernels.compile_rule(rule, self.solver, flat=True)
+
+        return self.kernels[id(rule)]
+
+    def assignments(self, rule, delta=None):
+        '''
+
+        Return the assignments of a rule that may make its body true, only
+        those matching an atom in 'delta' (a FactIndex) if it is given and
+        the rule is indexed (see is_indexed()).
+
+        '''
+
+        closed = set(self.solver.atoms.predicate_ids.values())
+
+        if delta is not None and not is_indexed(rule):
+            delta = None
+
+        assignments = joins.join_assignments(rule, self.solver, closed, self.index, delta)
+
+        if assignments is None and delta is None:
+            domains = self.kernel(rule).domains
+            assignments = (
+                tuple(x for pair in a for x in pair)
+                for a in product(*[list(enumerate(d)) for d in domains])
+            )
+
+        return assignments or ()
+
+    def holds(self, literal):
+        return (literal > 0) == (abs(literal) in self.variables)
+
+    def add(self, keys):
+
+        for key in keys:
+            if key not in self.keys:
+                self.keys.add(key)
+                self.index.add(key)
+                self.variables.add(self.solver.atoms.find(key))
+
+    def extend(self, keys):
+        '''
+
+        Add a set of atoms (by their keys) to the model and derive their
+        consequences, returning the set of variables that became true.
+
+        '''
+
+        atoms = self.solver.atoms
+        before = set(self.variables)
+        delta = [k for k in keys if k not in self.keys]
+
+        if self.rounds == 0:
+            self.add(delta)
+            delta_index = None
+
+        elif delta:
+            self.add(delta)
+            delta_index = joins.FactIndex(delta)
+
+        else:
+            return set()
+
+        while True:
+
+            derived = set()
+            self.rounds += 1
+
+            for rule in self.rules:
+
+                kernel = self.kernel(rule)
+                assignments = self.assignments(rule, delta_index)
+
+                for clauses in kernel.clauses(assignments):
+                    for clause in clauses:
+                        head = clause[0]
+                        if head in self.variables or head in derived:
+                            continue
+                        if not any(self.holds(l) for l in clause[1:]):
+                            derived.add(head)
+
+            if not derived:
+                break
+
+            delta = [atoms.key_of(v) for v in derived]
+            self.add(delta)
+            delta_index = joins.FactIndex(delta)
+
+        return self.variables - before
+
+    def copy(self):
+
+        other = LeastModel(self.solver, [])
+        other.rules = self.rules
+        other.constraints = self.constraints
+        other.kernels = self.kernels
+        other.rounds = self.rounds
+        other.variables = set(self.variables)
+        other.keys = set(self.keys)
+        other.index = self.index.copy()
+
+        return other
+
+    def violates(self, denied=(), new=None):
+        '''
+
+        Check if the model makes some atom in 'denied' (a set of keys)
+        true, or falsifies a clause of some constraint.
+
+        If 'new' is a list of keys, the model is known to satisfy the
+        constraints without them, and only the clauses of assignments
+        matching them are checked (since constraints have definite
+        bodies, adding atoms can only falsify those).
+
+        '''
+
+        if any(key in self.keys for key in denied):
+            return True
+
+        delta = None if new is None else joins.FactIndex(new)
+
+        for rule in self.constraints:
+            assignments = self.assignments(rule, delta)
+            for clauses in self.kernel(rule).clauses(assignments):
+                for clause in clauses:
+                    if not any(self.holds(l) for l in clause):
+                        return True
+
+        return False
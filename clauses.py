@@ -0,0 +1,175 @@
+from array import array
+
+
+class ClauseArena:
+    '''
+
+    A compact store for DIMACS clauses: the literals of every clause are
+    kept one after another in a single int32 buffer, and the position
+    where each clause starts in an offsets buffer (with one more entry,
+    marking the end of the last clause).
+
+    Clauses are read back as array("i") slices of the literal buffer, so
+    they support len(), iteration and .tolist() like the per-clause
+    arrays stored before.
+
+    '''
+
+    def __init__(self, clauses=()):
+
+        self.literals = array("i")
+        self.offsets = array("q", [0])
+
+        self.extend(clauses)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+
+        literals = self.literals
+        offsets = self.offsets
+
+        for k in range(len(offsets) - 1):
+            yield literals[offsets[k]:offsets[k + 1]]
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return ClauseArena(self.clause(k) for k in range(len(self))[index])
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        return self.clause(index)
+
+    def clause(self, k):
+        return self.literals[self.offsets[k]:self.offsets[k + 1]]
+
+    def append(self, clause):
+
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def extend(self, clauses):
+
+        for c in clauses:
+            self.append(c)
+
+    def extend_flat(self, literals, lengths):
+        '''
+
+        Append clauses given as a flat sequence of literals and the length
+        of each clause.
+
+        '''
+
+        end = len(self.literals)
+        self.literals.extend(literals)
+
+        for n in lengths:
+            end += n
+            self.offsets.append(end)
+
+    def extend_matrix(self, matrix):
+        '''
+
+        Append every row of a NumPy integer matrix as a clause.
+
+        '''
+
+        rows, width = matrix.shape
+
+        if not rows:
+            return
+
+        self.literals.frombytes(matrix.astype("int32").tobytes())
+        end = self.offsets[-1]
+        self.offsets.extend(range(end + width, end + width * rows + 1, width))
+
+    def tolist(self):
+        return [c.tolist() for c in self]
+
+    @property
+    def nbytes(self):
+        '''
+
+        The size in bytes of the literal and offset buffers.
+
+        '''
+
+        return (len(self.literals) * self.literals.itemsize
+                + len(self.offsets) * self.offsets.itemsize)
+
+
+class DimacsWriter:
+    '''
+
+    A clause sink writing clauses to a DIMACS CNF file as they arrive,
+    in chunks of 'buffer_size' clauses, so that an instance can be ground
+    without keeping its clauses in memory (see HornSolver.sinks).
+
+    The file starts with a fixed-width placeholder header, which is
+    overwritten with the final number of variables and clauses when the
+    writer is closed. The number of variables is the largest variable
+    in a clause, unless a larger one is given to close().
+
+    '''
+
+    HEADER_WIDTH = 48
+
+    def __init__(self, path, buffer_size=2**16):
+
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.variables = 0
+        self.clauses = 0
+        self.file = open(path, "w")
+        self.file.write(self.header(0, 0))
+
+    def header(self, variables, clauses):
+        return f"p cnf {variables} {clauses}".ljust(self.HEADER_WIDTH - 1) + "\n"
+
+    def add_clause(self, clause):
+
+        self.buffer.append(" ".join(map(str, clause)) + " 0\n")
+        self.variables = max(self.variables, max(map(abs, clause), default=0))
+        self.clauses += 1
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def add_matrix(self, matrix):
+        '''
+
+        Write every row of a NumPy integer matrix as a clause.
+
+        '''
+
+        for row in matrix.tolist():
+            self.add_clause(row)
+
+    def flush(self):
+        self.file.write("".join(self.buffer))
+        self.buffer = []
+
+    def close(self, variables=0):
+
+        if self.file.closed:
+            return
+
+        self.flush()
+        self.variables = max(self.variables, variables)
+        self.file.seek(0)
+        self.file.write(self.header(self.variables, self.clauses))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
@@ -0,0 +1,166 @@
+from math import prod
+
+from artale import models
+
+DOT = "."
+PREFIX = "#split"  # In the namespace of models.RESERVED
+
+
+def relation_variables(relation, variables):
+    '''
+
+    Return the set of variables of a rule (given as a set) used in a
+    relation, as arguments, predicates, or in function terms (e.g. both
+    t and d in "free (t.d)").
+
+    '''
+
+    symbols = {s.strip() for p in relation.parts for s in p.split(DOT)}
+    return symbols & variables
+
+
+def assignments(variables, sort_of, sizes):
+    return prod(sizes.get(sort_of[v], 0) for v in variables)
+
+
+def decompose(rule, sizes, name):
+    '''
+
+    Split a rule into a chain of rules over fewer variables by variable
+    elimination, if that reduces the number of assignments to ground, and
+    return the list of rules replacing it (just [rule] if none does).
+
+    A variable x not in the rule's heads is eliminated by moving the body
+    relations using it into a rule deriving an auxiliary atom over their
+    other variables y, which replaces them in the body:
+
+        p (x, y), q (y, z) => r (z)
+
+    becomes
+
+        p (x, y) => split (y)
+        split (y), q (y, z) => r (z)
+
+    Setting split (y) whenever some x makes the moved relations true
+    extends every model of the rule to a model of the new rules, and
+    resolving on split (y) recovers the rule, so both have the same
+    models over the original atoms.
+
+    Variables are eliminated greedily, picking the one giving the fewest
+    assignments in total, while that is less than the assignments of the
+    rule being split. 'sizes' maps sorts to their number of members, and
+    auxiliary predicates are named "{name} 1", "{name} 2", ...
+
+    Disjunctions and rules with 'any' variables are left as they are.
+
+    '''
+
+    if models.IS_DISJUNCTION in rule.flags:
+        return [rule]
+
+    if any(models.is_any(v) for v in rule.variables):
+        return [rule]
+
+    sort_of = dict(zip(rule.variables, rule.sorts))
+    all_variables = set(rule.variables)
+
+    head_variables = set()
+    for h in rule.heads:
+        head_variables |= relation_variables(h, all_variables)
+
+    body = list(rule.body)
+    uses = [relation_variables(r, all_variables) for r in body]
+    variables = set(rule.variables)
+    parts = []
+
+    while True:
+
+        current = assignments(variables, sort_of, sizes)
+        best = None
+
+        for x in variables - head_variables:
+
+            moved = [k for k, u in enumerate(uses) if x in u]
+            moved_variables = set().union(*[uses[k] for k in moved])
+            kept = moved_variables - {x}
+
+            rest = set(head_variables) | kept
+            for k, u in enumerate(uses):
+                if k not in moved:
+                    rest |= u
+
+            if not kept or len(moved) == len(body):
+                continue
+
+            cost = (assignments(moved_variables, sort_of, sizes)
+                    + assignments(rest, sort_of, sizes))
+
+            if best is None or cost < best[0]:
+                best = (cost, x, moved, moved_variables, kept, rest)
+
+        if best is None or best[0] >= current:
+            break
+
+        _, x, moved, moved_variables, kept, rest = best
+
+        ordered = lambda names: [v for v in rule.variables if v in names]
+        predicate = f"{name} {len(parts) + 1}"
+        head = models.Relation([predicate, *ordered(kept)])
+
+        part = models.Rule(
+            [head],
+            [body[k] for k in moved],
+            [sort_of[v] for v in ordered(moved_variables)],
+            ordered(moved_variables),
+            rule.solver, {}, set()
+        )
+
+        parts.append(part)
+
+        body = [r for k, r in enumerate(body) if k not in moved] + [head]
+        uses = [u for k, u in enumerate(uses) if k not in moved] + [kept]
+        variables = rest
+
+    if not parts:
+        return [rule]
+
+    remaining = models.Rule(
+        list(rule.heads),
+        body,
+        [sort_of[v] for v in rule.variables if v in variables],
+        [v for v in rule.variables if v in variables],
+        rule.solver, {}, set(rule.flags)
+    )
+
+    return parts + [remaining]
+
+
+def decompose_rules(rules, sizes, first=1):
+    '''
+
+    Decompose every rule in a list (see decompose()), and return the
+    list of rules to unfold along with a report: a list of tuples (rule,
+    parts, before, after) for each rule that was split, with the number
+    of assignments to ground before and after splitting it.
+
+    The auxiliary predicates of the k-th rule split are named after
+    PREFIX and first + k - 1 (e.g. "#split1 1", "#split1 2", ...), which
+    programs cannot use (see parser.normalize()).
+
+    '''
+
+    unfolded = []
+    report = []
+
+    for rule in rules:
+
+        parts = decompose(rule, sizes, f"{PREFIX}{first + len(report)}")
+        unfolded += parts
+
+        if len(parts) > 1:
+            sort_of = lambda r: dict(zip(r.variables, r.sorts))
+            before = assignments(rule.variables, sort_of(rule), sizes)
+            after = sum(assignments(p.variables, sort_of(p), sizes) for p in parts)
+            report.append((rule, parts, before, after))
+
+    return unfolded, report
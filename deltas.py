@@ -0,0 +1,70 @@
+from itertools import product
+
+
+def delta_ranges(sizes, old_sizes):
+    '''
+
+    Return a list of tuples of ranges, one range of domain positions per
+    variable, whose products cover every assignment in which some
+    variable takes one of the members added to its domain (those in
+    positions old_sizes[k] to sizes[k]) exactly once.
+
+    The k-th tuple assigns a new member to variable k, an old member to
+    every variable before it, and any member to every variable after it.
+
+    '''
+
+    cover = []
+
+    for k, (size, old) in enumerate(zip(sizes, old_sizes)):
+
+        if old >= size:
+            continue
+
+        ranges = [range(min(o, s)) for s, o in zip(sizes[:k], old_sizes[:k])]
+        ranges.append(range(old, size))
+        ranges += [range(s) for s in sizes[k + 1:]]
+
+        cover.append(tuple(ranges))
+
+    return cover
+
+
+def delta_indices(sizes, old_sizes):
+    '''
+
+    Yield the tuples of domain positions of every assignment involving
+    some new member (see delta_ranges()).
+
+    '''
+
+    for ranges in delta_ranges(sizes, old_sizes):
+        yield from product(*ranges)
+
+
+def delta_assignments(domains, old_sizes):
+    '''
+
+    Yield the assignments involving some new member of the domains of
+    the loop variables of a rule (lists of constant ids), in the form
+    taken by flat kernels: tuples (i0, x0, i1, x1, ...) holding the
+    index and constant id of each variable in its domain (see
+    kernels.Kernel).
+
+    '''
+
+    sizes = [len(d) for d in domains]
+
+    for indices in delta_indices(sizes, old_sizes):
+        yield tuple(v for k, i in enumerate(indices) for v in (i, domains[k][i]))
+
+
+def is_delta(assignment, old_sizes):
+    '''
+
+    Check if a flat assignment (i0, x0, i1, x1, ...) gives some variable
+    a member past the old size of its domain.
+
+    '''
+
+    return any(i >= old for i, old in zip(assignment[::2], old_sizes))
@@ -0,0 +1,185 @@
+UNDEFINED = -1
+
+
+class ValueMap(dict):
+    '''
+
+    A dictionary mapping pairs (f, x) to the value of x.f, which counts
+    the changes made to it in self.version so that tables compiled from
+    it can tell when they are out of date.
+
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+class FunctionTables:
+    '''
+
+    The functions in a ValueMap compiled into integer tables over the
+    constant ids of an AtomTable: tables[f][x] is the id of the constant
+    x.f, or UNDEFINED. Compositions (e.g. t.direction.direction) get
+    tables of their own, built once on demand, so applying any chain of
+    functions to a constant is a single list index.
+
+    '''
+
+    def __init__(self, atoms, value_map):
+
+        self.atoms = atoms
+        self.version = value_map.version
+        self.tables = {}
+        self.composed = {}
+
+        constant = atoms.constant
+        pairs = [
+            (constant(f), constant(x), constant(v))
+            for (f, x), v in value_map.items()
+        ]
+
+        self.size = len(atoms.constants)
+
+        for f, x, v in pairs:
+            if f not in self.tables:
+                self.tables[f] = [UNDEFINED] * self.size
+            self.tables[f][x] = v
+
+    def is_current(self, value_map):
+        '''
+
+        Check if the tables were compiled from the current contents of a
+        ValueMap. Constants interned afterwards are not in the tables, and
+        every function is undefined on them.
+
+        '''
+
+        return self.version == value_map.version
+
+    def table(self, functions):
+        '''
+
+        Return the table of the composition of a sequence of function ids
+        (applied left to right, as in x.f.g).
+
+        '''
+
+        functions = tuple(functions)
+
+        if functions not in self.composed:
+
+            if len(functions) == 1:
+                table = self.tables.get(functions[0], [UNDEFINED] * self.size)
+
+            else:
+                inner = self.table(functions[:-1])
+                outer = self.table(functions[-1:])
+                table = [UNDEFINED if c == UNDEFINED else outer[c] for c in inner]
+
+            self.composed[functions] = table
+
+        return self.composed[functions]
+
+    def apply(self, names, x):
+        '''
+
+        Return the name of the constant obtained by applying the functions
+        called 'names' (in order) to the constant called 'x', raising a
+        KeyError if some function is undefined on its argument.
+
+        '''
+
+        atoms = self.atoms
+        functions = [atoms.constant_ids.get(f, UNDEFINED) for f in names]
+        c = atoms.constant_ids.get(x, UNDEFINED)
+
+        if UNDEFINED not in functions and 0 <= c < self.size:
+            value = self.table(functions)[c]
+            if value != UNDEFINED:
+                return atoms.constants[value]
+
+        raise KeyError((names[0], x))
+
+    def values(self, functions, members):
+        '''
+
+        Return the list of ids of the constants obtained by applying a
+        sequence of function ids to each constant id in 'members', or None
+        if the composition is undefined on some of them.
+
+        '''
+
+        table = self.table(functions)
+        values = [table[c] if c < self.size else UNDEFINED for c in members]
+
+        if UNDEFINED in values:
+            return None
+
+        return values
+
+
+def term_values(term, position, domain_ids, tables):
+    '''
+
+    Return a pair (k, values) for a term made of a variable, whose
+    position among the variables of a rule is k, followed by zero or more
+    applications of constant functions (e.g. "t" or "t.left.left"), where
+    values lists the constant id of the term for each member of the
+    variable's domain (given by domain_ids[k]).
+
+    Return None if the term has some other shape or a function in it is
+    undefined on some member of the domain.
+
+    '''
+
+    root, *functions = [p.strip() for p in term.split(".")]
+
+    if root not in position or any(f in position for f in functions):
+        return None
+
+    k = position[root]
+
+    if not functions:
+        return k, domain_ids[k]
+
+    ids = [tables.atoms.constant_ids.get(f, UNDEFINED) for f in functions]
+
+    if UNDEFINED in ids:
+        return None
+
+    values = tables.values(ids, domain_ids[k])
+
+    if values is None:
+        return None
+
+    return k, values
@@ -275,35 +275,35 @@ class TreeViewer:
         self.nodes_map = {}
         self.tree = []
         
-        self.right_facts = right_facts + left_facts
+        # Find a few models that together include every satisfiable
+        # target fact, so that browsing them needs no calls to the solver
+        target_facts = right_facts + left_facts
+        coverage = solver.coverage(target_facts)
+        self.models, self.witnesses, unsatisfiable = coverage
+        self.right_facts = [f for f in target_facts if f in self.witnesses]
+
+        print(f"{len(self.models)} models cover {len(self.right_facts)} facts")
+
+        for fact in unsatisfiable:
+            print(f"No model includes {fact}")
 
         self.tree_nodes, self.tree_relations = [], {}
         
         self.update_tree_view([])
-        
-        self.verify = False
-        self.at_least_one = False
-        self.tried_all = False
 
     def on_key_press(self, symbol, modifiers):
-    
-        if not self.verify:
-            self.verify = solver.solver.solve()
-        
-        if not self.verify:
-            print("This problem instance is not consistent!")
+
+        if not self.right_facts:
+            print("There are no models including the target facts")
+            return
             
         adjust = lambda x: x % len(self.right_facts)
 
         if symbol == pyglet.window.key.RIGHT:
-            index_shift = 1
-            new_index = self.index + index_shift
-            self.index = adjust(new_index)
+            self.index = adjust(self.index + 1)
                 
         if symbol == pyglet.window.key.LEFT:
-            index_shift = -1
-            new_index = self.index + index_shift
-            self.index = adjust(new_index)
+            self.index = adjust(self.index - 1)
 
         for k in list(self.nodes_map.keys()):
             self.nodes_map[k].destroy()
@@ -311,37 +311,14 @@ class TreeViewer:
         print("Current model index: ", self.index)
         
         current_fact = self.right_facts[self.index]
-        is_sat, model = solver.model_with([current_fact])
-
-        while not is_sat:
-
-            new_index = self.index + index_shift
-            
-            if new_index >= len(self.right_facts):
-                self.tried_all = True
-                
-            self.index = adjust(new_index)
-
-            print(f"Skipping to index {self.index}...")
-
-            current_fact = self.right_facts[self.index]
-            is_sat, model = solver.model_with([current_fact])
-            self.at_least_one = self.at_least_one or is_sat
+        model = self.models[self.witnesses[current_fact]]
 
-            if not self.at_least_one and self.tried_all:
-                print("This instance is satisfiable, but there are no models including the target facts")
-                break
+        model_as_set = solver.get_relations(model, ["left", "right"])
 
-        if is_sat:
-
-            model = solver.solver.get_model()
-
-            model_as_set = solver.get_relations(model, ["left", "right"])
-
-            self.tree_nodes, self.tree_relations = read_relations(model_as_set)
-            self.nodes_map = {}
+        self.tree_nodes, self.tree_relations = read_relations(model_as_set)
+        self.nodes_map = {}
 
-            self.update_tree_view(model)
+        self.update_tree_view(model)
 
     def update_tree_view(self, model):
     
@@ -397,8 +397,17 @@ class TreeViewer:
         self.nodes_map = {}
         self.tree = []
 
-        self.right_literals = [solver.literal_map[fact] for fact in right_facts]
-        self.model_length = len(self.right_literals)
+        # Find a few models that together include every satisfiable
+        # right fact, so that browsing them needs no calls to the solver
+        coverage = solver.coverage(right_facts)
+        self.models, self.witnesses, unsatisfiable = coverage
+        self.right_facts = [f for f in right_facts if f in self.witnesses]
+        self.model_length = len(self.right_facts)
+
+        print(f"{len(self.models)} models cover {self.model_length} facts")
+
+        for fact in unsatisfiable:
+            print(f"No model includes {fact}")
 
         self.tree_nodes, self.tree_relations = [], {}
         
@@ -406,15 +415,15 @@ class TreeViewer:
 
     def on_key_press(self, symbol, modifiers):
 
-        satisfiability_check = False
+        if not self.right_facts:
+            print("The specification in this program is unsatisfiable!")
+            return
 
         if symbol == pyglet.window.key.RIGHT:
-            index_shift = 1
             self.index += 1
             self.index = self.index % self.model_length
                 
         if symbol == pyglet.window.key.LEFT:
-            index_shift = -1
             self.index -= 1
             self.index = self.index % self.model_length
 
@@ -423,38 +432,15 @@ class TreeViewer:
 
         print("Current model index: ", self.index)
 
-        fact_literal = self.right_literals[self.index]
-        satisfiability_check = solver.solver.solve([fact_literal])
-        found_a_model = False
-
-        while not satisfiability_check:
-
-            absolute_index = self.index + index_shift
-
-            self.index = (self.index + index_shift) % self.model_length
-            fact_literal = self.right_literals[self.index]
-
-            print(f"Skipping to index {self.index}...")
+        fact = self.right_facts[self.index]
+        model = self.models[self.witnesses[fact]]
 
-            satisfiability_check = solver.solver.solve([fact_literal])
-            found_a_model = found_a_model or satisfiability_check
+        model_as_set = solver.get_relations(model, ["left", "right"])
 
-            looped_all_the_way = absolute_index >= self.model_length
-
-            if not found_a_model and looped_all_the_way:
-                print("The specification in this program is unsatisfiable!")
-                break
-
-        if satisfiability_check:
-
-            model = solver.solver.get_model()
-
-            model_as_set = solver.get_relations(model, ["left", "right"])
-
-            self.tree_nodes, self.tree_relations = read_relations(model_as_set)
-            self.nodes_map = {}
+        self.tree_nodes, self.tree_relations = read_relations(model_as_set)
+        self.nodes_map = {}
 
-            self.update_tree_view(model)
+        self.update_tree_view(model)
 
     def update_tree_view(self, model):
     
@@ -0,0 +1,248 @@
+from collections import defaultdict
+from itertools import product
+
+from artale import models
+from artale.atoms import COMPARISONS, is_negated
+
+DOT = "."
+
+
+def open_predicates(rules, sorts):
+    '''
+
+    Return the set of names of predicates that can hold without being
+    asserted: heads of rules, disjuncts of disjunctions, and every member
+    of the sort of a predicate variable used in either position (negated
+    heads and disjuncts excluded).
+
+    '''
+
+    names = set()
+
+    for rule in rules:
+
+        relations = list(rule.heads)
+
+        if models.IS_DISJUNCTION in rule.flags:
+            relations += rule.body
+
+        sort_of = dict(zip(rule.variables, rule.sorts))
+
+        for relation in relations:
+
+            parts = [p.strip() for p in relation.parts]
+
+            if len(parts) == 3 and parts[1] in COMPARISONS:
+                continue
+
+            if is_negated(parts[0]):
+                continue
+
+            if parts[0] in sort_of:
+                names |= set(sorts[sort_of[parts[0]]])
+            else:
+                names.add(parts[0])
+
+    return names
+
+
+class FactIndex:
+    '''
+
+    The asserted atoms of a program, indexed by predicate, arity and the
+    values of any subset of their argument positions.
+
+    '''
+
+    def __init__(self, facts):
+
+        self.arguments = defaultdict(list)
+        self.indices = {}
+
+        for key in facts:
+            self.arguments[key[0], len(key) - 1].append(key[1:])
+
+    def copy(self):
+
+        other = FactIndex(())
+
+        for signature, arguments in self.arguments.items():
+            other.arguments[signature] = list(arguments)
+
+        for index_key, index in self.indices.items():
+            other.indices[index_key] = defaultdict(
+                list, {k: list(v) for k, v in index.items()}
+            )
+
+        return other
+
+    def add(self, key):
+
+        arguments = key[1:]
+        self.arguments[key[0], len(arguments)].append(arguments)
+
+        for (predicate, arity, positions), index in self.indices.items():
+            if (predicate, arity) == (key[0], len(arguments)):
+                index[tuple(arguments[j] for j in positions)].append(arguments)
+
+    def count(self, predicate, arity):
+        return len(self.arguments[predicate, arity])
+
+    def matches(self, predicate, arity, fixed):
+        '''
+
+        Return the argument tuples of all asserted atoms of a predicate
+        with the given values at some positions (a tuple of pairs
+        (position, constant id)).
+
+        '''
+
+        positions = tuple(j for j, _ in fixed)
+        index_key = (predicate, arity, positions)
+
+        if index_key not in self.indices:
+            index = defaultdict(list)
+            for arguments in self.arguments[predicate, arity]:
+                index[tuple(arguments[j] for j in positions)].append(arguments)
+            self.indices[index_key] = index
+
+        return self.indices[index_key].get(tuple(c for _, c in fixed), [])
+
+
+def join_assignments(rule, solver, closed, index, delta=None):
+    '''
+
+    Return a generator of the assignments of a rule that can make every
+    atom over a closed predicate (one in 'closed', a set of predicate
+    ids) in its body true, as tuples (i0, x0, i1, x1, ...) holding the
+    index and constant id of each loop variable in its domain (see
+    kernels.Kernel), or None if the rule's body has no relation over a
+    closed predicate whose arguments are variables or constants.
+
+    Every other assignment yields clauses with a negative literal on an
+    atom that is never a head, a disjunct, or asserted, which are
+    trivially satisfied when such atoms are false.
+
+    If 'delta' is a FactIndex of new atoms (also in 'index'), only the
+    assignments where some of those relations matches one of them are
+    yielded (some of them more than once), as in semi-naive evaluation.
+
+    '''
+
+    atoms = solver.atoms
+    loop_variables = [v for v in rule.variables if not models.is_any(v)]
+    loop_sorts = [s for v, s in zip(rule.variables, rule.sorts)
+                  if not models.is_any(v)]
+    position = {v: k for k, v in enumerate(loop_variables)}
+
+    domains = [[atoms.constant(c) for c in solver.sorts[s]] for s in loop_sorts]
+    domain_index = []
+
+    for d in domains:
+        indices = {}
+        for i, c in enumerate(d):
+            indices.setdefault(c, i)
+        domain_index.append(indices)
+
+    generators = []
+
+    for relation in rule.body:
+
+        parts = [p.strip() for p in relation.parts]
+
+        if len(parts) == 3 and parts[1] in COMPARISONS:
+            continue
+
+        if any(DOT in p for p in parts):
+            continue
+
+        predicate, *arguments = parts
+
+        if is_negated(predicate):
+            continue
+
+        if predicate in position or predicate not in atoms.predicate_ids:
+            continue
+
+        if atoms.predicate_ids[predicate] not in closed:
+            continue
+
+        if any(models.is_any(a) for a in arguments):
+            continue
+
+        pattern = []
+
+        for a in arguments:
+            if a in position:
+                pattern.append((True, position[a]))
+            else:
+                pattern.append((False, atoms.constant(a)))
+
+        generators.append((atoms.predicate_ids[predicate], pattern))
+
+    if not generators:
+        return None
+
+    generators.sort(key=lambda g: index.count(g[0], len(g[1])))
+
+    def extend(generators, indices, g, bound):
+
+        if g == len(generators):
+
+            free = [k for k in range(len(domains)) if k not in bound]
+
+            for values in product(*[domains[k] for k in free]):
+
+                assignment = dict(bound)
+                assignment.update(zip(free, values))
+
+                flat = []
+                for k in range(len(domains)):
+                    c = assignment[k]
+                    flat.append(domain_index[k][c])
+                    flat.append(c)
+
+                yield tuple(flat)
+
+            return
+
+        predicate, pattern = generators[g]
+        fixed = []
+
+        for j, (is_variable, x) in enumerate(pattern):
+            if not is_variable:
+                fixed.append((j, x))
+            elif x in bound:
+                fixed.append((j, bound[x]))
+
+        for arguments in indices[g].matches(predicate, len(pattern), tuple(fixed)):
+
+            extended = dict(bound)
+            consistent = True
+
+            for (is_variable, x), c in zip(pattern, arguments):
+
+                if not is_variable:
+                    continue
+
+                if x in extended:
+                    consistent = extended[x] == c
+                else:
+                    consistent = c in domain_index[x]
+                    extended[x] = c
+
+                if not consistent:
+                    break
+
+            if consistent:
+                yield from extend(generators, indices, g + 1, extended)
+
+    if delta is None:
+        return extend(generators, [index] * len(generators), 0, {})
+
+    def semi_naive():
+        for g, first in enumerate(generators):
+            rest = generators[:g] + generators[g + 1:]
+            yield from extend([first] + rest, [delta] + [index] * len(rest), 0, {})
+
+    return semi_naive()
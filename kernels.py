@@ -0,0 +1,670 @@
+from itertools import product
+
+from artale import models
+from artale.atoms import COMPARISONS, EQUALS, positive
+from artale.functions import term_values
+
+DOT = "."
+INDENT = "    "
+
+
+class Kernel:
+    '''
+
+    A grounding function specialized for a single rule.
+
+    The kernel's source is a set of nested loops (one per variable of the
+    rule, in the order of Rule.variables, 'any' variables excluded) over
+    the constant ids of the variables' domains. Argument positions,
+    constant ids, block offsets and function lookups are resolved when
+    the kernel is compiled, and each computation is placed in the
+    outermost loop where all the variables it depends on are bound, so
+    the innermost loop only builds integer clauses.
+
+    Calling Kernel.clauses() yields, for every assignment, the list of
+    DIMACS clauses produced by HornSolver.ground_clauses() on the same
+    assignment.
+
+    A flat kernel has a single loop over a given sequence of assignments
+    instead, each of them a tuple (i0, x0, i1, x1, ...) holding the index
+    and constant id of every loop variable in its domain.
+
+    '''
+
+    def __init__(self, rule, source, namespace, domains, flat=False):
+
+        self.rule = rule
+        self.source = source
+        self.namespace = namespace
+        self.domains = domains
+        self.flat = flat
+
+        exec(compile(source, f"<kernel: {rule.as_string()}>", "exec"), namespace)
+
+        self.function = namespace["kernel"]
+
+    def clauses(self, assignments=None, start=0, stop=None):
+        '''
+
+        Yield the clauses of every assignment (or, for a flat kernel, of
+        every assignment in 'assignments'). The outermost loop can be
+        restricted to the members of its domain in positions start to
+        stop, to ground a shard of the rule's assignments.
+
+        '''
+
+        if self.flat:
+            return self.function(assignments)
+
+        if not self.domains:
+            return self.function()
+
+        return self.function(*self.domains, start, stop)
+
+
+def compile_rule(rule, solver, flat=False):
+    '''
+
+    Compile a rule into a Kernel grounding it over the current members of
+    the sorts of its variables in solver.sorts (or, if 'flat' is True,
+    over a sequence of assignments of those members).
+
+    '''
+
+    return KernelWriter(rule, solver).write(flat)
+
+
+def reference_clauses(rule, solver):
+    '''
+
+    Return the set of clauses (as frozensets of literals) obtained by
+    grounding a rule through HornSolver.ground_assignment().
+
+    '''
+
+    domains = [solver.sorts[s] for s in rule.sorts]
+    clauses = set()
+
+    for assignment in product(*domains):
+        for c in solver.ground_assignment(rule, assignment):
+            clauses.add(frozenset(c))
+
+    return clauses
+
+
+def kernel_clauses(kernel):
+    '''
+
+    Return the set of clauses (as frozensets of literals) produced by a
+    kernel.
+
+    '''
+
+    return {frozenset(c) for clauses in kernel.clauses() for c in clauses}
+
+
+def check_kernel(rule, solver):
+    '''
+
+    Check if the kernel compiled for a rule produces the same set of
+    clauses as the string-based grounding path.
+
+    '''
+
+    kernel = compile_rule(rule, solver)
+    return kernel_clauses(kernel) == reference_clauses(rule, solver)
+
+
+def head_value(value):
+    '''
+
+    Map the value of a comparison in a head given by KernelWriter.compare()
+    to a head literal: None if it is true, 0 if it is false, and the
+    literal of its atom otherwise.
+
+    '''
+
+    if value is True:
+        return None
+
+    if value is False:
+        return 0
+
+    return value
+
+
+class KernelWriter:
+
+    def __init__(self, rule, solver):
+
+        self.rule = rule
+        self.solver = solver
+        self.atoms = solver.atoms
+
+        pairs = list(zip(rule.variables, rule.sorts))
+
+        self.loop_variables = [v for v, s in pairs if not models.is_any(v)]
+        self.loop_sorts = [s for v, s in pairs if not models.is_any(v)]
+        self.any_variables = [v for v, s in pairs if models.is_any(v)]
+        self.any_sorts = [s for v, s in pairs if models.is_any(v)]
+
+        self.depth = {v: i + 1 for i, v in enumerate(self.loop_variables)}
+        self.names = {}
+
+        for i, v in enumerate(self.loop_variables):
+            self.names[v] = f"x{i}"
+
+        for i, v in enumerate(self.any_variables):
+            self.names[v] = f"y{i}"
+
+        self.levels = [[] for _ in range(len(self.loop_variables) + 1)]
+        self.pending = []
+        self.namespace = {}
+        self.counter = 0
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value, prefix="C"):
+        '''
+
+        Store a value in the kernel's namespace and return its name.
+
+        '''
+
+        name = self.fresh(prefix)
+        self.namespace[name] = value
+        return name
+
+    def write(self, flat=False):
+
+        domain_ids = [
+            [self.atoms.constant(c) for c in self.solver.sorts[s]]
+            for s in self.loop_sorts
+        ]
+
+        for s in self.any_sorts:
+            for c in self.solver.sorts[s]:
+                self.atoms.constant(c)
+
+        self.domain_ids = domain_ids
+        self.tables = self.solver.function_tables()
+        self.namespace["find"] = self.atoms.find
+        self.namespace["add"] = self.atoms.add
+        self.namespace["values"] = self.function_values()
+        self.namespace["predicate_of"] = self.predicate_of
+        self.namespace["tautology"] = models.is_tautology
+        self.namespace["define"] = self.solver.define_any_literals
+        self.namespace["compare"] = self.compare
+        self.namespace["head"] = head_value
+        self.known = self.solver.sorted_constants()
+
+        self.is_disjunction = models.IS_DISJUNCTION in self.rule.flags
+        self.static_heads = False
+
+        heads = [self.relation(r, True) for r in self.rule.heads]
+        body = [self.relation(r) for r in self.rule.body]
+        body = [b for b in body if b is not None]
+
+        innermost = self.levels[-1]
+        body_list = ", ".join(body)
+        check = " and not tautology(c)" if self.rule.may_clash() else ""
+
+        if self.is_disjunction:
+            innermost.append(f"clause = list(dict.fromkeys([{body_list}]))")
+            innermost.append(f"yield [c for c in [clause] if c{check}]")
+
+        elif heads and self.static_heads:
+            innermost.append(f"negated = [-b for b in dict.fromkeys([{body_list}])]")
+            innermost.append(
+                "yield [c for c in "
+                "([h] + negated if h else negated "
+                f"for h in [{', '.join(heads)}] if h is not None) if c{check}]"
+            )
+
+        elif heads and check:
+            innermost.append(f"negated = [-b for b in dict.fromkeys([{body_list}])]")
+            innermost.append(
+                "yield [c for c in "
+                f"([h] + negated for h in [{', '.join(heads)}]) if c{check}]"
+            )
+
+        elif heads:
+            innermost.append(f"negated = [-b for b in dict.fromkeys([{body_list}])]")
+            innermost.append(f"yield [[h] + negated for h in [{', '.join(heads)}]]")
+
+        else:
+            innermost.append(f"negated = [-b for b in dict.fromkeys([{body_list}])]")
+            innermost.append(f"yield [c for c in [negated] if c{check}]")
+
+        if flat:
+            return self.write_flat()
+
+        parameters = [f"d{i}" for i in range(len(self.loop_variables))]
+
+        if parameters:
+            parameters += ["start", "stop"]
+
+        lines = [f"def kernel({', '.join(parameters)}):"]
+
+        for level, statements in enumerate(self.levels):
+
+            indent = INDENT * (level + 1)
+
+            for statement in statements:
+                lines.append(indent + statement)
+
+            if level < len(self.loop_variables):
+                x = self.names[self.loop_variables[level]]
+                if level == 0:
+                    domain = "enumerate(d0[start:stop], start)"
+                else:
+                    domain = f"enumerate(d{level})"
+                lines.append(f"{indent}for i{level}, {x} in {domain}:")
+
+        source = "\n".join(lines) + "\n"
+
+        return Kernel(self.rule, source, self.namespace, domain_ids)
+
+    def write_flat(self):
+
+        hoisted = self.levels[0]
+        inner = [s for statements in self.levels[1:] for s in statements]
+
+        if not self.loop_variables:
+            hoisted, inner = hoisted[:-2], hoisted[-2:]
+
+        targets = [f"i{k}, {self.names[v]}"
+                   for k, v in enumerate(self.loop_variables)]
+
+        lines = ["def kernel(assignments):"]
+        lines += [INDENT + s for s in hoisted]
+        lines.append(f"{INDENT}for {', '.join(targets) or '_'} in assignments:")
+        lines += [INDENT * 2 + s for s in inner]
+
+        source = "\n".join(lines) + "\n"
+
+        return Kernel(self.rule, source, self.namespace, self.domain_ids, True)
+
+    def function_values(self):
+        '''
+
+        Return a dictionary mapping pairs of constant ids (f, x) to the id
+        of the constant x.f, as given by solver.value_map.
+
+        '''
+
+        constant = self.atoms.constant
+        value_map = self.solver.value_map
+
+        return {
+            (constant(f), constant(x)): constant(v)
+            for (f, x), v in value_map.items()
+        }
+
+    def predicate_of(self, constant_id):
+        return self.atoms.predicate(self.atoms.constants[constant_id])
+
+    def term(self, symbol, level):
+        '''
+
+        Return an expression evaluating to the constant id of a term and the
+        loop depth at which it can be computed, emitting the statements
+        needed to evaluate its function applications.
+
+        '''
+
+        parts = [p.strip() for p in symbol.split(DOT)]
+        root, functions = parts[0], parts[1:]
+
+        if functions and not any(f in self.names for f in functions):
+            indexed = self.table_term(root, functions, level)
+            if indexed is not None:
+                return indexed
+
+        expressions = []
+        depth = 0
+
+        for p in parts:
+
+            if p in self.names:
+                expressions.append(self.names[p])
+                depth = max(depth, self.depth.get(p, level))
+
+            else:
+                expressions.append(self.constant(self.atoms.constant(p)))
+
+        value = expressions.pop(0)
+
+        for f in expressions:
+            name = self.fresh("t")
+            self.emit(depth, f"{name} = values[{f}, {value}]")
+            value = name
+
+        return value, depth
+
+    def table_term(self, root, functions, level):
+        '''
+
+        Evaluate a sequence of applications of constant functions to a
+        variable as a single index into their composed table (see
+        functions.FunctionTables), or to a constant at compile time.
+
+        Return None if the composition is undefined on some value the
+        root can take, in which case the term is evaluated step by step
+        (and fails like HornSolver.evaluate() does).
+
+        '''
+
+        ids = [self.atoms.constant(f) for f in functions]
+
+        if root not in self.names:
+            values = self.tables.values(ids, [self.atoms.constant(root)])
+            if values is None:
+                return None
+            return self.constant(values[0]), 0
+
+        if self.tables.values(ids, self.domain_of(root)) is None:
+            return None
+
+        table = self.constant(self.tables.table(ids), "F")
+        name = self.fresh("t")
+        depth = self.depth.get(root, level)
+        self.emit(depth, f"{name} = {table}[{self.names[root]}]")
+
+        return name, depth
+
+    def domain_of(self, variable):
+        '''
+
+        Return the constant ids of the domain of a loop or 'any' variable.
+
+        '''
+
+        if variable in self.depth:
+            return self.domain_ids[self.depth[variable] - 1]
+
+        sort = self.any_sorts[self.any_variables.index(variable)]
+        return [self.atoms.constant(c) for c in self.solver.sorts[sort]]
+
+    def emit(self, depth, statement):
+
+        if depth > len(self.loop_variables):
+            self.pending.append(statement)
+        else:
+            self.levels[depth].append(statement)
+
+    def relation(self, relation, is_head=False):
+        '''
+
+        Emit the statements computing the literal (or, for relations using
+        'any', the list of literals) of a relation and return an expression
+        to be spliced into the clause being built.
+
+        Comparisons are evaluated statically, as in
+        HornSolver.ground_clauses(): in the body, they emit a guard skipping
+        the assignments where the clause is trivially satisfied and return
+        None, and in the head they evaluate to None (true) or 0 (false).
+        Comparisons whose sides may not evaluate to constants in a sort
+        (see KernelWriter.is_sorted()) are evaluated by compare() instead,
+        which gives their atom's literal if they cannot be decided.
+
+        '''
+
+        parts = [p.strip() for p in relation.parts]
+        symbols = set(s.strip() for p in parts for s in p.split(DOT))
+        uses_any = any(s in self.any_variables for s in symbols)
+        is_comparison = len(parts) == 3 and parts[1] in COMPARISONS
+        is_static = is_comparison and all(self.is_sorted(p) for p in parts[::2])
+
+        if is_comparison and is_head:
+            self.static_heads = True
+
+        if not uses_any:
+
+            if is_static:
+                level = len(self.loop_variables) + 1
+                test, depth = self.comparison(parts, level)
+                if is_head:
+                    literal = self.fresh("l")
+                    self.emit(depth, f"{literal} = None if {test} else 0")
+                    return literal
+                self.guard(depth, test)
+                return None
+
+            if is_comparison:
+                level = len(self.loop_variables) + 1
+                value, depth = self.comparison_value(parts, level)
+                literal = self.fresh("l")
+                if is_head:
+                    self.emit(depth, f"{literal} = head({value})")
+                    return literal
+                self.emit(depth, f"{literal} = {value}")
+                self.skip(depth, f"{literal} is {self.is_disjunction}")
+                self.emit(depth, f"{literal} = () if {literal} is {not self.is_disjunction} else ({literal},)")
+                return f"*{literal}"
+
+            block_literal = self.block_literal(parts)
+            if block_literal is not None:
+                return block_literal
+            return self.key_literal(parts, len(self.loop_variables) + 1)
+
+        any_level = len(self.loop_variables) + 1
+        self.pending = []
+
+        if is_static:
+            test, _ = self.comparison(parts, any_level)
+            literal = f"None if {test} else 0" if is_head else test
+        elif is_comparison:
+            value, _ = self.comparison_value(parts, any_level)
+            literal = f"head({value})" if is_head else value
+        else:
+            literal = self.key_literal(parts, any_level)
+
+        expansion = self.fresh("e")
+
+        depth = max([self.depth[s] for s in symbols if s in self.depth] + [0])
+        statements = [f"{expansion} = []"]
+
+        loop_indent = ""
+        for i, (v, s) in enumerate(zip(self.any_variables, self.any_sorts)):
+            ids = [self.atoms.constant(c) for c in self.solver.sorts[s]]
+            domain = self.constant(ids, "A")
+            statements.append(f"{loop_indent}for {self.names[v]} in {domain}:")
+            loop_indent += INDENT
+
+        for statement in self.pending:
+            statements.append(loop_indent + statement)
+
+        statements.append(f"{loop_indent}{expansion}.append({literal})")
+
+        self.levels[depth].extend(statements)
+        self.pending = []
+
+        if is_static and not is_head:
+            quantifier = "any" if self.is_disjunction else "all"
+            self.guard(depth, f"{quantifier}({expansion})")
+            return None
+
+        if is_comparison and not is_head:
+            self.skip(depth, f"any(v is {self.is_disjunction} for v in {expansion})")
+            self.emit(depth, f"{expansion} = [v for v in {expansion} if v is not {not self.is_disjunction}]")
+
+        if self.solver.options.define_any and not is_head:
+            self.emit(depth, f"{expansion} = define({expansion}, {self.is_disjunction})")
+            return f"*{expansion}"
+
+        return f"*dict.fromkeys({expansion})"
+
+    def comparison(self, parts, level):
+        '''
+
+        Return a Python expression testing a comparison between the
+        constant ids of two terms, and the loop depth at which it can be
+        evaluated.
+
+        '''
+
+        left, comparison, right = parts
+        (left, left_depth), (right, right_depth) = [
+            self.term(left, level), self.term(right, level)
+        ]
+        operator = "==" if comparison == EQUALS else "!="
+
+        return f"{left} {operator} {right}", max(left_depth, right_depth)
+
+    def comparison_value(self, parts, level):
+        '''
+
+        Return a Python expression evaluating a comparison with compare(),
+        and the loop depth at which it can be evaluated.
+
+        '''
+
+        left, comparison, right = parts
+        (left, left_depth), (right, right_depth) = [
+            self.term(left, level), self.term(right, level)
+        ]
+        predicate = self.constant(self.atoms.predicate(comparison), "P")
+
+        return f"compare({predicate}, {left}, {right})", max(left_depth, right_depth)
+
+    def compare(self, predicate, left, right):
+        '''
+
+        Evaluate a comparison between the constant ids of two terms as
+        HornSolver.compare() does, returning True or False if both are in
+        some sort, or else the variable of the comparison's atom.
+
+        '''
+
+        if left in self.known and right in self.known:
+            equal = left == right
+            return equal if self.atoms.predicates[predicate] == EQUALS else not equal
+
+        key = (predicate, left, right)
+
+        return self.atoms.find(key) or self.atoms.add(key)
+
+    def is_sorted(self, symbol):
+        '''
+
+        Check if a term can only evaluate to constants in some sort: it is
+        a variable or a constant in a sort, possibly followed by
+        applications of constant functions whose values are all in sorts.
+
+        '''
+
+        parts = [p.strip() for p in symbol.split(DOT)]
+        root, functions = parts[0], parts[1:]
+
+        if root in self.names:
+            values = self.domain_of(root)
+        else:
+            values = [self.atoms.constant(root)]
+
+        if functions:
+            if any(f in self.names for f in functions):
+                return False
+            ids = [self.atoms.constant(f) for f in functions]
+            values = self.tables.values(ids, values)
+            if values is None:
+                return False
+
+        return all(v in self.known for v in values)
+
+    def guard(self, depth, test):
+        '''
+
+        Emit a statement skipping the assignments for which a test on the
+        comparisons in the body makes the rule trivially satisfied (i.e.
+        the test is false in a Horn rule or true in a disjunction).
+
+        '''
+
+        if self.is_disjunction:
+            self.skip(depth, test)
+        else:
+            self.skip(depth, f"not ({test})")
+
+    def skip(self, depth, condition):
+
+        skip = "continue" if depth > 0 else "return"
+        self.emit(depth, f"if {condition}: {skip}")
+
+    def key_literal(self, parts, level):
+
+        symbol, sign = positive(parts[0])
+        if symbol in self.names:
+            predicate = f"predicate_of({self.names[symbol]})"
+            predicate_depth = self.depth.get(symbol, level)
+        else:
+            predicate = self.constant(self.atoms.predicate(symbol), "P")
+            predicate_depth = 0
+        terms = [self.term(p, level) for p in parts[1:]]
+        terms.append(("", predicate_depth))
+
+        depth = max(d for _, d in terms) if terms else 0
+        arguments = [t for t, _ in terms if t]
+        key = self.fresh("k")
+        literal = self.fresh("l")
+
+        self.emit(depth, f"{key} = ({', '.join([predicate] + arguments)},)")
+        if sign < 0:
+            self.emit(depth, f"{literal} = -(find({key}) or add({key}))")
+        else:
+            self.emit(depth, f"{literal} = find({key}) or add({key})")
+
+        return literal
+
+    def block_literal(self, parts):
+        '''
+
+        If every argument of the relation is a loop variable, possibly
+        followed by applications of constant functions (e.g. 't.next'),
+        and some block of variables holds all the atoms it can denote,
+        emit the arithmetic computing its (possibly negated) variable and
+        return its name.
+
+        '''
+
+        predicate, *arguments = parts
+        predicate, sign = positive(predicate)
+
+        if predicate in self.names or not arguments:
+            return None
+
+        if predicate not in self.atoms.predicate_ids:
+            return None
+
+        position = {v: i for i, v in enumerate(self.loop_variables)}
+        values = [
+            term_values(a, position, self.domain_ids, self.tables)
+            for a in arguments
+        ]
+
+        if None in values:
+            return None
+
+        predicate_id = self.atoms.predicate_ids[predicate]
+        cover = self.atoms.cover(predicate_id, [v for _, v in values])
+
+        if cover is None:
+            return None
+
+        block, offsets = cover
+        terms = [self.constant(block.base, "B")]
+
+        for (k, _), o in zip(values, offsets):
+            terms.append(f"{self.constant(o, 'O')}[i{k}]")
+
+        depth = max(k + 1 for k, _ in values)
+        literal = self.fresh("l")
+
+        if sign < 0:
+            self.emit(depth, f"{literal} = -{' - '.join(terms)}")
+        else:
+            self.emit(depth, f"{literal} = {' + '.join(terms)}")
+
+        return literal
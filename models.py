@@ -1,54 +1,202 @@
 from collections import defaultdict
-from itertools import product
-from dataclasses import dataclass
+from itertools import islice, product
+from dataclasses import dataclass, field
 from copy import copy
 from json import dumps as as_json
-from array import array
 from functools import reduce, lru_cache, cache
 
 from pysat.solvers import Solver
 
+from artale.atoms import AtomTable, LiteralMap, ReverseLiteralMap
+from artale.atoms import COMPARISONS, EQUALS, positive
+from artale import chaining, decompose, deltas, joins, kernels, parallel, planner, relevance, vectorized
+from artale.clauses import ClauseArena
+from artale.functions import FunctionTables, ValueMap
+from artale.simplify import simplify
+
 TERM_SEPARATOR = "--"
 IS_DISJUNCTION = "vee"
 ANY = "any"
+AUXILIARY = "any of"
+RESERVED = "#"
+BLOCKING = "blocking"
+SELECTOR = "selected"
+
+SEQUENTIAL = "sequential"
+BUDGET = "budget"
+PARALLEL = "parallel"
+GROUPED = "grouped"
 
 CACHE_SIZE = 2**14
+BATCH_SIZE = 2**12
+GROUP_CHUNK = 2**10
 
 @cache
 def is_any(name):
     return "any" in name
 
 
+def is_tautology(clause):
+    literals = set(clause)
+    return any(-l in literals for l in literals)
+
+
+def definition_clause(key, variable):
+    '''
+
+    Return the clause defining an auxiliary atom for the literals in a
+    key of HornSolver.definitions (see HornSolver.define_any_literals()).
+
+    '''
+
+    is_disjunction, literals = key
+    literals = sorted(literals, key=abs)
+
+    if is_disjunction:
+        return [-variable] + literals
+
+    return [variable] + [-l for l in literals]
+
+
 def index():
     return defaultdict(lambda: [])
 
 
+def rule_key(rule):
+    return rule.as_string(), tuple(rule.sorts), tuple(sorted(rule.flags))
+
+
 class HornSolver:
 
-    def __init__(self):
+    def __init__(self, options=None):
 
+        self.options = options or GroundingOptions()
         self.sorts = index()
         self.rules = []
         self.literals = set()
         self.clauses = []
         self.value_map = {}
-        self.literal_map = {}
-        self.reverse_literal_map = {}
+        self.tables = None
+        self.sorted_ids = None
+        self.atoms = AtomTable()
+        self.literal_map = LiteralMap(self.atoms)
+        self.reverse_literal_map = ReverseLiteralMap(self.atoms)
+        self.learned_rules = set()
+        self.learned_sorts = {}
+        self.block_signatures = {}
+        self.definitions = {}
+        self.queries = None
+        self.prunings = []
+        self.decompositions = []
+        self.unfolded_rules = []
+        self.facts = set()
+        self.denials = set()
+        self.pending_clauses = []
         self.solver = Solver()
-        self.name_counter = 0
-        self.cnf_clauses = list()
+        self.cnf_clauses = ClauseArena()
+        self.sinks = []
+        self.simplification = None
+        self.unfolded_sizes = None
+        self.unfolded_values = None
+        self.una_sizes = None
+        self.any_clauses = []
+        self.running_budget = None
+        self.clause_count = 0
+        self.literal_count = 0
+        self.assertion_count = 0
+        self.least_model = None
+        self.horn_clauses = None
+        self.horn_consistent = None
+        self.blockings = 0
+        self.backbones = {}
+        self.backbone_version = None
+        self.selectors = {}
+        self.origins = {}
+        self.guard = None
         self.verbose = False
 
+    @property
+    def name_counter(self):
+        '''
+
+        The largest DIMACS variable assigned to an atom so far.
+
+        '''
+
+        return len(self.atoms)
+
+    @property
+    def solver(self):
+        '''
+
+        The pysat solver holding the problem instance. Clauses are added
+        to it in batches (see HornSolver.add_clause()), so any pending
+        batch is added before the solver is returned.
+
+        '''
+
+        self.flush_clauses()
+        return self._solver
+
+    @solver.setter
+    def solver(self, solver):
+        self.pending_clauses = []
+        self._solver = solver
+
+    def flush_clauses(self):
+        '''
+
+        Add the pending batch of clauses to the pysat solver at once.
+
+        '''
+
+        if self.pending_clauses:
+            self._solver.append_formula(self.pending_clauses)
+            self.pending_clauses = []
+
+    @property
+    def value_map(self):
+        '''
+
+        The dictionary mapping pairs (f, x) to the value of x.f (always a
+        ValueMap, so that function tables can be kept up to date).
+
+        '''
+
+        return self._value_map
+
+    @value_map.setter
+    def value_map(self, value_map):
+        if not isinstance(value_map, ValueMap):
+            value_map = ValueMap(value_map)
+        self._value_map = value_map
+
+    def function_tables(self):
+        '''
+
+        Return the functions in self.value_map compiled into integer tables
+        over the constant ids of self.atoms (see functions.FunctionTables),
+        compiling them again if self.value_map has changed.
+
+        '''
+
+        if self.tables is None or not self.tables.is_current(self.value_map):
+            self.tables = FunctionTables(self.atoms, self.value_map)
+
+        return self.tables
+
     def fill_sort(self, sort, n):
         '''
 
         Add n constants named '{sort} 1', '{sort} 2', '{sort} 3', ... ,
-        '{sort} n' to the sort provided as argument.
+        '{sort} n' to the sort provided as argument (skipping those
+        already in it, so that a sort can be grown to n constants).
         
         '''
         
         for i in range(n):
-            self.sorts[sort].append(f"{sort}{i + 1}")
+            if f"{sort}{i + 1}" not in self.sorts[sort]:
+                self.sorts[sort].append(f"{sort}{i + 1}")
 
     def add_element(self, sort, name):
         '''
@@ -70,16 +218,48 @@ class HornSolver:
     def reset_maps(self):
         '''
 
-        Assign empty dictionaries to self.literal_map, 
-        self.reverse_literal_map and self.value_map.
+        Assign an empty atom table to self.atoms (and thus empty maps
+        to self.literal_map and self.reverse_literal_map), and an
+        empty dictionary to self.value_map.
 
         '''
 
-        self.literal_map = {}
-        self.reverse_literal_map = {}
+        self.atoms = AtomTable()
+        self.literal_map = LiteralMap(self.atoms)
+        self.reverse_literal_map = ReverseLiteralMap(self.atoms)
+        self.learned_rules = set()
+        self.learned_sorts = {}
+        self.block_signatures = {}
+        self.definitions = {}
+        self.facts = set()
+        self.denials = set()
+        self.least_model = None
+        self.horn_clauses = None
+        self.horn_consistent = None
         self.value_map = {}
+        self.tables = None
+        self.sorted_ids = None
+
+    def sorted_constants(self):
+        '''
+
+        Return the set of ids of the constants in some sort, which are the
+        only ones comparisons are evaluated on while grounding (see
+        HornSolver.compare()), collecting them again if a sort has been
+        replaced or has grown.
+
+        '''
+
+        signature = tuple((s, id(m), len(m)) for s, m in self.sorts.items())
+
+        if self.sorted_ids is None or self.sorted_ids[0] != signature:
+            constant = self.atoms.constant
+            ids = {constant(c) for m in self.sorts.values() for c in m}
+            self.sorted_ids = (signature, ids)
 
-    def unfold_rule(self, rule, sort_restrictions={}):
+        return self.sorted_ids[1]
+
+    def unfold_rule(self, rule, sort_restrictions={}, old_sizes=None):
         '''
 
         Obtain a list of clauses encoding a propositional embedding of the
@@ -88,8 +268,59 @@ class HornSolver:
 
         As a side effect, new clauses are appended to self.cnf_clauses.
 
+        Unless self.options.compiled_grounding is False, the rule is
+        compiled into a grounding kernel (see kernels.py), which computes
+        the literals of relations with a block of variables arithmetically
+        (see atoms.Block). If self.options.check_kernels is True, the
+        kernel's clauses are checked against the string-based grounding path
+        first.
+
+        If self.options.vectorized_grounding is True and NumPy is installed,
+        rules without function terms whose relations all have blocks of
+        variables are ground at once as integer matrices (see vectorized.py)
+        and added to the solver in bulk.
+
+        If self.options.join_grounding is True, atoms over closed predicates
+        (see HornSolver.closed_predicates()) hold only if they are asserted,
+        so rules whose bodies mention them are only ground on assignments
+        joining asserted atoms (see joins.py), and the remaining atoms over
+        closed predicates are fixed to false. All assertions must be added
+        before unfolding in this mode.
+
+        If old_sizes is given (a dictionary mapping sorts to a number of
+        members), only the assignments where some variable is bound to a
+        member of its sort past that number are ground (see deltas.py).
+
+        While HornSolver.unfold_instance() enforces a budget, it is checked
+        every planner.BUDGET_CHECK assignments, and the rule is cut off if
+        the budget skips rules and is exceeded (see planner.Budget).
+
+        If self.options.rule_selectors is True, every clause of the rule is
+        guarded by the selector atom of the rule it comes from (see
+        HornSolver.selector()).
+
         '''
-        
+
+        if self.options.rule_selectors and self.guard is None:
+            self.guard = self.selector(rule)
+            try:
+                return self.unfold_rule(rule, sort_restrictions, old_sizes)
+            finally:
+                self.guard = None
+
+        self.reserve_blocks([rule])
+
+        if rule.is_trivial():
+            return
+
+        delta = None
+
+        if old_sizes is not None:
+            delta = [old_sizes.get(s, 0) for s in rule.sorts]
+            sizes = [len(self.sorts[s]) for s in rule.sorts]
+            if all(old >= size for old, size in zip(delta, sizes)):
+                return
+
         if sort_restrictions:
             old_sorts = {}
             for sort in sort_restrictions.keys():
@@ -108,27 +339,86 @@ class HornSolver:
             count = 0
             print("*" * chunks)
 
-        for assignment in product(*[self.sorts[s] for s in rule.sorts]):
+        matrices = None
+        assignments = None
+        first_new_atom = len(self.atoms)
+        first_new_clause = len(self.cnf_clauses)
 
-            clauses = rule.get_clauses(assignment)
+        if self.options.join_grounding and self.options.compiled_grounding:
+            closed = self.closed_predicates()
+            index = joins.FactIndex(self.facts)
+            assignments = joins.join_assignments(rule, self, closed, index)
 
-            pure_clauses = [self.evaluate_functions(c) for c in clauses]
+        if delta is not None:
+            loop_delta = [old for v, old in zip(rule.variables, delta)
+                          if not is_any(v)]
 
-            self.update_maps(pure_clauses)
+        if assignments is not None and delta is not None:
+            assignments = (
+                a for a in assignments if deltas.is_delta(a, loop_delta)
+            )
 
-            if IS_DISJUNCTION in rule.flags:
-                cnf_clauses = [
-                    self.disjunction_dimacs(c) for c in pure_clauses
-                ]
+        elif delta is not None and self.options.compiled_grounding:
+            domains = [
+                [self.atoms.constant(c) for c in self.sorts[s]]
+                for v, s in zip(rule.variables, rule.sorts) if not is_any(v)
+            ]
+            assignments = deltas.delta_assignments(domains, loop_delta)
 
-            else:
-                cnf_clauses = [self.dimacs(c) for c in pure_clauses]
+        if self.options.vectorized_grounding and assignments is None and delta is None:
+            matrices = vectorized.clause_matrices(rule, self)
+
+        if assignments is not None:
+
+            kernel = kernels.compile_rule(rule, self, flat=True)
+            groundings = kernel.clauses(assignments)
+
+        elif matrices is not None:
 
-            cnf_clauses = [c for c in cnf_clauses if len(c) > 0]
+            groundings = []
+
+            for matrix in matrices:
+                self.add_clause_matrix(matrix)
+                if self.running_budget is not None and not self.running_budget.check():
+                    break
+
+        elif self.options.compiled_grounding:
+
+            kernel = kernels.compile_rule(rule, self)
+
+            if self.options.check_kernels:
+                assert kernels.kernel_clauses(kernel) == \
+                    kernels.reference_clauses(rule, self)
+
+            groundings = kernel.clauses()
+
+        elif delta is not None:
+            domains = [self.sorts[s] for s in rule.sorts]
+            groundings = (
+                self.ground_assignment(rule, [d[i] for d, i in zip(domains, indices)])
+                for indices in deltas.delta_indices(sizes, delta)
+            )
+
+        else:
+            groundings = (
+                self.ground_assignment(rule, a)
+                for a in product(*[self.sorts[s] for s in rule.sorts])
+            )
+
+        budget = self.running_budget
+        ticks = 0
+
+        for cnf_clauses in groundings:
 
             for cnf_clause in cnf_clauses:
-                self.solver.add_clause(cnf_clause)
-                self.cnf_clauses.append(array("l", cnf_clause))
+                self.add_clause(cnf_clause)
+
+            if budget is not None:
+                ticks += 1
+                if ticks == planner.BUDGET_CHECK:
+                    ticks = 0
+                    if not budget.check():
+                        break
             
             if self.verbose:
                 #print("eval fun: ", self.evaluate_functions.cache_info())
@@ -140,11 +430,169 @@ class HornSolver:
                     chunks -= 1
                     print("*" * chunks)
                     
+        if self.options.join_grounding:
+            self.falsify_closed_atoms(first_new_atom)
+
+        self.record_clauses(rule, first_new_clause, len(self.cnf_clauses))
+
+        if budget is not None:
+            budget.check()
+
         if sort_restrictions:
             for sort in old_sorts.keys():
                 self.sorts[sort] = old_sorts[sort]
-            
-                
+
+    def reserve_blocks(self, rules):
+        '''
+
+        Reserve a contiguous block of DIMACS variables (see atoms.Block)
+        for each predicate signature used in the input rules with only
+        variables as arguments (e.g. 'at (c, t)' with c : character and
+        t : tile gets a block of |character| * |tile| variables).
+
+        Signatures whose atoms already have variables keep them.
+
+        '''
+
+        if not self.options.block_numbering:
+            return
+
+        self.learn()
+
+        closed = set()
+
+        if self.options.join_grounding:
+            closed = self.closed_predicates()
+
+        for rule in rules:
+            for signature in rule.signatures():
+                if signature not in self.block_signatures:
+                    predicate, sorts = signature
+                    if self.atoms.predicate(predicate) in closed:
+                        continue
+                    block = self.atoms.reserve(predicate, sorts)
+                    self.block_signatures[signature] = block
+
+    def closed_predicates(self):
+        '''
+
+        Return the set of ids of the predicates that are never the head of
+        a rule or a disjunct of a disjunction, whose atoms can only hold
+        when they are asserted.
+
+        '''
+
+        self.learn()
+
+        rules = self.rules + self.unfolded_rules
+        open_names = joins.open_predicates(rules, self.sorts)
+        open_names |= set(COMPARISONS)
+        open_names.add(AUXILIARY)
+        open_names.add(BLOCKING)
+        open_names.add(SELECTOR)
+
+        return {
+            i for name, i in self.atoms.predicate_ids.items()
+            if name not in open_names
+        }
+
+    def falsify_closed_atoms(self, first):
+        '''
+
+        Add a negative unit clause for every atom over a closed predicate
+        numbered after 'first' which has not been asserted.
+
+        '''
+
+        closed = self.closed_predicates()
+        guard, self.guard = self.guard, None
+
+        for variable in range(first + 1, len(self.atoms) + 1):
+            key = self.atoms.key_of(variable)
+            if key[0] in closed and key not in self.facts:
+                self.add_clause([-variable])
+
+        self.guard = guard
+
+    def add_clause(self, clause):
+        '''
+
+        Add a DIMACS clause to the CNF formula stored by the SAT solver
+        in self.solver, to self.cnf_clauses, and to every clause sink in
+        self.sinks (e.g. a clauses.DimacsWriter).
+
+        Setting self.options.feed_solver or self.options.retain_clauses to
+        False skips the solver or self.cnf_clauses respectively, so that
+        instances can be ground with bounded memory (show_clauses() and
+        serialize() only see retained clauses).
+
+        Clauses reach the solver in batches of self.options.batch_size
+        clauses, and the last batch is added as soon as self.solver is used.
+
+        While a rule is unfolded with self.options.rule_selectors set to
+        True, the negation of its selector atom (self.guard) is added to the
+        clause.
+
+        '''
+
+        if self.guard is not None:
+            clause = list(clause) + [-self.guard]
+
+        self.clause_count += 1
+        self.literal_count += len(clause)
+
+        if self.options.feed_solver:
+            self.feed(clause)
+
+        if self.options.retain_clauses:
+            self.cnf_clauses.append(clause)
+
+        for sink in self.sinks:
+            sink.add_clause(clause)
+
+    def feed(self, clause):
+
+        if self.simplification is not None:
+            clause = self.simplification.translate(clause)
+            if clause is None:
+                return
+
+        self.pending_clauses.append(clause)
+
+        if len(self.pending_clauses) >= self.options.batch_size:
+            self.flush_clauses()
+
+    def add_clause_matrix(self, matrix):
+        '''
+
+        Add every row of an integer matrix as a clause, as
+        HornSolver.add_clause() does.
+
+        '''
+
+        if self.guard is not None:
+            for row in matrix.tolist():
+                self.add_clause(row)
+            return
+
+        self.clause_count += len(matrix)
+        self.literal_count += matrix.size
+
+        if self.options.feed_solver and self.simplification is not None:
+            for row in matrix.tolist():
+                self.feed(row)
+
+        elif self.options.feed_solver:
+            self.flush_clauses()
+            for start in range(0, len(matrix), self.options.batch_size):
+                rows = matrix[start:start + self.options.batch_size]
+                self._solver.append_formula(rows.tolist())
+
+        if self.options.retain_clauses:
+            self.cnf_clauses.extend_matrix(matrix)
+
+        for sink in self.sinks:
+            sink.add_matrix(matrix)
 
     def unfold_instance(self):
         '''
@@ -153,11 +601,553 @@ class HornSolver:
         propositional CNF formula and add its clauses to the CNF
         used by self.solver.
 
+        If self.options.workers is greater than 1, rules are ground with
+        compiled kernels by that many worker processes (see parallel.py),
+        which produces the same clauses and atom numbering as unfolding them
+        one by one (rules using 'any' are unfolded in this process if
+        self.options.define_any is True).
+
+        If self.options.grouped_grounding is True, rules with the same sort
+        signature are unfolded together (see HornSolver.unfold_groups()).
+
+        Flags that cannot be honoured together are rejected rather than
+        ignored (see HornSolver.grounding_strategy()).
+
+        If self.options.decompose_rules is True, rules whose assignments can
+        be reduced by splitting them into rules over fewer variables are
+        split first (see decompose.py, and
+        HornSolver.decomposition_report()). This adds auxiliary atoms, and
+        changes the numbering of the others.
+
+        If self.options.prune_rules is True, rules that cannot affect the
+        atoms that matter are dropped or simplified before that (see
+        relevance.py, and HornSolver.pruning_report()): if self.queries is a
+        set of predicate names, rules only connected to other predicates
+        which can be satisfied on their own are dropped (their atoms are
+        left unconstrained), and in the join grounding mode, rules are
+        simplified assuming that predicates which are never the head of a
+        rule and have no asserted atoms are false.
+
+        If self.options.forward_chaining is True, the least model of the
+        definite rules and the asserted facts is computed first, and the
+        atoms in it are asserted (see HornSolver.chain()).
+
+        If self.options.presolve is True (which needs
+        self.options.retain_clauses), the clauses are simplified without
+        subsumption after unfolding them (see HornSolver.simplify()), so the
+        solver only gets the formula left after propagating the facts and
+        the atoms they force.
+
+        If self.options.budget is a planner.Budget, rules are unfolded one
+        by one (in any of the modes above but the parallel and grouped
+        ones), and each rule is checked against the budget before and while
+        unfolding it. When it is exceeded, planner.BudgetExceeded is raised
+        with a report of the estimated size of every rule (see
+        HornSolver.plan()), or, if the budget skips rules, the remaining
+        rules are skipped and listed in self.options.budget.skipped. If
+        self.verbose is True, the report is printed before unfolding.
+
+        If self.options.rule_selectors is True, the clauses of every rule are
+        guarded by a selector atom (see HornSolver.selector()), which is
+        assumed when calling the SAT solver unless the rule is disabled (see
+        HornSolver.solve_with()). Rules can then be retired or added
+        without unfolding the others again (see HornSolver.update_rules()).
+        This mode cannot be combined with parallel or grouped grounding, or
+        with forward chaining.
+
         '''
 
-        for rule in self.rules:
-            self.unfold_rule(rule)
+        rules, self.prunings, self.decompositions = self.prepare_rules()
+        self.trace_origins(self.prunings, self.decompositions)
+
+        if self.verbose and self.prunings:
+            print(self.pruning_report())
+
+        if self.verbose and self.decompositions:
+            print(self.decomposition_report())
+
+        self.unfolded_rules = rules
+        self.reserve_blocks(rules)
+
+        strategy = self.grounding_strategy()
+        first_clause = self.clause_count
+
+        if self.options.forward_chaining:
+            self.chain(rules)
+
+        if self.verbose:
+            print(planner.report([planner.estimate(r, self) for r in rules]))
+
+        if strategy == BUDGET:
+            self.unfold_within_budget(rules)
+
+        elif strategy == PARALLEL:
+            parallel.unfold(self, rules, self.options.workers)
+
+        elif strategy == GROUPED:
+            self.unfold_groups(rules)
+
+        else:
+            for rule in rules:
+                self.unfold_rule(rule)
+
+        self.unfolded_sizes = {s: len(m) for s, m in self.sorts.items()}
+        self.unfolded_values = dict(self.value_map)
+
+        horn = (
+            self.options.forward_chaining
+            and chaining.is_horn(rules)
+            and first_clause == self.assertion_count
+        )
+
+        if horn:
+            self.horn_clauses = self.clause_count
+
+        if self.options.presolve:
+            self.simplify(subsumption=False)
+
+    def grounding_strategy(self):
+        '''
+
+        Return how HornSolver.unfold_instance() unfolds rules, given
+        self.options (see GroundingOptions): against a budget (BUDGET), in
+        worker processes (PARALLEL), grouped by sort signature (GROUPED),
+        or one by one (SEQUENTIAL), checking that the options set can be
+        honoured together. This is the one place where options are checked
+        against each other.
+
+        At most one of a budget, parallel grounding and grouped grounding
+        can be used. Parallel and grouped grounding work rule by rule only
+        in the join, vectorized and rule selector modes, so they cannot be
+        combined with them, and parallel grounding needs compiled kernels
+        and the 'fork' start method. Forward chaining asserts the atoms it
+        derives, so it cannot be combined with rule selectors either, and
+        presolving simplifies the retained clauses, so it needs them.
+
+        '''
+
+        exclusive = [name for name, used in [
+            ("a budget", self.options.budget is not None),
+            ("parallel grounding", self.options.workers > 1),
+            ("grouped grounding", self.options.grouped_grounding),
+        ] if used]
+
+        modes = [name for name, used in [
+            ("join grounding", self.options.join_grounding),
+            ("vectorized grounding", self.options.vectorized_grounding),
+            ("rule selectors", self.options.rule_selectors),
+        ] if used]
+
+        assert len(exclusive) < 2, f"Cannot combine {' and '.join(exclusive)}"
+
+        if self.options.workers > 1 or self.options.grouped_grounding:
+            assert not modes, f"Cannot combine {exclusive[0]} and {modes[0]}"
+
+        if self.options.workers > 1:
+            assert self.options.compiled_grounding, "Parallel grounding needs compiled grounding"
+            assert parallel.available(), "Parallel grounding needs the 'fork' start method"
+
+        assert not (self.options.forward_chaining and self.options.rule_selectors), \
+            "Cannot combine forward chaining and rule selectors"
+
+        assert self.options.retain_clauses or not self.options.presolve, \
+            "Cannot presolve clauses that are not retained"
+
+        if self.options.budget is not None:
+            return BUDGET
+
+        if self.options.workers > 1:
+            return PARALLEL
+
+        if self.options.grouped_grounding:
+            return GROUPED
+
+        return SEQUENTIAL
+
+    def chain(self, rules):
+        '''
+
+        Compute the least model of the definite rules in a list and the
+        asserted facts bottom-up (see chaining.LeastModel), store it in
+        self.least_model, and add a unit clause for every atom in it but
+        the facts, since these atoms hold in every model.
+
+        If every rule is definite or a constraint (see chaining.is_horn())
+        and no clauses but assertions and the rules' clauses are added,
+        get_model() and model_with() are answered from the least model
+        (extended with the positive assumptions) without calling the SAT
+        solver, until any other clause is added.
+
+        '''
+
+        self.least_model = chaining.LeastModel(self, rules)
+        self.horn_consistent = None
+        derived = self.least_model.extend(self.facts)
+
+        for variable in sorted(derived):
+            if self.atoms.key_of(variable) not in self.facts:
+                self.add_clause([variable])
+
+    def horn_model(self, assumptions=()):
+        '''
+
+        Answer get_model() or model_with() from the least model of a Horn
+        program (see HornSolver.chain()): the least model including the
+        positive literals in 'assumptions' is a model if it falsifies the
+        negative ones, the assertions and the constraints, and otherwise
+        there is none.
+
+        '''
+
+        model = self.least_model
+
+        if self.horn_consistent is None:
+            self.horn_consistent = not model.violates(self.denials)
+
+        if not self.horn_consistent:
+            return (False, [])
+
+        added = [self.atoms.key_of(l) for l in assumptions
+                 if l > 0 and l not in model.variables]
+
+        if added:
+            base = model.keys
+            model = model.copy()
+            model.extend(added)
+            new = [k for k in model.keys if k not in base]
+            if model.violates(self.denials, new):
+                return (False, [])
+
+        if any(-l in model.variables for l in assumptions if l < 0):
+            return (False, [])
+
+        variables = range(1, len(self.atoms) + 1)
+        return (True, [v if v in model.variables else -v for v in variables])
+
+    def prepare_rules(self):
+        '''
+
+        Return the list of rules unfold_instance() unfolds, after pruning
+        and splitting the rules in self.rules, along with the reports of
+        the rules pruned (see relevance.prune()) and split (see
+        decompose.decompose_rules()).
+
+        '''
+
+        rules = self.rules
+        prunings = []
+        decompositions = []
+
+        if self.options.prune_rules:
+            name = lambda key: self.atoms.predicates[key[0]]
+            rules, prunings = relevance.prune(
+                rules, self.sorts,
+                asserted={name(k) for k in self.facts},
+                denied={name(k) for k in self.denials},
+                queries=self.queries,
+                closed=self.options.join_grounding
+            )
+
+        if self.options.decompose_rules:
+            sizes = {s: len(m) for s, m in self.sorts.items()}
+            rules, decompositions = decompose.decompose_rules(rules, sizes)
+
+        return rules, prunings, decompositions
+
+    def unfold_within_budget(self, rules):
+
+        budget = self.options.budget
+        budget.start(self, [planner.estimate(r, self) for r in rules])
+        self.running_budget = budget
+
+        try:
+            for k, rule in enumerate(rules):
+                if budget.admit(k):
+                    self.unfold_rule(rule)
+        finally:
+            self.running_budget = None
+
+        if self.verbose and budget.skipped:
+            print(budget.report())
+
+    def plan(self):
+        '''
+
+        Return a readable report of the estimated number of assignments,
+        clauses and memory taken by unfolding each rule that
+        unfold_instance() would unfold with the current sorts (see
+        planner.py), so that rules that would blow up can be spotted
+        before unfolding them.
+
+        '''
+
+        return planner.report(planner.plan(self))
+
+    def pruning_report(self):
+        '''
+
+        Return a readable report of the rules dropped or simplified by the
+        last call to unfold_instance(), and why.
+
+        '''
 
+        lines = []
+
+        for rule, replacement, reason in self.prunings:
+            if replacement is None:
+                lines.append(f"{rule.as_string()}: dropped ({reason})")
+            else:
+                lines.append(f"{rule.as_string()}: simplified ({reason})")
+                lines.append(f"    {replacement.as_string()}")
+
+        dropped = sum(1 for _, r, _ in self.prunings if r is None)
+        lines.append(f"{dropped} rules dropped, "
+                     f"{len(self.prunings) - dropped} simplified")
+
+        return "\n".join(lines)
+
+    def decomposition_report(self):
+        '''
+
+        Return a readable report of the rules split by the last call to
+        unfold_instance(), with the number of assignments to ground before
+        and after splitting each of them, and the rules replacing it.
+
+        '''
+
+        lines = []
+        before = 0
+        after = 0
+
+        for rule, parts, rule_before, rule_after in self.decompositions:
+            before += rule_before
+            after += rule_after
+            lines.append(f"{rule.as_string()}: "
+                         f"{rule_before} -> {rule_after} assignments")
+            lines += [f"    {part.as_string()}" for part in parts]
+
+        lines.append(f"{len(self.decompositions)} rules split: "
+                     f"{before} -> {after} assignments")
+
+        return "\n".join(lines)
+
+    def unfold_groups(self, rules):
+        '''
+
+        Unfold a list of rules grouped by their sort signature (see
+        group_rules()), enumerating the assignments of each signature once
+        and binding every rule in the group to each of them through
+        get_permutation() and map_on(). Rules using only some of the
+        signature's sorts (e.g. rules in a block, see group_rules()) are
+        bound only to the assignments whose other positions hold the
+        first member of their sort, so that no clause is repeated.
+
+        With compiled grounding, assignments are enumerated in chunks of
+        GROUP_CHUNK, each passed to the flat kernel of every rule in the
+        group (see kernels.Kernel). Rules with 'any' variables, and rules
+        alone in their group, are unfolded one by one.
+
+        '''
+
+        self.reserve_blocks(rules)
+
+        has_any = lambda r: any(is_any(v) for v in r.variables)
+        single = [r for r in rules if has_any(r)]
+        grouped = [r for r in rules if not has_any(r) and not r.is_trivial()]
+
+        for signature, group in group_rules(grouped).items():
+
+            if len(group) == 1:
+                single += group
+                continue
+
+            permutations = [get_permutation(signature, r.sorts) for r in group]
+            unused = [unused_positions(signature, p) for p in permutations]
+
+            if self.options.compiled_grounding:
+                self.unfold_group_kernels(signature, group, permutations, unused)
+
+            else:
+                firsts = [self.sorts[s][:1] for s in signature]
+                for assignment in product(*[self.sorts[s] for s in signature]):
+                    for rule, permutation, skipped in zip(group, permutations, unused):
+                        if any([assignment[k]] != firsts[k] for k in skipped):
+                            continue
+                        relations = rule.get_relations(map_on(assignment, permutation))
+                        for c in self.ground_clauses(*relations, rule.flags):
+                            self.add_clause(c)
+
+        for rule in rules:
+            if any(rule is r for r in single):
+                self.unfold_rule(rule)
+
+    def unfold_group_kernels(self, signature, group, permutations, unused):
+
+        domains = [
+            [(i, self.atoms.constant(c)) for i, c in enumerate(self.sorts[s])]
+            for s in signature
+        ]
+
+        compiled = [kernels.compile_rule(r, self, flat=True) for r in group]
+
+        # Flat assignments hold an index and a constant id per variable
+        flat_permutations = [
+            tuple(k for p in permutation for k in (2 * p, 2 * p + 1))
+            for permutation in permutations
+        ]
+
+        assignments = product(*domains)
+
+        while chunk := list(islice(assignments, GROUP_CHUNK)):
+
+            flat = [tuple(v for pair in a for v in pair) for a in chunk]
+
+            for kernel, permutation, skipped in zip(compiled, flat_permutations, unused):
+                rule_assignments = [
+                    map_on(a, permutation) for a in flat
+                    if not any(a[2 * k] for k in skipped)
+                ]
+                for clauses in kernel.clauses(rule_assignments):
+                    for c in clauses:
+                        self.add_clause(c)
+
+    def unfold_delta(self):
+        '''
+
+        Unfold the rules unfolded by unfold_instance() (see
+        HornSolver.unfolded_rules) over the assignments involving the
+        constants added to their sorts (with add_element() or fill_sort())
+        since the last call to unfold_instance() or unfold_delta(), adding
+        only their clauses to the solver. New constants must be appended
+        to their sorts, without removing or reordering old ones, and
+        function values may only be assigned to new constants: clauses
+        already ground from old values cannot be retracted, so changing
+        x.f for an old constant x raises an AssertionError (call
+        reset_instance() and unfold_instance() instead).
+
+        The clauses of a rule with an 'any' variable over a grown sort
+        list every member of the sort, so they are discarded (see
+        HornSolver.discard_clauses()) and the rule is unfolded again.
+        If HornSolver.unfold_una() has been called, equalities and
+        inequalities between new and old constants are asserted as well.
+
+        '''
+
+        assert self.unfolded_sizes is not None, "The instance has not been unfolded"
+
+        old_sizes = self.unfolded_sizes
+        grown = {s for s in self.sorts if len(self.sorts[s]) > old_sizes.get(s, 0)}
+
+        changed = self.changed_values()
+        assert not changed, \
+            f"Cannot unfold a delta after changing function values {changed}"
+
+        rules = self.unfolded_rules
+
+        stale = [
+            rule for rule in rules
+            if any(is_any(v) and s in grown for v, s in zip(rule.variables, rule.sorts))
+        ]
+
+        if stale:
+            self.discard_clauses(stale)
+
+        self.reserve_blocks(rules)
+
+        for rule in rules:
+            if any(rule is r for r in stale):
+                self.unfold_rule(rule)
+            else:
+                self.unfold_rule(rule, old_sizes=old_sizes)
+
+        if self.una_sizes is not None:
+            self.unfold_una()
+
+        self.unfolded_sizes = {s: len(m) for s, m in self.sorts.items()}
+        self.unfolded_values = dict(self.value_map)
+
+    def changed_values(self):
+        '''
+
+        Return the keys (f, x) of self.value_map whose value was added,
+        changed or removed since the last call to unfold_instance() or
+        unfold_delta(), for constants x other than those added to their
+        sorts since then.
+
+        '''
+
+        old, new = self.unfolded_values, self.value_map
+        new_constants = {
+            c for s, m in self.sorts.items()
+            for c in m[self.unfolded_sizes.get(s, 0):]
+        }
+
+        return sorted(
+            (f, x) for f, x in old.keys() | new.keys()
+            if x not in new_constants and old.get((f, x)) != new.get((f, x))
+        )
+
+    def record_clauses(self, rule, start, stop):
+        '''
+
+        Remember the positions in self.cnf_clauses of the clauses of a
+        rule with 'any' variables, so that they can be discarded if
+        their sorts grow.
+
+        '''
+
+        if self.options.retain_clauses and any(is_any(v) for v in rule.variables):
+            self.any_clauses.append((rule, start, stop))
+
+    def discard_clauses(self, rules):
+        '''
+
+        Remove the clauses of the input rules recorded by
+        HornSolver.record_clauses() from self.cnf_clauses, and replace
+        self.solver by a solver holding the clauses left (clause sinks
+        keep every clause they were sent).
+
+        '''
+
+        assert self.options.retain_clauses, "Cannot discard clauses that are not retained"
+
+        removed = [(a, b) for r, a, b in self.any_clauses
+                   if any(r is rule for rule in rules)]
+        kept = [(r, a, b) for r, a, b in self.any_clauses
+                if not any(r is rule for rule in rules)]
+
+        def shift(position):
+            return position - sum(
+                min(b, position) - a for a, b in removed if a < position)
+
+        self.flush_clauses()
+
+        clauses = ClauseArena()
+        start = 0
+
+        for a, b in sorted(removed):
+            clauses.extend(self.cnf_clauses[start:a])
+            start = max(start, b)
+
+        clauses.extend(self.cnf_clauses[start:])
+
+        self.any_clauses = [(r, shift(a), shift(b)) for r, a, b in kept]
+        self.cnf_clauses = clauses
+        self.solver = Solver()
+        self.simplification = None
+        self.backbones = {}
+
+        if self.options.feed_solver:
+            self._solver.append_formula(clauses)
+
+        # Clauses left may still use auxiliary atoms defined by the
+        # discarded ones, so their definitions are added back
+        for key, (variable, position) in list(self.definitions.items()):
+            if any(a <= position < b for a, b in removed):
+                self.definitions[key] = (variable, len(self.cnf_clauses))
+                self.add_clause(definition_clause(key, variable))
+            else:
+                self.definitions[key] = (variable, shift(position))
 
     def reset_instance(self):
         '''
@@ -168,60 +1158,374 @@ class HornSolver:
 
         '''
 
-        self.solver = Solver()
-        self.cnf_clauses = list()
+        self.solver = Solver()
+        self.cnf_clauses = ClauseArena()
+        self.simplification = None
+        self.unfolded_sizes = None
+        self.unfolded_values = None
+        self.una_sizes = None
+        self.any_clauses = []
+        self.definitions = {}
+        self.facts = set()
+        self.denials = set()
+        self.clause_count = 0
+        self.literal_count = 0
+        self.assertion_count = 0
+        self.least_model = None
+        self.horn_clauses = None
+        self.horn_consistent = None
+        self.backbones = {}
+        self.selectors = {}
+        self.origins = {}
+
+    def simplify(self, subsumption=True):
+        '''
+
+        Replace self.solver by a solver holding a simplified copy of the
+        clauses in self.cnf_clauses (see simplify.simplify()): asserted
+        facts and other unit clauses are propagated, tautologies and
+        duplicate or subsumed clauses are removed, and the variables left
+        are numbered densely. Setting 'subsumption' to False skips the
+        only step that does not take linear time. If self.verbose is True,
+        the number of variables eliminated is printed (see
+        Simplification.report()).
+
+        self.cnf_clauses, self.literal_map and self.reverse_literal_map
+        keep the original numbering. Clauses added afterwards are
+        translated before they reach the solver, and get_model() and
+        model_with() translate models back, so their results can be
+        decoded as before (the solver itself should not be queried
+        directly). Return the simplification.
+
+        '''
+
+        assert self.options.retain_clauses, "Cannot simplify clauses that are not retained"
+
+        self.flush_clauses()
+        simplification = simplify(self.cnf_clauses, subsumption)
+
+        if self.verbose:
+            print(simplification.report())
+
+        self.solver = Solver()
+        self.simplification = simplification
+        self._solver.append_formula(simplification.clauses)
+
+        if not simplification.satisfiable:
+            self._solver.add_clause([])
+
+        return simplification
+
+    def add_assertion(self, predicate_string):
+        '''
+
+        Input a predicate as a string (e.g. "p (a, b)", "a != b", "r (a.f, a.g)") and
+        add a CNF clause with a single positive literal to the solver CNF, updating
+        self's map from predicates to DIMACS literals and DIMACS literals to predicates.
+
+        Negated predicates (e.g. "not p (a, b)") add a single negative literal.
+
+        In the join grounding mode, atoms over closed predicates cannot be
+        asserted once the instance has been unfolded, since rules were only
+        ground on the atoms asserted before (see HornSolver.unfold_rule()).
+        
+        '''
+
+        self.learn()
+        assertion_clause = Clause(predicate_string, frozenset())
+        self.update_maps([assertion_clause])
+        dimacs_clause = self.dimacs(assertion_clause)
+
+        if self.options.join_grounding and self.unfolded_sizes is not None and dimacs_clause[0] > 0:
+            predicate = self.atoms.key_of(dimacs_clause[0])[0]
+            assert predicate not in self.closed_predicates(), \
+                f"Cannot assert {predicate_string} after join grounding the instance"
+
+        self.add_clause(dimacs_clause)
+        self.assertion_count += 1
+        if dimacs_clause[0] > 0:
+            self.facts.add(self.atoms.key_of(dimacs_clause[0]))
+        else:
+            self.denials.add(self.atoms.key_of(-dimacs_clause[0]))
+
+    def unfold_una(self):
+        '''
+
+        Embed equality as defined when making the unique-name assumption into
+        the solver's CNF problem instance - i.e. if 'a' and 'b' are constants
+        in the same sort, a != b iff a and b are different constants.
+
+        Comparisons in rules are evaluated while grounding them (see
+        HornSolver.compare()), so this is only needed to reason about
+        comparison atoms added with HornSolver.add_assertion().
+
+        Calling it again only asserts comparisons involving constants
+        added to their sorts since the last call.
+
+        '''
+
+        old_sizes = self.una_sizes or {}
+
+        for s in self.sorts:
+        
+            checked_assertions = set()
+            size = len(self.sorts[s])
+        
+            for i, j in deltas.delta_indices([size, size], [old_sizes.get(s, 0)] * 2):
+
+                c1, c2 = self.sorts[s][i], self.sorts[s][j]
+            
+                equality = f"{c1} = {c2}"
+                inequality = f"{c1} != {c2}"
+                
+                if c1 != c2 and inequality not in checked_assertions:
+                    self.add_assertion(inequality)
+                    checked_assertions.add(inequality)
+                    
+                if c1 == c2 and equality not in checked_assertions:
+                    self.add_assertion(equality)
+                    checked_assertions.add(equality)
+
+        self.una_sizes = {s: len(m) for s, m in self.sorts.items()}
+
+    @lru_cache(maxsize=CACHE_SIZE)
+    def is_functional(self, term_string):
+        '''
+
+        Check if a term contains function applications (i.e. it has
+        at least one function application, like a.f.g or pair.first).
+
+        '''
+
+        return "." in term_string
+
+    def learn(self):
+        '''
+
+        Make self.atoms aware of the predicates used in self.rules and
+        the constants in self.sorts, so that atom strings using them can
+        be split into predicate and arguments before any rule mentioning
+        them has been unfolded.
+
+        '''
+
+        for rule in self.rules:
+
+            if id(rule) in self.learned_rules:
+                continue
+
+            self.learned_rules.add(id(rule))
+
+            for relation in rule.heads + rule.body:
+                parts = [p.strip() for p in relation.parts]
+                if len(parts) == 3 and parts[1] in COMPARISONS:
+                    continue
+                predicate = positive(parts[0])[0]
+                self.atoms.learn_predicate(predicate, len(parts) - 1)
+
+        for sort, members in self.sorts.items():
+            snapshot = (id(members), len(members))
+            if self.learned_sorts.get(sort) != snapshot:
+                self.learned_sorts[sort] = snapshot
+                self.atoms.sort(sort, members)
+
+    def ground_atom(self, relation):
+        '''
+
+        Return the DIMACS variable of a relation whose variables have all
+        been bound to constants, evaluating its function applications.
+
+        '''
+
+        evaluate = self.evaluate
+        return self.atoms.literal([evaluate(p) for p in relation.parts])
+
+    def compare(self, relation):
+        '''
+
+        Evaluate a comparison relation (e.g. "a != b" or "s2 = s1.next")
+        whose variables have all been bound to constants, under the unique
+        name assumption (distinct constant names denote distinct objects).
+
+        Return None if the relation is not a comparison, or if some side
+        does not evaluate to a constant in a sort (e.g. a variable with no
+        sort, or a function value outside every sort), in which case the
+        comparison is ground into an atom.
+
+        '''
+
+        parts = [p.strip() for p in relation.parts]
+
+        if len(parts) != 3 or parts[1] not in COMPARISONS:
+            return None
+
+        left, comparison, right = parts
+        left, right = self.evaluate(left), self.evaluate(right)
+        known = self.sorted_constants()
+        constant = self.atoms.constant
+
+        if constant(left) not in known or constant(right) not in known:
+            return None
+
+        equal = left == right
+
+        return equal if comparison == EQUALS else not equal
+
+    def ground_clauses(self, heads, body, flags):
+        '''
+
+        Return the DIMACS clauses encoding a rule whose variables have all
+        been bound to constants, given its head and body relations and
+        its flags (an empty list is returned if no clause is needed).
+
+        Comparisons between constants in sorts are evaluated statically
+        (see HornSolver.compare()) instead of being ground into atoms: a
+        false comparison in the body of a rule (or a true one among the
+        disjuncts of a disjunction) makes it trivially satisfied, and true
+        ones are dropped.
+
+        '''
+
+        compare = self.compare
+        ground_atom = self.ground_atom
+        is_disjunction = IS_DISJUNCTION in flags
+
+        body_literals = []
+
+        for b in body:
+            value = compare(b)
+            if value is None:
+                body_literals.append(ground_atom(b))
+            elif value == is_disjunction:
+                return []
+
+        head_literals = []
+
+        for h in heads:
+            value = compare(h)
+            if value is None:
+                head_literals.append(ground_atom(h))
+            else:
+                head_literals.append(None if value else 0)
+
+        return self.literal_clauses(head_literals, body_literals, flags)
+
+    def ground_assignment(self, rule, assignment):
+        '''
+
+        Return the DIMACS clauses of a rule for an assignment of constants
+        to its variables (in the order of Rule.variables), as
+        HornSolver.ground_clauses() does for the relations returned by
+        Rule.get_relations().
+
+        If self.options.define_any is True, the atoms a body relation using
+        'any' expands into are replaced by a single auxiliary atom (see
+        HornSolver.define_any_literals()).
+
+        '''
+
+        if not self.options.define_any or not any(is_any(v) for v in rule.variables):
+            return self.ground_clauses(*rule.get_relations(assignment), rule.flags)
+
+        rule.guarded_rebind(assignment)
+
+        compare = self.compare
+        ground_atom = self.ground_atom
+        is_disjunction = IS_DISJUNCTION in rule.flags
+
+        body_literals = []
+
+        for b in rule.body:
+
+            literals = []
+
+            for r in rule.bind_any_variables(b):
+                value = compare(r)
+                if value is None:
+                    literals.append(ground_atom(r))
+                elif value == is_disjunction:
+                    return []
+
+            body_literals += self.define_any_literals(literals, is_disjunction)
+
+        head_literals = []
+
+        for h in rule.heads:
+            for r in rule.bind_any_variables(h):
+                value = compare(r)
+                if value is None:
+                    head_literals.append(ground_atom(r))
+                else:
+                    head_literals.append(None if value else 0)
+
+        return self.literal_clauses(head_literals, body_literals, rule.flags)
+
+    def define_any_literals(self, literals, is_disjunction):
+        '''
+
+        Return a list holding an auxiliary atom standing for the conjunction
+        of a list of DIMACS literals expanded from a body relation using
+        'any' (or their disjunction, if the rule is a disjunction), adding
+        the clause that defines it the first time the same literals are
+        seen, so every rule and assignment using them shares it.
+
+        Since the atom only occurs negated in the clauses of implications
+        (and positively in disjunctions), the definition only needs to
+        make it true when every literal is true (or to make one literal
+        true when it is true). Lists of fewer than two distinct literals
+        are returned as they are.
+
+        '''
+
+        literals = list(dict.fromkeys(literals))
 
-    def add_assertion(self, predicate_string):
-        '''
+        if len(literals) < 2:
+            return literals
 
-        Input a predicate as a string (e.g. "p (a, b)", "a != b", "r (a.f, a.g)") and
-        add a CNF clause with a single positive literal to the solver CNF, updating
-        self's map from predicates to DIMACS literals and DIMACS literals to predicates.
-        
-        '''
+        key = (is_disjunction, frozenset(literals))
 
-        assertion_clause = Clause(predicate_string, frozenset())
-        self.update_maps([assertion_clause])
-        dimacs_clause = self.dimacs(assertion_clause)
-        self.solver.add_clause(dimacs_clause)
-        self.cnf_clauses.append(dimacs_clause)
+        if key not in self.definitions:
 
-    def unfold_una(self):
-        '''
+            atoms = self.atoms
+            name = f"#{len(self.definitions) + 1}"
+            variable = atoms.add((atoms.predicate(AUXILIARY), atoms.constant(name)))
 
-        Embed equality as defined when making the unique-name assumption into
-        the solver's CNF problem instance - i.e. if 'a' and 'b' are constants
-        in the same sort, a != b iff a and b are different constants.
+            # Definitions are shared by every rule, so they are not guarded
+            guard, self.guard = self.guard, None
+            self.definitions[key] = (variable, len(self.cnf_clauses))
+            self.add_clause(definition_clause(key, variable))
+            self.guard = guard
 
+        return [self.definitions[key][0]]
+
+    def literal_clauses(self, heads, body, flags):
         '''
 
-        for s in self.sorts:
-        
-            checked_assertions = set()
-        
-            for c1, c2 in product(self.sorts[s], self.sorts[s]):
-            
-                equality = f"{c1} = {c2}"
-                inequality = f"{c1} != {c2}"
-                
-                if c1 != c2 and inequality not in checked_assertions:
-                    self.add_assertion(inequality)
-                    checked_assertions.add(inequality)
-                    
-                if c1 == c2 and equality not in checked_assertions:
-                    self.add_assertion(equality)
-                    checked_assertions.add(equality)
+        Return the DIMACS clauses encoding a ground rule, given the DIMACS
+        variables of its heads and body atoms and the rule flags.
+
+        A head given as 0 is false (so its clause is the negated body), and
+        one given as None is true (so it needs no clause). Tautologies
+        (e.g. the clauses of "p v not p" or "p, not p => False") are
+        dropped.
 
-    @lru_cache(maxsize=CACHE_SIZE)
-    def is_functional(self, term_string):
         '''
 
-        Check if a term contains function applications (i.e. it has
-        at least one function application, like a.f.g or pair.first).
+        body_literals = list(dict.fromkeys(body))
 
-        '''
+        if IS_DISJUNCTION in flags:
+            clauses = [body_literals]
 
-        return "." in term_string
+        else:
+            negated_body = [-b for b in body_literals]
+
+            if not heads:
+                clauses = [negated_body]
+            else:
+                clauses = [[h] + negated_body if h else negated_body
+                           for h in heads if h is not None]
+
+        return [c for c in clauses if c and not is_tautology(c)]
 
     def dimacs(self, pure_clause):
         '''
@@ -256,7 +1560,6 @@ class HornSolver:
 
         return [self.literal_map[atom] for atom in pure_clause.body]
 
-    @lru_cache(maxsize=CACHE_SIZE)
     def evaluate(self, term_string):
         '''
 
@@ -266,6 +1569,9 @@ class HornSolver:
         If the input term is already a single constant name, then it
         is returned unchanged.
 
+        Function applications are looked up in the tables compiled by
+        HornSolver.function_tables().
+
         '''
 
         terms = term_string.split(TERM_SEPARATOR)
@@ -277,17 +1583,10 @@ class HornSolver:
 
             x = parts.pop(0)
 
-            a = x
-
-            while parts:
-
-                f = parts.pop(0)
-
-                a = self.value_map[f, x]
+            if parts:
+                x = self.function_tables().apply(parts, x)
 
-                x = a
-
-            evaluated_terms.append(a)
+            evaluated_terms.append(x)
 
         return " ".join(evaluated_terms)
 
@@ -318,20 +1617,14 @@ class HornSolver:
 
         '''
 
-        all_symbols = set()
-
         for c in clauses:
-            all_symbols.add(c.head)
-            all_symbols |= set(c.body)
-
-        new_symbols = {s for s in all_symbols if s not in self.literal_map}
-
-        for s in new_symbols:
-            self.name_counter += 1
-            self.literal_map[s] = self.name_counter
-            self.reverse_literal_map[self.name_counter] = s
+            for s in [c.head] + list(c.body):
+                if s:
+                    key = self.atoms.parse(positive(s)[0], create=True)
+                    if not self.atoms.find(key):
+                        self.atoms.add(key)
             
-    def get_model(self):
+    def get_model(self, disabled=()):
         '''
         
         If the problem instance is satisfiable, return
@@ -339,16 +1632,22 @@ class HornSolver:
         literals.
         
         Else, return (False, [])
+
+        Horn programs unfolded with self.options.forward_chaining set to
+        True are answered without the SAT solver (see HornSolver.chain()).
+
+        The rules in 'disabled' are switched off if the instance was
+        unfolded with self.options.rule_selectors set to True (see
+        HornSolver.solve_with()).
         
         '''
-        solvable = self.solver.solve()
-        if solvable:
-            model = self.solver.get_model()
-            return (True, model)
-        else:
-            return (False, [])
+
+        if self.horn_clauses == self.clause_count:
+            return self.horn_model()
+
+        return self.solve_with([], disabled)
             
-    def model_with(self, statements):
+    def model_with(self, statements, disabled=()):
         '''
         
         Check if there is a model satisfying the current
@@ -365,16 +1664,391 @@ class HornSolver:
         literals.
         
         Else, return (False, [])
+
+        The rules in 'disabled' are switched off as in get_model().
         
         '''
-        literals = [self.literal_map[s] for s in statements]
+        self.learn()
+        assumptions = [self.literal_map[s] for s in statements]
+
+        if self.horn_clauses == self.clause_count:
+            return self.horn_model(assumptions)
+
+        return self.solve_with(assumptions, disabled)
+
+    def solve_with(self, assumptions, disabled=()):
+        '''
+
+        Call the SAT solver assuming a list of DIMACS literals, and return
+        (True, model) or (False, []) as model_with() does.
+
+        The selector atoms of every rule (see HornSolver.selector()) but
+        those in 'disabled' are assumed as well, so the clauses of disabled
+        rules are satisfied by making their selector atoms false.
+
+        '''
+
+        assumptions = list(assumptions) + self.active_selectors(disabled)
+        literals = assumptions
+
+        if self.simplification is not None:
+            literals = [self.simplification.assumption(l) for l in assumptions]
+            if False in literals:
+                return (False, [])
+            literals = [l for l in literals if l is not True]
+
         solvable = self.solver.solve(literals)
         if solvable:
             model = self.solver.get_model()
-            return (True, model)
+            return (True, self.original_model(model, assumptions))
         else:
             return (False, [])
 
+    def iter_models(self, project_on=None, limit=None, statements=()):
+        '''
+
+        Yield models of the current problem instance (as lists of DIMACS
+        literals, like get_model()) with distinct projections on the atoms
+        over the predicates named in 'project_on' (by default, every atom
+        but auxiliary ones, see HornSolver.auxiliary_predicates()), at
+        most 'limit' of them, and satisfying the statements in
+        'statements' (as model_with() does).
+
+        Each model found is excluded by a blocking clause over the
+        projected atoms, guarded by an activation atom which is assumed
+        while enumerating. Blocking clauses only reach the SAT solver (not
+        self.cnf_clauses or clause sinks), and the activation atom is
+        asserted false once the generator is exhausted or closed, so they
+        do not constrain later queries.
+
+        '''
+
+        self.learn()
+        assumptions = [self.literal_map[s] for s in statements]
+        projected = self.projected_variables(project_on)
+
+        activation = self.activation_atom()
+        found = 0
+
+        try:
+
+            while limit is None or found < limit:
+
+                sat, model = self.solve_with([activation] + assumptions)
+
+                if not sat:
+                    return
+
+                found += 1
+                yield model
+
+                true = {l for l in model if l > 0}
+                self.feed([-activation] + [-v if v in true else v for v in projected])
+
+        finally:
+            self.feed([-activation])
+
+    def trace_origins(self, prunings, decompositions):
+        '''
+
+        Map the rules unfolded by HornSolver.unfold_instance() (after
+        pruning and splitting them) to the rules in self.rules they come
+        from, in self.origins (by their ids).
+
+        '''
+
+        for rule in self.rules:
+            self.origins[id(rule)] = rule
+
+        for rule, simplified, _ in prunings:
+            if simplified is not None:
+                self.origins[id(simplified)] = self.origins.get(id(rule), rule)
+
+        for rule, parts, _, _ in decompositions:
+            for part in parts:
+                self.origins[id(part)] = self.origins.get(id(rule), rule)
+
+    def selector(self, rule):
+        '''
+
+        Return the selector atom of the rule a rule unfolded by
+        HornSolver.unfold_instance() comes from (see trace_origins()),
+        adding it the first time.
+
+        '''
+
+        origin = self.origins.get(id(rule), rule)
+
+        if id(origin) not in self.selectors:
+            atoms = self.atoms
+            name = f"#{len(atoms) + 1}"
+            variable = atoms.add((atoms.predicate(SELECTOR), atoms.constant(name)))
+            self.selectors[id(origin)] = (origin, variable)
+
+        return self.selectors[id(origin)][1]
+
+    def active_selectors(self, disabled=()):
+
+        for rule in disabled:
+            assert id(rule) in self.selectors, f"{rule.as_string()} has no selector atom"
+
+        return [
+            variable for rule, variable in self.selectors.values()
+            if not any(rule is r for r in disabled)
+        ]
+
+    def retire_rules(self, rules):
+        '''
+
+        Remove a list of rules from self.rules, and add a unit clause
+        fixing their selector atoms to false, so that the SAT solver (and
+        the clauses it learned) can be kept.
+
+        '''
+
+        for rule in rules:
+            if id(rule) in self.selectors:
+                _, variable = self.selectors.pop(id(rule))
+                self.add_clause([-variable])
+
+        retired = lambda r: any(self.origins.get(id(r), r) is o for o in rules)
+
+        self.rules = [r for r in self.rules if not any(r is o for o in rules)]
+        self.unfolded_rules = [r for r in self.unfolded_rules if not retired(r)]
+        self.origins = {
+            k: o for k, o in self.origins.items()
+            if not any(o is r for r in rules)
+        }
+
+    def unfold_rules(self, rules):
+        '''
+
+        Unfold a list of rules after HornSolver.unfold_instance() has been
+        called with self.options.rule_selectors set to True, adding them to
+        self.rules, splitting them first if self.options.decompose_rules is
+        True.
+
+        Pruning and join grounding look at every rule at once, so the
+        instance must not have been pruned on queries or ground in the join
+        mode, and sorts must not have grown since the last unfolding (see
+        HornSolver.unfold_delta()).
+
+        '''
+
+        assert self.options.rule_selectors, "Rules can only be added with self.options.rule_selectors"
+        assert not self.options.join_grounding, "Cannot add rules to a join ground instance"
+        assert not self.options.prune_rules or self.queries is None, \
+            "Cannot add rules to an instance pruned on queries"
+        assert self.unfolded_sizes == {s: len(m) for s, m in self.sorts.items()}, \
+            "Sorts have grown since the last unfolding"
+
+        parts = rules
+        decompositions = []
+
+        if self.options.decompose_rules:
+            sizes = {s: len(m) for s, m in self.sorts.items()}
+            first = len(self.decompositions) + 1
+            parts, decompositions = decompose.decompose_rules(rules, sizes, first)
+
+        self.rules = self.rules + [r for r in rules if not any(r is o for o in self.rules)]
+        self.trace_origins([], decompositions)
+        self.decompositions += decompositions
+        self.unfolded_rules = self.unfolded_rules + parts
+
+        for rule in parts:
+            self.unfold_rule(rule)
+
+    def update_rules(self, rules):
+        '''
+
+        Replace the rules in self.rules by a list of rules (e.g. read from
+        an edited program), retiring those written differently from every
+        rule in the list (see HornSolver.retire_rules()) and unfolding
+        those written differently from every rule in self.rules (see
+        HornSolver.unfold_rules()). Rules are compared by rule_key().
+
+        '''
+
+        old = {rule_key(r) for r in self.rules}
+        new = {rule_key(r) for r in rules}
+
+        self.retire_rules([r for r in self.rules if rule_key(r) not in new])
+        self.unfold_rules([r for r in rules if rule_key(r) not in old])
+
+    def projected_variables(self, predicates=None):
+        '''
+
+        Return the DIMACS variables of the atoms over the predicates named
+        in 'predicates', or of every atom but auxiliary ones (see
+        HornSolver.auxiliary_predicates()) if it is None.
+
+        '''
+
+        atoms = self.atoms
+
+        if predicates is None:
+            auxiliary = self.auxiliary_predicates()
+            ids = {i for name, i in atoms.predicate_ids.items()
+                   if name not in auxiliary}
+        else:
+            ids = {atoms.predicate_ids[name] for name in predicates
+                   if name in atoms.predicate_ids}
+
+        return [v for v in range(1, len(atoms) + 1) if atoms.key_of(v)[0] in ids]
+
+    def backbone(self, predicates=None):
+        '''
+
+        Return a pair of sets (true, false) with the atoms (as strings)
+        over the predicates named in 'predicates' (by default, every atom
+        but auxiliary ones) which are true and false respectively in
+        every model of the current problem instance, or None if it has no
+        models.
+
+        The values of the atoms in a first model are the candidates. Each
+        call to the SAT solver then asks for a model flipping at least one
+        candidate (through a clause guarded by an activation atom, as in
+        HornSolver.iter_models()), and drops every candidate it flips.
+        Once no model flips any, the candidates left are the backbone.
+
+        Results are cached until clauses are added or discarded.
+
+        '''
+
+        self.learn()
+        key = None if predicates is None else frozenset(predicates)
+
+        if self.backbone_version != self.clause_count:
+            self.backbones = {}
+            self.backbone_version = self.clause_count
+
+        if key in self.backbones:
+            return self.backbones[key]
+
+        sat, model = self.solve_with([])
+        result = None
+
+        if sat:
+
+            values = set(model)
+            candidates = [v if v in values else -v
+                          for v in self.projected_variables(predicates)]
+
+            while candidates:
+
+                activation = self.activation_atom()
+                self.feed([-activation] + [-l for l in candidates])
+                sat, model = self.solve_with([activation])
+                self.feed([-activation])
+
+                if not sat:
+                    break
+
+                values = set(model)
+                candidates = [l for l in candidates if l in values]
+
+            names = self.reverse_literal_map
+            result = ({names[l] for l in candidates if l > 0},
+                      {names[-l] for l in candidates if l < 0})
+
+        self.backbones[key] = result
+
+        return result
+
+    def coverage(self, statements):
+        '''
+
+        Find a small set of models that together witness every satisfiable
+        statement in a list (atoms as strings, possibly negated, as in
+        model_with()), so that browsing "some model where this holds" for
+        each of them needs no further calls to the SAT solver.
+
+        Every call to the solver asks for a model satisfying at least one
+        uncovered statement (through a clause guarded by an activation
+        atom, as in HornSolver.iter_models()), and each model found covers
+        every uncovered statement it satisfies. When no model satisfies
+        any of them, the statements left are unsatisfiable.
+
+        Return a tuple (models, witnesses, unsatisfiable): the list of
+        models found, a dictionary mapping each satisfiable statement to
+        the position of a model satisfying it, and the list of
+        unsatisfiable statements.
+
+        '''
+
+        self.learn()
+        literals = {s: self.literal_map[s] for s in statements}
+        uncovered = list(dict.fromkeys(statements))
+        models = []
+        witnesses = {}
+
+        while uncovered:
+
+            activation = self.activation_atom()
+            self.feed([-activation] + [literals[s] for s in uncovered])
+            sat, model = self.solve_with([activation])
+            self.feed([-activation])
+
+            if not sat:
+                break
+
+            true = set(model)
+            covered = [s for s in uncovered if literals[s] in true]
+
+            for s in covered:
+                witnesses[s] = len(models)
+
+            models.append(model)
+            uncovered = [s for s in uncovered if s not in witnesses]
+
+        return models, witnesses, uncovered
+
+    def activation_atom(self):
+        '''
+
+        Return a new auxiliary atom to guard clauses only added to the SAT
+        solver while it is assumed (see HornSolver.iter_models()).
+
+        '''
+
+        atoms = self.atoms
+        self.blockings += 1
+        name = f"#{self.blockings}"
+
+        return atoms.add((atoms.predicate(BLOCKING), atoms.constant(name)))
+
+    def auxiliary_predicates(self):
+        '''
+
+        Return the names of the predicates of auxiliary atoms, which are not
+        determined by the other atoms in a model: 'any' definitions (see
+        HornSolver.define_any_literals()), activation atoms (see
+        HornSolver.iter_models()), selector atoms (see
+        HornSolver.selector()), and predicates in the namespace reserved
+        for the solver (starting with RESERVED, which programs cannot
+        use), like the heads of rules added when splitting rules (see
+        decompose.py).
+
+        '''
+
+        names = {AUXILIARY, BLOCKING, SELECTOR}
+        names |= {p for p in self.atoms.predicate_ids if p.startswith(RESERVED)}
+
+        return names
+
+    def original_model(self, model, assumptions=()):
+        '''
+
+        Translate a model of a simplified solver (see HornSolver.simplify())
+        back to the original DIMACS variables.
+
+        '''
+
+        if self.simplification is None:
+            return model
+
+        return self.simplification.model(model, len(self.atoms), assumptions)
+
     def show_model(self, model, show_false=False):
         '''
 
@@ -383,14 +2057,17 @@ class HornSolver:
 
         If show_false is set to True, false atoms are included as well.
 
+        Auxiliary atoms (see HornSolver.auxiliary_predicates()) are left
+        out, like activation, selector and 'any' definition atoms.
+
         '''
 
-        readable_model = ""
+        shown = set(self.projected_variables())
+        model = [a for a in model if abs(a) in shown]
 
         if not show_false:
             atoms = [self.reverse_literal_map[a] for a in model if a > 0]
             atoms = [a for a in atoms if "=" not in a]
-            atoms = [a for a in atoms if "not " != a[:4]]
 
         if show_false:
             atoms = []
@@ -412,7 +2089,7 @@ class HornSolver:
                 readable_model = readable_model + line + "\n"
                 line = ""
 
-        return readable_model
+        return readable_model + line
         
     def show_clauses(self):
         '''
@@ -443,8 +2120,8 @@ class HornSolver:
         relations = set()
 
         for atom in model:
-            if atom > 0:
-                relation = tuple(self.reverse_literal_map[atom].split(" "))
+            if 0 < atom <= len(self.atoms):
+                relation = self.atoms.names(atom)
                 predicate = relation[0]
                 if predicate in target_relations:
                     relations.add(relation)
@@ -467,13 +2144,13 @@ class HornSolver:
 
         '''
 
-        cnf_clauses = [c.tolist() for c in self.cnf_clauses]
+        cnf_clauses = self.cnf_clauses.tolist()
         value_triples = [(f, x, self.value_map[f, x])
                          for (f, x) in self.value_map]
 
         return as_json({
             'clauses': cnf_clauses,
-            'literals': self.literal_map,
+            'literals': dict(self.literal_map),
             'values': value_triples
         })
 
@@ -498,12 +2175,14 @@ def group_rules(rules):
     rules by their 'predicate signature' (i.e. if two
     predicates range over two variables of the same sort,
     they are grouped together, same as four rules ranging
-    over a single variable of the same sort).
+    over a single variable of the same sort). Rules in a
+    block are grouped by the signature of the block (see
+    Rule.group_sorts()).
 
     '''
     sorts_map = index()
     for r in rules:
-        sorts_tuple = tuple(sorted(r.sorts))
+        sorts_tuple = tuple(sorted(r.group_sorts()))
         sorts_map[sorts_tuple].append(r)
     return sorts_map
 
@@ -517,12 +2196,55 @@ def get_permutation(ordered_sorts, assorted_sorts):
         index_permutation.append(top_index)
     return tuple(index_permutation)
 
+def unused_positions(signature, permutation):
+    return [k for k in range(len(signature)) if k not in permutation]
+
 def map_on(assignment, index_permutation):
     assignment_permutation = []
     for index in index_permutation:
         assignment_permutation.append(assignment[index])
     return tuple(assignment_permutation)
 
+@dataclass
+class GroundingOptions:
+    '''
+
+    The options of HornSolver.unfold_instance() and the methods unfolding
+    rules with it, checked together by HornSolver.grounding_strategy().
+
+    compiled_grounding, vectorized_grounding, join_grounding,
+    grouped_grounding and workers choose how rules are ground (see
+    HornSolver.unfold_rule() and HornSolver.unfold_instance()), and
+    check_kernels compares compiled kernels with the string path.
+    define_any, prune_rules, decompose_rules, forward_chaining,
+    rule_selectors and presolve rewrite the rules or clauses along the
+    way, and budget (a planner.Budget) bounds the size of the instance.
+    block_numbering reserves blocks of variables for the atoms of each
+    signature (see atoms.Block), retain_clauses and feed_solver choose
+    where clauses go (see HornSolver.add_clause()), in batches of
+    batch_size clauses.
+
+    '''
+
+    compiled_grounding: bool = True
+    check_kernels: bool = False
+    vectorized_grounding: bool = False
+    join_grounding: bool = False
+    grouped_grounding: bool = False
+    workers: int = 1
+    define_any: bool = False
+    prune_rules: bool = False
+    decompose_rules: bool = False
+    forward_chaining: bool = False
+    rule_selectors: bool = False
+    presolve: bool = False
+    budget: object = None
+    block_numbering: bool = True
+    retain_clauses: bool = True
+    feed_solver: bool = True
+    batch_size: int = BATCH_SIZE
+
+
 @dataclass
 class Relation:
     parts: frozenset[str]
@@ -549,7 +2271,33 @@ class Rule:
 
     flags: set[str]
 
-    def get_clauses(self, assignment):
+    # The variables and sorts of the block the rule was written in, if any
+    # (see parser.expand_blocks())
+    scope: dict[str, str] = field(default_factory=dict)
+
+    def group_sorts(self):
+        '''
+
+        Return the sorts the rule is grouped by (see group_rules()): those
+        of its variables, or those of its block followed by the sorts of
+        the variables declared outside of it, for rules in a block.
+
+        '''
+
+        if not self.scope:
+            return list(self.sorts)
+
+        outside = [s for v, s in zip(self.variables, self.sorts) if v not in self.scope]
+        return list(self.scope.values()) + outside
+
+    def get_relations(self, assignment):
+        '''
+
+        Bind the rule's variables to the constants in 'assignment' and
+        return the resulting head and body relations, expanding 'any'
+        variables into all members of their sorts.
+
+        '''
 
         has_any = True in [is_any(v) for v in self.variables]
 
@@ -570,6 +2318,12 @@ class Rule:
             heads = [r for h in nested_heads for r in h]
             body = [r for b in nested_body for r in b]
 
+        return heads, body
+
+    def get_clauses(self, assignment):
+
+        heads, body = self.get_relations(assignment)
+
         string_heads = [r.as_string() for r in heads]
         string_body = [r.as_string() for r in body]
 
@@ -579,6 +2333,79 @@ class Rule:
         else:
             return [Clause("", frozenset(string_body))]
 
+    def signatures(self):
+        '''
+
+        Return a list of pairs (predicate, sorts) for every relation in the
+        rule whose arguments are all variables, where sorts is the tuple of
+        sorts of those variables.
+
+        '''
+
+        sort_of = dict(zip(self.variables, self.sorts))
+        signatures = []
+
+        for relation in self.heads + self.body:
+
+            predicate, *arguments = [p.strip() for p in relation.parts]
+            predicate = positive(predicate)[0]
+
+            if predicate in sort_of or not arguments:
+                continue
+
+            if all(a in sort_of for a in arguments):
+                sorts = tuple(sort_of[a] for a in arguments)
+                signatures.append((predicate, sorts))
+
+        return signatures
+
+    def is_trivial(self):
+        '''
+
+        Check if every ground clause of the rule is a tautology, as for
+        "p (a) v not p (a)" or "p (a), not p (a) => False".
+
+        '''
+
+        def signed(relation):
+            predicate, *arguments = [p.strip() for p in relation.parts]
+            predicate, sign = positive(predicate)
+            return sign, predicate, *arguments
+
+        body = {signed(r) for r in self.body}
+
+        if any((-sign, *atom) in body for sign, *atom in body):
+            return True
+
+        if IS_DISJUNCTION in self.flags:
+            return False
+
+        return bool(self.heads) and all(signed(h) in body for h in self.heads)
+
+    def may_clash(self):
+        '''
+
+        Check if some ground clause of the rule may contain a literal and
+        its negation, i.e. if the rule has negated relations, predicate
+        variables, or a head predicate that also occurs in its body.
+
+        '''
+
+        heads = set()
+        body = set()
+
+        for relations, names in [(self.heads, heads), (self.body, body)]:
+            for relation in relations:
+                parts = [p.strip() for p in relation.parts]
+                if len(parts) == 3 and parts[1] in COMPARISONS:
+                    continue
+                predicate, sign = positive(parts[0])
+                if sign < 0 or predicate in self.variables:
+                    return True
+                names.add(predicate)
+
+        return bool(heads & body)
+
     def rebind(self, assignment):
         for variable, value in zip(self.variables, assignment):
             self.bindings[variable] = value
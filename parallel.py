@@ -0,0 +1,153 @@
+import multiprocessing
+from array import array
+from collections import Counter
+
+from artale import kernels, models
+
+# State inherited by forked worker processes
+WORKER = {}
+
+
+def available():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def shards(solver, rule, count):
+    '''
+
+    Split the assignments of a rule into at most 'count' contiguous
+    ranges (start, stop) of positions in the domain of its outermost loop
+    variable (see kernels.Kernel).
+
+    '''
+
+    loop_sorts = [s for v, s in zip(rule.variables, rule.sorts)
+                  if not models.is_any(v)]
+
+    if not loop_sorts:
+        return [(0, None)]
+
+    size = len(solver.sorts[loop_sorts[0]])
+    count = max(1, min(count, size))
+    bounds = [size * k // count for k in range(count + 1)]
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def ground_shard(task):
+    '''
+
+    Ground a shard of a rule in a worker process, and return its clauses
+    as a flat array of literals and an array of clause lengths, along
+    with the names of the atoms created while grounding it (in order).
+
+    New atoms are numbered provisionally from the top of the atom table
+    at the time the workers were forked, and forgotten afterwards so the
+    next shard starts from the same table. Kernels are compiled before
+    forking, and inherited by the workers.
+
+    '''
+
+    rule_index, start, stop = task
+    atoms = WORKER["solver"].atoms
+    top = WORKER["top"]
+    kernel = WORKER["kernels"][rule_index]
+
+    literals = array("l")
+    lengths = array("l")
+
+    for clauses in kernel.clauses(start=start, stop=stop):
+        for c in clauses:
+            literals.extend(c)
+            lengths.append(len(c))
+
+    new_atoms = [atoms.names(v) for v in range(top + 1, len(atoms) + 1)]
+    atoms.truncate(top)
+
+    return literals, lengths, new_atoms
+
+
+def merge(solver, top, result):
+    '''
+
+    Add the clauses ground by a worker to a solver, numbering the atoms
+    created by the worker as the sequential unfolding would have.
+
+    '''
+
+    literals, lengths, new_atoms = result
+    atoms = solver.atoms
+    numbering = [0]
+
+    for names in new_atoms:
+        key = (atoms.predicate(names[0]), *[atoms.constant(c) for c in names[1:]])
+        numbering.append(atoms.find(key) or atoms.add(key))
+
+    renumber = lambda l: l if -top <= l <= top else (
+        numbering[l - top] if l > 0 else -numbering[-l - top])
+
+    position = 0
+
+    for n in lengths:
+        clause = literals[position:position + n].tolist()
+        if new_atoms:
+            clause = [renumber(l) for l in clause]
+        solver.add_clause(clause)
+        position += n
+
+
+def unfold(solver, rules, workers):
+    '''
+
+    Unfold a list of rules with compiled kernels (see kernels.py) in
+    'workers' forked processes, each grounding a shard of a rule at a
+    time, and merge their clauses into the solver in the order of the
+    sequential unfolding, so that the solver ends up with the same
+    clauses and atom numbering.
+
+    All blocks of variables must have been reserved beforehand.
+
+    '''
+
+    # Compiling every kernel interns the names the rules use, so that
+    # workers share the constant and predicate ids
+    compiled = [kernels.compile_rule(rule, solver) for rule in rules]
+
+    # Auxiliary atoms defining 'any' expansions are shared through the
+    # solver (see HornSolver.define_any_literals()), so rules using them
+    # are unfolded in this process, in turn
+    local = [
+        solver.options.define_any and any(models.is_any(v) for v in rule.variables)
+        for rule in rules
+    ]
+
+    tasks = [
+        (i, start, stop)
+        for i, rule in enumerate(rules) if not rule.is_trivial() and not local[i]
+        for start, stop in shards(solver, rule, 4 * workers)
+    ]
+
+    counts = Counter(i for i, _, _ in tasks)
+    top = len(solver.atoms)
+    WORKER.update(solver=solver, top=top, kernels=compiled)
+
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+
+            results = pool.imap(ground_shard, tasks)
+
+            for i, rule in enumerate(rules):
+
+                if local[i]:
+                    solver.unfold_rule(rule)
+                    continue
+
+                start = len(solver.cnf_clauses)
+
+                for _ in range(counts[i]):
+                    merge(solver, top, next(results))
+
+                solver.record_clauses(rule, start, len(solver.cnf_clauses))
+    finally:
+        WORKER.clear()
@@ -1,7 +1,7 @@
 from ctypes.wintypes import DOUBLE
 import re
 
-from artale.models import Relation, Rule
+from artale.models import RESERVED, Relation, Rule
 from artale.models import IS_DISJUNCTION as DISJUNCTION_FLAG
 
 IMPLICATION = " => "
@@ -31,6 +31,11 @@ DOUBLE_LINE_BREAKS = "\n\n"
 
 DOT = "."
 
+LBRACE = "{"
+RBRACE = "}"
+
+BLOCK = re.compile(r"^([^{}\n]*:[^{}\n]*)\{([^{}]*)\}", re.MULTILINE)
+
 def normalize(text):
     
     '''
@@ -39,6 +44,8 @@ def normalize(text):
     '''
 
     text = filter_comments(text)
+    assert RESERVED not in text, f"'{RESERVED}' is reserved for auxiliary atoms"
+    text = expand_blocks(text)
 
     lines = text.split("\n\n")
     lines = [l.strip() for l in lines]
@@ -71,8 +78,10 @@ def normalize(text):
 def read_program(text):
 
     '''
-    Input a program and return a list of sort specifications
-    and a list of rule specifications.
+    Input a program and return a list of sort specifications,
+    a list of pairs of rule specifications and the scopes of
+    their blocks (see read_scope(), empty outside blocks), and
+    the variables declared with 'var'.
     '''
 
     text = normalize(text)
@@ -89,6 +98,48 @@ def read_program(text):
 
 def filter_comments(text):
     return re.sub("--.*--", "", text)
+
+def expand_blocks(text):
+
+    '''
+    Rewrite every block of rules quantified over a list of variables, e.g.
+
+        a : A, b : A, c : C {
+            p (a) => q (a)
+            q (b, a), r (b, c) => s (b)
+        }
+
+    as separate rules (one per line of the block), each prefixed with the
+    block's declarations in braces (e.g. "{a : A, b : A, c : C} p (a) => q (a)"),
+    which read_rules() uses as the default sorts of the rule's variables,
+    and as the scope the rules of the block are grouped by (see
+    models.group_rules()).
+    '''
+
+    def expand(match):
+        scope = match.group(1).strip()
+        lines = [l.strip() for l in match.group(2).split("\n")]
+        rules = [f"{LBRACE}{scope}{RBRACE} {l}" for l in lines if l]
+        return DOUBLE_LINE_BREAKS + DOUBLE_LINE_BREAKS.join(rules) + DOUBLE_LINE_BREAKS
+
+    return BLOCK.sub(expand, text)
+
+def read_scope(line):
+
+    '''
+    Split a rule prefixed with the declarations of its block (see
+    expand_blocks()) into a dictionary mapping variables to sorts and
+    the rule itself.
+    '''
+
+    declarations, rule = line[1:].split(RBRACE, 1)
+    scope = {}
+
+    for declaration in declarations.split(","):
+        variable, sort = [p.strip() for p in declaration.split(SORT_ASSIGNMENT.strip())]
+        scope[variable] = sort
+
+    return scope, rule.strip()
     
 def read_variables(text):
     
@@ -219,8 +270,15 @@ def read_rules(text, default_variables):
 
     for rule_candidate in lines:
 
+        defaults = default_variables
+        scope = {}
+
+        if rule_candidate.startswith(LBRACE):
+            scope, rule_candidate = read_scope(rule_candidate)
+            defaults = default_variables | scope
+
         if check_line(rule_candidate):
-            rules.append(read_rule(rule_candidate, default_variables))
+            rules.append((read_rule(rule_candidate, defaults), scope))
 
         else:
             pass # Raise ill-formed rule error
@@ -418,7 +476,7 @@ def strip_sort(term):
     else:
         return term.split(SORT_ASSIGNMENT).pop(0).strip()
 
-def make_rule(rule_tuple, solver):
+def make_rule(rule_tuple, solver, scope=None):
 
     rule_type = rule_tuple[0]
 
@@ -468,10 +526,17 @@ def make_rule(rule_tuple, solver):
                 rule_variables,
                 solver,
                 bindings,
-                flags)
+                flags,
+                dict(scope or {}))
                 
 def read_into(program, solver, verbose=False):
 
+    for new_rule in make_rules(program, solver, verbose):
+        solver.rules.append(new_rule)
+
+
+def make_rules(program, solver, verbose=False):
+
     if verbose:
         print("Program: ", program)
     
@@ -481,10 +546,14 @@ def read_into(program, solver, verbose=False):
     if verbose:
         for r in rules:
             print("Rule: ", r)
+
+    new_rules = []
     
-    for rule_data in rules:
-        new_rule = make_rule(rule_data, solver)
+    for rule_data, scope in rules:
+        new_rule = make_rule(rule_data, solver, scope)
         if verbose:
             print(new_rule)
-        solver.rules.append(new_rule)
+        new_rules.append(new_rule)
+
+    return new_rules
 
@@ -83,10 +83,7 @@ for c in tree_constants:
     b, l, p = solver.literal_map[b], solver.literal_map[l], solver.literal_map[p]
     solver.solver.add_clause([b, l, p])
 
-for m in range(1, 101):
-    res = solver.solver.solve([m])
-    if res:
-        models.append(solver.solver.get_model())
+models = list(solver.iter_models(limit=100))
 
 for m in models:
     for a in m:
@@ -0,0 +1,250 @@
+import time
+from dataclasses import dataclass, field
+from math import prod
+
+from artale import models
+from artale.atoms import COMPARISONS
+
+DOT = "."
+
+# Approximate memory taken by a ground clause: an offset in the clause
+# arena and a clause header and two watches in the SAT solver, plus
+# four bytes per literal in each of them
+CLAUSE_BYTES = 8 + 24
+LITERAL_BYTES = 4 + 4
+
+# Number of assignments ground between budget checks
+BUDGET_CHECK = 2**10
+
+
+class BudgetExceeded(Exception):
+    '''
+
+    Raised when unfolding exceeds a Budget that does not skip rules,
+    with the budget's report as its message.
+
+    '''
+
+    def __init__(self, report):
+        super().__init__(report)
+        self.report = report
+
+
+@dataclass
+class Estimate:
+    '''
+
+    Upper bounds on the assignments, clauses and literals produced by
+    unfolding a rule (comparisons, tautologies and join grounding can
+    only reduce them).
+
+    '''
+
+    rule: "models.Rule"
+    assignments: int
+    clauses: int
+    literals: int
+
+    @property
+    def bytes(self):
+        return self.clauses * CLAUSE_BYTES + self.literals * LITERAL_BYTES
+
+
+def estimate(rule, solver):
+    '''
+
+    Estimate the size of the grounding of a rule over the current
+    members of the sorts in solver.sorts.
+
+    '''
+
+    size = lambda s: len(solver.sorts[s])
+    sort_of = dict(zip(rule.variables, rule.sorts))
+    loop = [v for v in rule.variables if not models.is_any(v)]
+
+    # The generic grounding path loops over 'any' variables too
+    if not solver.options.compiled_grounding:
+        loop = rule.variables
+
+    assignments = prod(size(sort_of[v]) for v in loop)
+
+    if rule.is_trivial():
+        return Estimate(rule, assignments, 0, 0)
+
+    def width(relation):
+
+        parts = [p.strip() for p in relation.parts]
+        symbols = {s.strip() for p in parts for s in p.split(DOT)}
+        expanded = [v for v in rule.variables if models.is_any(v) and v in symbols]
+
+        if len(parts) == 3 and parts[1] in COMPARISONS:
+            return 0
+
+        if expanded and solver.options.define_any:
+            return 1
+
+        return prod(size(sort_of[v]) for v in expanded)
+
+    body = sum(width(r) for r in rule.body)
+    heads = sum(width(h) for h in rule.heads)
+
+    if models.IS_DISJUNCTION in rule.flags or not heads:
+        clauses, literals = 1, body
+    else:
+        clauses, literals = heads, heads * (body + 1)
+
+    return Estimate(rule, assignments, assignments * clauses, assignments * literals)
+
+
+def plan(solver):
+    '''
+
+    Return the estimates of the rules HornSolver.unfold_instance() would
+    unfold (see HornSolver.prepare_rules()), in order.
+
+    '''
+
+    rules, _, _ = solver.prepare_rules()
+
+    return [estimate(rule, solver) for rule in rules]
+
+
+def report(estimates, statuses={}):
+    '''
+
+    Return a table with the estimates of a list of rules, followed by
+    their totals. 'statuses' maps positions in the list to a note shown
+    next to the rule (e.g. why it was skipped).
+
+    '''
+
+    lines = [f"{'assignments':>14} {'clauses':>14} {'MB':>10}  rule"]
+
+    for k, e in enumerate(estimates):
+        note = f"  [{statuses[k]}]" if k in statuses else ""
+        lines.append(f"{e.assignments:>14} {e.clauses:>14} "
+                     f"{e.bytes / 2**20:>10.1f}  {e.rule.as_string()}{note}")
+
+    clauses = sum(e.clauses for e in estimates)
+    size = sum(e.bytes for e in estimates) / 2**20
+    lines.append(f"{'total':>14} {clauses:>14} {size:>10.1f}")
+
+    return "\n".join(lines)
+
+
+@dataclass
+class Budget:
+    '''
+
+    Limits on the clauses, bytes (as estimated from the clauses and
+    literals added, see Estimate) and seconds spent by a call to
+    HornSolver.unfold_instance(). Limits left as None are not enforced.
+
+    Rules whose estimate alone exceeds a limit are not unfolded, and the
+    budget is checked while unfolding every BUDGET_CHECK assignments.
+    When a limit is exceeded, BudgetExceeded is raised, or, if 'skip' is
+    True, the rule being unfolded is cut off (keeping the clauses added
+    so far) and the remaining rules are skipped. Skipped and cut off
+    rules are listed in self.skipped, and their constraints are not
+    fully enforced by the solver.
+
+    '''
+
+    clauses: int = None
+    bytes: int = None
+    seconds: float = None
+    skip: bool = False
+    skipped: list = field(default_factory=list)
+
+    def start(self, solver, estimates):
+
+        self.solver = solver
+        self.estimates = estimates
+        self.statuses = {}
+        self.skipped = []
+        self.started = time.perf_counter()
+        self.first_clause = solver.clause_count
+        self.first_literal = solver.literal_count
+
+    def spent(self):
+
+        clauses = self.solver.clause_count - self.first_clause
+        literals = self.solver.literal_count - self.first_literal
+
+        return clauses, clauses * CLAUSE_BYTES + literals * LITERAL_BYTES
+
+    def excess(self, clauses, size, seconds):
+        '''
+
+        Return a description of the first limit exceeded by the given
+        amounts, or None.
+
+        '''
+
+        if self.clauses is not None and clauses > self.clauses:
+            return f"{clauses} clauses > {self.clauses}"
+
+        if self.bytes is not None and size > self.bytes:
+            return f"{size} bytes > {self.bytes}"
+
+        if self.seconds is not None and seconds > self.seconds:
+            return f"{seconds:.1f} seconds > {self.seconds}"
+
+        return None
+
+    def admit(self, k):
+        '''
+
+        Check if the k-th rule can be unfolded: neither its estimate nor
+        the resources spent so far exceed the budget.
+
+        '''
+
+        self.current = k
+        e = self.estimates[k]
+        reason = self.excess(e.clauses, e.bytes, 0)
+
+        if reason is not None:
+            return self.exceeded(f"estimate: {reason}")
+
+        return self.check()
+
+    def check(self):
+        '''
+
+        Check the resources spent so far while unfolding the current rule,
+        returning False (or raising BudgetExceeded) if they exceed the
+        budget.
+
+        '''
+
+        clauses, size = self.spent()
+        reason = self.excess(clauses, size, time.perf_counter() - self.started)
+
+        if reason is None:
+            return True
+
+        return self.exceeded(reason)
+
+    def exceeded(self, reason):
+
+        k = self.current
+
+        if k not in self.statuses:
+            self.statuses[k] = f"over budget, {reason}"
+            self.skipped.append(self.estimates[k].rule)
+
+        if not self.skip:
+            raise BudgetExceeded(self.report())
+
+        return False
+
+    def report(self):
+        '''
+
+        Return the estimates of the rules being unfolded, noting the rules
+        skipped or cut off for exceeding the budget.
+
+        '''
+
+        return report(self.estimates, self.statuses)
@@ -0,0 +1,248 @@
+from artale import joins, models
+from artale.atoms import COMPARISONS, is_negated, positive
+
+DOT = "."
+
+
+def relation_predicates(relation, sort_of, sorts):
+    '''
+
+    Return the set of names of the predicates a relation of a rule can
+    be about: its predicate, or every member of the sort of its
+    predicate variable. Comparisons are about no predicate.
+
+    '''
+
+    parts = [p.strip() for p in relation.parts]
+
+    if len(parts) == 3 and parts[1] in COMPARISONS:
+        return set()
+
+    name, _ = positive(parts[0])
+
+    if name in sort_of:
+        return set(sorts[sort_of[name]])
+
+    return {name}
+
+
+def rule_predicates(rule, sorts):
+    sort_of = dict(zip(rule.variables, rule.sorts))
+    return set().union(*[relation_predicates(r, sort_of, sorts)
+                         for r in rule.heads + rule.body])
+
+
+def predicate_graph(rules, sorts):
+    '''
+
+    Return a dictionary mapping the name of every predicate used in a
+    list of rules to the set of predicates used along with it in some
+    rule (itself included).
+
+    '''
+
+    graph = {}
+
+    for rule in rules:
+        names = rule_predicates(rule, sorts)
+        for name in names:
+            graph.setdefault(name, set()).update(names)
+
+    return graph
+
+
+def reachable(graph, names):
+    '''
+
+    Return the set of predicates connected to some predicate in 'names'
+    in a predicate graph.
+
+    '''
+
+    reached = set()
+    pending = [n for n in names if n in graph]
+
+    while pending:
+        name = pending.pop()
+        if name not in reached:
+            reached.add(name)
+            pending += graph[name] - reached
+
+    return reached
+
+
+def is_satisfiable_alone(rule):
+    '''
+
+    Check if every clause obtained from a rule has a positive literal
+    over one of its heads (or disjuncts, for disjunctions), so that the
+    clauses are satisfied by making every such atom true.
+
+    '''
+
+    def is_positive(relation):
+        parts = [p.strip() for p in relation.parts]
+        comparison = len(parts) == 3 and parts[1] in COMPARISONS
+        return not comparison and not is_negated(parts[0])
+
+    if models.IS_DISJUNCTION in rule.flags:
+        return any(is_positive(r) for r in rule.body)
+
+    return bool(rule.heads) and all(is_positive(h) for h in rule.heads)
+
+
+def irrelevant_rules(rules, sorts, queries, denied):
+    '''
+
+    Return the set of positions of the rules in a list whose predicates
+    are not connected to any predicate in 'queries' in the predicate
+    graph, and whose connected component can be satisfied regardless of
+    the rest of the program: every rule in it is satisfiable alone (see
+    is_satisfiable_alone()) and no predicate in it has been asserted
+    false (the names in 'denied'). Dropping these rules preserves the
+    satisfiability of the program and its models over the remaining
+    predicates.
+
+    '''
+
+    graph = predicate_graph(rules, sorts)
+    relevant = reachable(graph, queries)
+    predicates = [rule_predicates(rule, sorts) for rule in rules]
+
+    irrelevant = set()
+    seen = set(relevant)
+
+    for name in graph:
+
+        if name in seen:
+            continue
+
+        component = reachable(graph, [name])
+        seen |= component
+
+        members = [k for k, names in enumerate(predicates)
+                   if names and names <= component]
+
+        if component & set(denied):
+            continue
+
+        if all(is_satisfiable_alone(rules[k]) for k in members):
+            irrelevant.update(members)
+
+    return irrelevant
+
+
+def dead_predicates(rules, sorts, asserted):
+    '''
+
+    Return the set of names of predicates used in a list of rules that
+    are never the head of a rule or a disjunct of a disjunction (see
+    joins.open_predicates()) and have no asserted atoms (the names in
+    'asserted'), which are always false when atoms over such predicates
+    only hold if asserted.
+
+    '''
+
+    used = set()
+    for rule in rules:
+        used |= rule_predicates(rule, sorts)
+
+    open_names = joins.open_predicates(rules, sorts)
+    open_names.add(models.AUXILIARY)
+
+    return used - open_names - set(asserted)
+
+
+def used_variables(rule, relations):
+    symbols = {positive(s.strip())[0] for r in relations
+               for p in r.parts for s in p.split(DOT)}
+    return [v for v in rule.variables if v in symbols]
+
+
+def remove_dead(rule, dead):
+    '''
+
+    Simplify a rule assuming the predicates in 'dead' are always false:
+    return None if a relation in its body is over one of them (so its
+    clauses are satisfied), and otherwise drop the negated relations
+    over them from its body, along with the variables only they used.
+
+    Disjunctions and relations with predicate variables are kept.
+
+    '''
+
+    if models.IS_DISJUNCTION in rule.flags:
+        return rule
+
+    body = []
+
+    for relation in rule.body:
+
+        name, sign = positive(relation.parts[0].strip())
+
+        if name not in dead:
+            body.append(relation)
+        elif sign > 0:
+            return None
+
+    if len(body) == len(rule.body):
+        return rule
+
+    variables = used_variables(rule, rule.heads + body)
+    sort_of = dict(zip(rule.variables, rule.sorts))
+
+    return models.Rule(
+        list(rule.heads),
+        body,
+        [sort_of[v] for v in variables],
+        variables,
+        rule.solver, {}, set(rule.flags)
+    )
+
+
+def prune(rules, sorts, asserted=(), denied=(), queries=None, closed=False):
+    '''
+
+    Drop or simplify the rules in a list that cannot affect the atoms
+    that matter, and return the remaining rules along with a report: a
+    list of tuples (rule, replacement, reason) for every rule dropped
+    (with replacement None) or simplified.
+
+    If 'queries' is a set of predicate names, the rules that are
+    irrelevant to them are dropped (see irrelevant_rules()). 'denied' is
+    the set of names of predicates with atoms asserted false.
+
+    If 'closed' is True, atoms over predicates which are never the head
+    of a rule can only hold if they are asserted (as in the join
+    grounding mode), and rules are simplified assuming the predicates
+    without asserted atoms (the names in 'asserted') are false (see
+    dead_predicates() and remove_dead()).
+
+    '''
+
+    report = []
+
+    if queries is not None:
+        irrelevant = irrelevant_rules(rules, sorts, queries, denied)
+        report += [(rules[k], None, "irrelevant to queries")
+                   for k in sorted(irrelevant)]
+        rules = [r for k, r in enumerate(rules) if k not in irrelevant]
+
+    if closed:
+
+        dead = dead_predicates(rules, sorts, asserted)
+        kept = []
+
+        for rule in rules:
+
+            simplified = remove_dead(rule, dead)
+
+            if simplified is not rule:
+                report.append((rule, simplified, "always false predicates"))
+
+            if simplified is not None:
+                kept.append(simplified)
+
+        rules = kept
+
+    return rules, report
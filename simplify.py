@@ -0,0 +1,276 @@
+from artale.clauses import ClauseArena
+
+
+class Simplification:
+    '''
+
+    The result of simplifying a ground CNF formula (see simplify()): the
+    simplified clauses, numbered densely from 1, the values fixed by
+    unit propagation, and the maps between the original and the new
+    variables.
+
+    If unit propagation finds a conflict, self.satisfiable is False and
+    self.clauses is empty.
+
+    self.statistics holds the number of clauses, literals and variables
+    in the input formula (see Simplification.report()).
+
+    '''
+
+    def __init__(self, clauses, fixed, satisfiable, statistics={}):
+
+        self.fixed = fixed
+        self.satisfiable = satisfiable
+        self.statistics = statistics
+        self.old_variables = [0]
+        self.new_variables = {}
+        self.clauses = ClauseArena()
+
+        used = sorted({abs(l) for c in clauses for l in c})
+
+        for v in used:
+            self.new_variables[v] = len(self.old_variables)
+            self.old_variables.append(v)
+
+        for c in clauses:
+            self.clauses.append(self.renumber(c))
+
+    def renumber(self, clause):
+        new = self.new_variables
+        return [new[l] if l > 0 else -new[-l] for l in clause]
+
+    def translate(self, clause):
+        '''
+
+        Return a clause over the original variables as a clause over the
+        new ones, or None if it is satisfied by the fixed values. Fixed
+        false literals are dropped, and variables not seen before get new
+        numbers.
+
+        '''
+
+        fixed = self.fixed
+        literals = []
+
+        for l in dict.fromkeys(clause):
+
+            v = abs(l)
+
+            if v in fixed:
+                if fixed[v] == (l > 0):
+                    return None
+                continue
+
+            if v not in self.new_variables:
+                self.new_variables[v] = len(self.old_variables)
+                self.old_variables.append(v)
+
+            literals.append(l)
+
+        return self.renumber(literals)
+
+    def assumption(self, literal):
+        '''
+
+        Translate a literal over the original variables, returning True or
+        False if its variable has a fixed value or occurs in no clause
+        (and can take any value, so the literal is satisfiable).
+
+        '''
+
+        v = abs(literal)
+
+        if v in self.fixed:
+            return self.fixed[v] == (literal > 0)
+
+        if v not in self.new_variables:
+            return True
+
+        return self.renumber([literal])[0]
+
+    def report(self):
+        '''
+
+        Return a readable summary of the variables eliminated and the size
+        of the formula before and after simplifying it.
+
+        '''
+
+        statistics = self.statistics
+        true = sum(1 for value in self.fixed.values() if value)
+        remaining = len(self.old_variables) - 1
+        vanished = statistics["variables"] - len(self.fixed) - remaining
+        literals = len(self.clauses.literals)
+
+        return "\n".join([
+            f"{len(self.fixed)} of {statistics['variables']} variables fixed "
+            f"({true} true, {len(self.fixed) - true} false), "
+            f"{vanished} only in satisfied clauses",
+            f"clauses: {statistics['clauses']} -> {len(self.clauses)}, "
+            f"literals: {statistics['literals']} -> {literals}",
+        ])
+
+    def model(self, model, top, assumptions=()):
+        '''
+
+        Translate a model over the new variables into a model over the
+        original variables 1 ... top. Variables that were removed along
+        with every clause they occurred in take the value given by a
+        literal in 'assumptions', or else are set to false.
+
+        '''
+
+        values = {}
+
+        for l in model:
+            if abs(l) < len(self.old_variables):
+                values[self.old_variables[abs(l)]] = l > 0
+
+        for l in assumptions:
+            values.setdefault(abs(l), l > 0)
+
+        values.update(self.fixed)
+
+        return [v if values.get(v, False) else -v for v in range(1, top + 1)]
+
+
+def simplify(clauses, subsumption=True):
+    '''
+
+    Simplify a CNF formula (an iterable of clauses given as sequences of
+    DIMACS literals) by
+
+    - removing repeated literals, tautologies and duplicate clauses,
+    - propagating unit clauses (e.g. asserted facts), which removes the
+      clauses they satisfy and the literals they falsify,
+    - removing clauses subsumed by other clauses, unless 'subsumption'
+      is False (the other steps take linear time),
+
+    and renumbering the variables left densely. Return a Simplification.
+
+    '''
+
+    unique = {}
+    statistics = {"clauses": 0, "literals": 0}
+    variables = set()
+
+    for c in clauses:
+        literals = frozenset(c)
+        statistics["clauses"] += 1
+        statistics["literals"] += len(c)
+        variables.update(abs(l) for l in literals)
+        if not any(-l in literals for l in literals):
+            unique.setdefault(literals, None)
+
+    statistics["variables"] = len(variables)
+    fixed, remaining = propagate(list(unique))
+
+    if remaining is None:
+        return Simplification([], fixed, False, statistics)
+
+    if subsumption:
+        remaining = subsume(remaining)
+
+    remaining = [sorted(c, key=abs) for c in remaining]
+
+    return Simplification(remaining, fixed, True, statistics)
+
+
+def propagate(clauses):
+    '''
+
+    Propagate the unit clauses in a list of clauses (frozensets of
+    literals). Return a dictionary with the values fixed for variables,
+    and the list of clauses that are neither satisfied nor units, without
+    their false literals (or None if some clause becomes empty).
+
+    Every clause keeps a count of its literals that are not false, so
+    each occurrence of a literal is visited a bounded number of times and
+    propagation takes time linear in the size of the formula. On Horn
+    clauses this derives every atom forced by the facts and definite
+    clauses, and the atoms forced false by bodies of constraints whose
+    other atoms hold.
+
+    '''
+
+    occurrences = {}
+
+    for i, c in enumerate(clauses):
+        for l in c:
+            occurrences.setdefault(l, []).append(i)
+
+    free = [len(c) for c in clauses]
+    satisfied = bytearray(len(clauses))
+    fixed = {}
+    queue = [next(iter(c)) for c in clauses if len(c) == 1]
+
+    if 0 in free:
+        return fixed, None
+
+    while queue:
+
+        l = queue.pop()
+        v = abs(l)
+
+        if v in fixed:
+            if fixed[v] != (l > 0):
+                return fixed, None
+            continue
+
+        fixed[v] = l > 0
+
+        for i in occurrences.get(l, ()):
+            satisfied[i] = True
+
+        for i in occurrences.get(-l, ()):
+
+            if satisfied[i]:
+                continue
+
+            free[i] -= 1
+
+            if not free[i]:
+                return fixed, None
+
+            if free[i] == 1:
+                queue += [k for k in clauses[i] if abs(k) not in fixed]
+
+    remaining = [
+        frozenset(l for l in c if abs(l) not in fixed)
+        for i, c in enumerate(clauses) if not satisfied[i]
+    ]
+
+    return fixed, list(dict.fromkeys(remaining))
+
+
+def subsume(clauses):
+    '''
+
+    Remove every clause that is a strict superset of another clause from
+    a list of distinct clauses (frozensets of literals), keeping the
+    order of the rest.
+
+    '''
+
+    occurrences = {}
+
+    for i, c in enumerate(clauses):
+        for l in c:
+            occurrences.setdefault(l, []).append(i)
+
+    subsumed = [False] * len(clauses)
+
+    for i in sorted(range(len(clauses)), key=lambda i: len(clauses[i])):
+
+        if subsumed[i]:
+            continue
+
+        c = clauses[i]
+        rarest = min(c, key=lambda l: len(occurrences[l]))
+
+        for j in occurrences[rarest]:
+            if j != i and not subsumed[j] and len(clauses[j]) > len(c):
+                if c <= clauses[j]:
+                    subsumed[j] = True
+
+    return [c for i, c in enumerate(clauses) if not subsumed[i]]
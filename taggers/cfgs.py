@@ -167,8 +167,6 @@ def make_instance(pos, neg):
         for string in local_sorts.keys():
             local_restrictions = local_sorts[string]
             solver.unfold_rule(local_rule, local_restrictions)
-            
-    solver.unfold_una()
     
     print("Unfolded instance, solving...")
     
@@ -2,7 +2,7 @@ from collections import defaultdict
 from math import log
 
 from artale.models import HornSolver
-from artale.parser import read_into
+from artale.parser import read_into, make_rules
 from artale.scaffoldings import tree
 from artale.constants import *
 
@@ -101,6 +101,7 @@ class MapTagger:
         self.theory = ""
         
         self.solver = HornSolver()
+        self.solver.options.rule_selectors = True
         
         self.program = sample
 
@@ -130,8 +131,7 @@ class MapTagger:
             self.solver.show_model(self.models[self.model_index])
 
         elif symbol == pyglet.window.key.ENTER and self.on_editor:
-            if self.models == []:
-                self.update_models()
+            self.update_models()
     
     def update_atlas_reference(self, specs_path):
         '''Open the text file at specs_path (each line should consist of
@@ -206,22 +206,17 @@ class MapTagger:
     
         self.models = []
 
-        self.solver = HornSolver()
-
-        read_into(self.program, self.solver)
-        
-        self.unfold_trees(10, 10)
-        self.solver.unfold_instance()
+        # The program is only unfolded the first time; later, only the
+        # rules that changed are retired or unfolded, and the solver is kept
+        if self.solver.unfolded_sizes is None:
+            read_into(self.program, self.solver)
+            self.unfold_trees(10, 10)
+            self.solver.unfold_instance()
+        else:
+            self.solver.update_rules(make_rules(self.program, self.solver))
 
-        distinct_atoms = {atom for atom in self.solver.literal_map.keys()}
+        self.models = list(self.solver.iter_models(limit=100))
 
-        self.solver.unfold_una()
-
-        for m in range(1, 101):
-            res = self.solver.solver.solve([m])
-            if res:
-                self.models.append(self.solver.solver.get_model())
-                
         print(len(self.models))
 
     def unfold_trees(self, width, height):
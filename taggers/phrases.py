@@ -12,7 +12,6 @@ solver = HornSolver()
 solver.fill_sort(node_sort, tree_size)
 read_into(trees_spec, solver)
 solver.unfold_instance()
-solver.unfold_una()
 
 sat, model = solver.get_model()
 readable_model = solver.show_model(model)
@@ -1,7 +1,7 @@
 from artale.constants import *
 
 from artale.parser import read_into, normalize
-from artale.models import Relation, Rule, Clause, HornSolver, TERM_SEPARATOR
+from artale.models import Relation, Rule, HornSolver, TERM_SEPARATOR
 from artale.scaffoldings import tree, binary_tree
 from artale.specs import trees as trees_spec
 from artale.specs import types as types_spec
@@ -74,38 +74,8 @@ solver.add_assertion("root node1")
 
 for f in tree_facts:
 
-    # Turn the relation triple into a clause
-    clause_literal = " ".join(f)
-
-    # Check if the literal is negated
-    is_assertion = "not " != clause_literal[:4]
-    is_negation = not is_assertion
-
-    # If the literal is positive, add it as an assertion /
-    # horn clause with a single positive atom.
-    
-    # If it's not, add it as a negative assertion /
-    # headless clause with just one body atom.
-    
-    print("clause literal: ", clause_literal)
-
-    if is_assertion:
-
-        solver.add_assertion(clause_literal)
-
-    if is_negation:
-        
-        # Get the non-negated version of the literal
-        positive_literal = clause_literal[4:]
-
-        # Turn it into a clause
-        tree_clause = Clause("", [positive_literal])
-
-        # Update solver literal maps
-        solver.update_maps([tree_clause])
-
-        # Add dimacs form of that clause to solver
-        solver.solver.add_clause(solver.dimacs(tree_clause))
+    # Negated facts ("not ...") are added as negative literals
+    solver.add_assertion(" ".join(f))
 
 # Make DRS and type constant for each node,
 # adding their arguments (for DRS) and a small
@@ -206,12 +176,6 @@ solver.unfold_instance()
 
 print("Done\n")
 
-print("Unfolding equality...")
-
-solver.unfold_una()
-
-print("Done\n")
-
 
 for c in solver.cnf_clauses:
     print(c)
@@ -222,26 +186,24 @@ for c in solver.cnf_clauses:
 
 print("Looking for models...\n")
 
-# If the program is run as main, print a few models, provided
-# some are found when fixing any of the literals from 1 to 300
-# as true. This is bodge as well, so please fix it too - TODO
+# If the program is run as main, print a few distinct models
 
 if __name__ == "__main__":
 
-    for i in range(1, 300):
-        res = solver.solver.solve([i])
-        if res:
-            print(f"Instance is satisfiable when fixing atom {i} to true")
-            m = solver.solver.get_model()
-            tree_facts = set()
-            for a in m:
-                if abs(a) in solver.reverse_literal_map:
-                    readable_atom = solver.reverse_literal_map[abs(a)]
-                    if "=" not in readable_atom and a > 0:
-                        tree_facts.add(readable_atom)
-                    if "=" not in readable_atom and a < 0:
-                        tree_facts.add("- " + readable_atom)
-            print("\n".join(sorted(list(tree_facts))), "\n")
-            print(len(m), "", len([a for a in m if a > 0]))
-        else:
-            print(f"\nInstance is not satisfiable when fixing atom {i} ({solver.reverse_literal_map[i]}) to true!!\n")
+    found = 0
+
+    for m in solver.iter_models(limit=10):
+        found += 1
+        tree_facts = set()
+        for a in m:
+            if abs(a) in solver.reverse_literal_map:
+                readable_atom = solver.reverse_literal_map[abs(a)]
+                if "=" not in readable_atom and a > 0:
+                    tree_facts.add(readable_atom)
+                if "=" not in readable_atom and a < 0:
+                    tree_facts.add("- " + readable_atom)
+        print("\n".join(sorted(list(tree_facts))), "\n")
+        print(len(m), "", len([a for a in m if a > 0]))
+
+    if not found:
+        print("\nInstance is not satisfiable!!\n")
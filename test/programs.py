@@ -0,0 +1,100 @@
+import os
+
+from artale.models import HornSolver
+from artale.parser import read_into
+
+SPECS = os.path.join(os.path.dirname(__file__), "..", "specs")
+
+EXCLUSIVE = '''
+at (c : ch, t : tile), at (c, s : tile), t != s => False
+'''
+
+PLACED = '''
+not at (c : ch, any : tile) => False
+'''
+
+NOWHERE = '''
+at (c : ch, t : tile) v nowhere (c)
+
+not at (c : ch, any : tile) => lost (c)
+'''
+
+MOVES = '''
+free (t : tile) => free (t.next)
+
+at (c : ch, t : tile), go (c, d : dir), free (t.d) => at (c.next, t.d)
+'''
+
+PLACEMENT = EXCLUSIVE + PLACED + '''
+at (c : ch, t : tile) => seen (t)
+'''
+
+RELATIONS = '''
+rel : relation (t : tile, s : tile), near (t, s) => rel (s, t)
+'''
+
+def read_spec(name):
+    with open(os.path.join(SPECS, name)) as spec:
+        return spec.read()
+
+def make_solver(program, sizes, **flags):
+    '''
+
+    Return a HornSolver with the given flags set (grounding options, see
+    models.GroundingOptions, or solver attributes like 'queries'),
+    holding the rules of a program and its sorts filled to the given
+    sizes.
+
+    '''
+
+    solver = HornSolver()
+    for flag, value in flags.items():
+        target = solver.options if hasattr(solver.options, flag) else solver
+        assert hasattr(target, flag), f"Unknown flag {flag}"
+        setattr(target, flag, value)
+    read_into(program, solver)
+    for sort, n in sizes.items():
+        solver.fill_sort(sort, n)
+    return solver
+
+def make_world(program, tiles, **flags):
+    '''
+
+    Return a solver for a program over tiles on a cycle (t.next,
+    t.left and t.right), two characters ch1 and ch2 (c.next), two
+    directions and two relations.
+
+    '''
+
+    solver = make_solver(program, {"tile": tiles, "ch": 2}, **flags)
+    solver.sorts["dir"] = ["left", "right"]
+    solver.sorts["relation"] = ["touch", "see"]
+    for i in range(tiles):
+        solver.assign("next", f"tile{i + 1}", f"tile{(i + 1) % tiles + 1}")
+        solver.assign("left", f"tile{i + 1}", f"tile{(i - 1) % tiles + 1}")
+        solver.assign("right", f"tile{i + 1}", f"tile{(i + 1) % tiles + 1}")
+    solver.assign("next", "ch1", "ch2")
+    solver.assign("next", "ch2", "ch1")
+    return solver
+
+def ground_trees(n=4, **flags):
+    solver = make_solver(read_spec("trees"), {"node": n}, **flags)
+    solver.unfold_instance()
+    return solver
+
+def atom_names(solver):
+    return sorted(a for a in solver.literal_map.keys() if a.split()[0] != "not")
+
+def answers(solver, names, assumptions=()):
+    '''
+
+    Map each atom name to whether some model of the solver satisfies it
+    along with the assumptions. Atoms the solver never created (e.g.
+    closed atoms under join grounding) are false in all of its models.
+
+    '''
+
+    return {
+        n: n in solver.literal_map and solver.model_with([n, *assumptions])[0]
+        for n in names
+    }
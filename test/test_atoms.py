@@ -0,0 +1,84 @@
+import pytest
+
+from artale.atoms import AtomTable
+from artale.models import HornSolver
+from artale.parser import read_into
+
+def test_interning():
+    atoms = AtomTable()
+    a = atoms.literal(["has child", "node1", "node2"])
+    b = atoms.literal(["has child", "node1", "node2"])
+    c = atoms.literal(["node1", "!=", "node2"])
+    assert a == b == 1
+    assert c == 2
+    assert atoms.render(a) == "has child node1 node2"
+    assert atoms.render(c) == "node1 != node2"
+    assert atoms.names(a) == ("has child", "node1", "node2")
+
+def test_parse_with_spaces():
+    atoms = AtomTable()
+    atoms.learn_predicate("has child", 2)
+    atoms.sort("node", ["node one", "node two"])
+    key = atoms.parse("has child node one node two", create=True)
+    assert atoms.names(atoms.add(key)) == ("has child", "node one", "node two")
+    assert atoms.parse("has child node one node three") is None
+
+def test_literal_map_views():
+    solver = HornSolver()
+    read_into("before (a : node, b : node) => after (b, a)", solver)
+    solver.fill_sort("node", 3)
+    solver.add_assertion("before node1 node2")
+    solver.unfold_instance()
+    assert "after node2 node1" in solver.literal_map
+    before = solver.literal_map["before node1 node2"]
+    assert solver.reverse_literal_map[before] == "before node1 node2"
+    assert len(solver.literal_map) == 18
+    sat, model = solver.get_model()
+    assert sat
+    assert ("after", "node2", "node1") in solver.get_relations(model, ["after"])
+
+def test_block_numbering():
+    solver = HornSolver()
+    read_into("at (c : character, t : tile) => visited (t)", solver)
+    solver.fill_sort("character", 2)
+    solver.fill_sort("tile", 3)
+    solver.unfold_instance()
+    block = solver.block_signatures["at", ("character", "tile")]
+    at = solver.literal_map["at character2 tile3"]
+    assert at == block.base + 1 * 3 + 2
+    assert solver.reverse_literal_map[at] == "at character2 tile3"
+    visited = solver.literal_map["visited tile2"]
+    assert [visited, -(block.base + 1)] in [c.tolist() for c in solver.cnf_clauses]
+
+def test_blocks_respect_existing_atoms():
+    solver = HornSolver()
+    read_into("p (a : s) => q (a)", solver)
+    solver.fill_sort("s", 3)
+    solver.add_assertion("p s2")
+    solver.unfold_instance()
+    assert solver.block_signatures["p", ("s",)] is None
+    assert solver.literal_map["p s2"] == 1
+    assert len(solver.cnf_clauses) == 4
+
+def test_native_negation():
+    solver = HornSolver()
+    read_into('''p (a : s) v not p (a)
+
+p (a : s), not p (a) => False
+
+q (a : s), not p (a) => r (a)
+''', solver)
+    solver.fill_sort("s", 2)
+    solver.add_assertion("not p s1")
+    solver.unfold_instance()
+    p = solver.literal_map["p s1"]
+    assert solver.literal_map["not p s1"] == -p
+    assert "not p s1" in solver.literal_map
+    assert not any(a.startswith("not ") for a in solver.literal_map)
+    clauses = [set(c.tolist()) for c in solver.cnf_clauses]
+    assert {-p} in clauses
+    assert {solver.literal_map["r s1"], p, -solver.literal_map["q s1"]} in clauses
+    assert len(clauses) == 3
+    sat, model = solver.model_with(["q s1"])
+    assert sat
+    assert ("r", "s1") in solver.get_relations(model, ["r"])
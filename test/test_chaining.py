@@ -0,0 +1,85 @@
+import pytest
+
+from artale.chaining import LeastModel, is_horn
+from artale.test.programs import answers, atom_names, ground_trees, make_solver
+
+PROGRAM = '''
+edge (a : n, b : n) => path (a, b)
+
+path (a : n, b : n), edge (b, c : n) => path (a, c)
+
+path (a : n, b : n), a = b => cyclic (a)
+
+blocked (a : n), path (a, b : n) => False
+'''
+
+CHOICE = '''
+at (a : n) v away (a)
+'''
+
+QUERIES = [
+    [],
+    ["path n1 n3"],
+    ["not path n1 n3"],
+    ["not path n3 n1"],
+    ["edge n3 n1", "cyclic n2"],
+    ["edge n3 n1", "not cyclic n2"],
+    ["blocked n3"],
+    ["blocked n1"],
+    ["blocked n3", "edge n3 n1"],
+]
+
+def solver(text=PROGRAM, chaining=True):
+    solver = make_solver(text, {"n": 4}, forward_chaining=chaining)
+    solver.add_assertion("edge n1 n2")
+    solver.add_assertion("edge n2 n3")
+    return solver
+
+def test_least_model():
+    horn = solver()
+    horn.unfold_instance()
+    names = {horn.reverse_literal_map[v] for v in horn.least_model.variables}
+    assert names == {
+        "edge n1 n2", "edge n2 n3",
+        "path n1 n2", "path n2 n3", "path n1 n3",
+    }
+    model = horn.least_model.copy()
+    model.extend([horn.atoms.key_of(horn.literal_map["edge n3 n1"])])
+    assert horn.literal_map["cyclic n1"] in model.variables
+    assert horn.literal_map["cyclic n1"] not in horn.least_model.variables
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_horn_queries(query):
+    horn = solver()
+    full = solver(chaining=False)
+    horn.unfold_instance()
+    full.unfold_instance()
+    assert is_horn(horn.rules)
+    assert horn.horn_clauses == horn.clause_count
+    sat, model = horn.model_with(query)
+    assert sat == full.model_with(query)[0]
+    if sat:
+        true = {l for l in model if l > 0}
+        assert all(any((l > 0) == (abs(l) in true) for l in c)
+                   for c in horn.cnf_clauses)
+
+def test_non_horn_programs():
+    mixed = solver(PROGRAM + CHOICE)
+    mixed.unfold_instance()
+    assert not is_horn(mixed.rules)
+    assert mixed.horn_clauses is None
+    assert [mixed.literal_map["path n1 n3"]] in mixed.cnf_clauses.tolist()
+    assert mixed.model_with(["not path n1 n3"]) == (False, [])
+
+def test_added_clauses():
+    horn = solver()
+    horn.unfold_instance()
+    horn.add_clause([-horn.literal_map["cyclic n4"]])
+    assert horn.horn_clauses != horn.clause_count
+    assert horn.model_with(["edge n4 n4"])[0] is False
+
+def test_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    chained = ground_trees(forward_chaining=True)
+    assert answers(chained, names) == answers(plain, names)
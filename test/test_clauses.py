@@ -0,0 +1,74 @@
+import pytest
+
+from artale.clauses import ClauseArena, DimacsWriter
+from artale.models import HornSolver
+from artale.parser import read_into
+
+def test_arena():
+    arena = ClauseArena([[1, -2], [3], [-1, 2, -3]])
+    arena.append([4, 5])
+    assert len(arena) == 4
+    assert arena[1].tolist() == [3]
+    assert arena[-1].tolist() == [4, 5]
+    assert arena[1:3].tolist() == [[3], [-1, 2, -3]]
+    assert [len(c) for c in arena] == [2, 1, 3, 2]
+    with pytest.raises(IndexError):
+        arena[4]
+
+def test_extend_flat():
+    arena = ClauseArena([[1]])
+    arena.extend_flat([2, -3, 4, 5, -6, 7], [2, 1, 3])
+    assert arena.tolist() == [[1], [2, -3], [4], [5, -6, 7]]
+
+def test_extend_matrix():
+    np = pytest.importorskip("numpy")
+    arena = ClauseArena([[1]])
+    arena.extend_matrix(np.array([[2, -3], [4, -5]], dtype=np.int32))
+    arena.extend_matrix(np.zeros((0, 2), dtype=np.int32))
+    assert arena.tolist() == [[1], [2, -3], [4, -5]]
+    assert arena.nbytes == 5 * 4 + 4 * 8
+
+def test_solver_clauses():
+    solver = HornSolver()
+    read_into("p (a : s) => q (a)", solver)
+    solver.fill_sort("s", 2)
+    solver.add_assertion("p s1")
+    solver.unfold_instance()
+    assert isinstance(solver.cnf_clauses, ClauseArena)
+    assert len(solver.show_clauses()) == 3
+    assert '"clauses": [[1]' in solver.serialize()
+
+def test_dimacs_writer(tmp_path):
+    from pysat.formula import CNF
+    path = tmp_path / "instance.cnf"
+    solver = HornSolver()
+    read_into("p (a : s) => q (a)\n\nq (a : s), r (a) => False", solver)
+    solver.fill_sort("s", 3)
+    reference = HornSolver()
+    read_into("p (a : s) => q (a)\n\nq (a : s), r (a) => False", reference)
+    reference.fill_sort("s", 3)
+    reference.unfold_instance()
+    with DimacsWriter(path, buffer_size=2) as writer:
+        solver.options.retain_clauses = False
+        solver.options.feed_solver = False
+        solver.sinks.append(writer)
+        solver.unfold_instance()
+    assert len(solver.cnf_clauses) == 0
+    cnf = CNF(from_file=str(path))
+    assert cnf.clauses == reference.cnf_clauses.tolist()
+    assert cnf.nv == len(reference.atoms)
+    assert open(path).readline().split() == ["p", "cnf", "9", "6"]
+
+def test_batched_ingestion():
+    solver = HornSolver()
+    solver.options.batch_size = 4
+    read_into("p (a : s) => q (a)", solver)
+    solver.fill_sort("s", 10)
+    solver.unfold_instance()
+    assert len(solver.pending_clauses) == 2
+    assert solver.solver.nof_clauses() == 10
+    assert not solver.pending_clauses
+    solver.add_assertion("p s1")
+    sat, model = solver.get_model()
+    assert sat
+    assert solver.literal_map["q s1"] in model
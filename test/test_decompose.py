@@ -0,0 +1,80 @@
+import pytest
+
+from artale.decompose import decompose, decompose_rules
+from artale.models import HornSolver
+from artale.parser import read_into
+
+PROGRAM = '''
+edge (a : n, b : n), edge (b, c : n), edge (c, d : n), mark (d) => reach (a)
+
+edge (a : n, b : n), edge (b, c : n), edge (c, a) => False
+'''
+
+FUNCTIONAL = '''
+at (c : ch, t : n), go (c, d : n), blocked (t.d) => bonk (c)
+'''
+
+def rules():
+    solver = HornSolver()
+    read_into(PROGRAM + FUNCTIONAL, solver)
+    return solver.rules
+
+def test_decompose():
+    chain, cycle, functional = rules()
+    parts = decompose(chain, {"n": 10}, "split")
+    assert [p.as_string() for p in parts] == [
+        "edge c d, mark d => split 1 c",
+        "edge b c, split 1 c => split 2 b",
+        "edge a b, split 2 b => reach a",
+    ]
+    assert [p.variables for p in parts] == [["c", "d"], ["b", "c"], ["a", "b"]]
+    assert decompose(cycle, {"n": 10}, "split") == [cycle]
+    assert decompose(functional, {"n": 10, "ch": 2}, "split") == [functional]
+    assert decompose(chain, {"n": 1}, "split") == [chain]
+
+def test_decomposition_report():
+    unfolded, report = decompose_rules(rules(), {"n": 10, "ch": 2})
+    assert len(unfolded) == 5
+    assert [(before, after) for _, _, before, after in report] == [(10000, 300)]
+
+@pytest.mark.parametrize("join", [False, True])
+def test_decomposed_unfolding(join):
+    solvers = []
+    for split in [False, True]:
+        solver = HornSolver()
+        solver.options.decompose_rules = split
+        solver.options.join_grounding = join
+        read_into(PROGRAM, solver)
+        solver.fill_sort("n", 5)
+        for a, b in [(1, 2), (2, 3), (3, 4)]:
+            solver.add_assertion(f"edge n{a} n{b}")
+        solver.add_assertion("mark n4")
+        solver.unfold_instance()
+        solvers.append(solver)
+    assert "1 rules split: 625 -> 75 assignments" in solvers[1].decomposition_report()
+    for name in ["reach n1", "reach n2", "reach n4"]:
+        for literals in [[name], ["not " + name]]:
+            assert solvers[0].model_with(literals)[0] == solvers[1].model_with(literals)[0]
+
+def test_opt_in():
+    solver = HornSolver()
+    read_into(PROGRAM, solver)
+    solver.fill_sort("n", 5)
+    solver.unfold_instance()
+    assert solver.decompositions == []
+    assert not any(n.startswith("#split") for n in solver.literal_map.keys())
+
+def test_reserved_names():
+    solver = HornSolver()
+    solver.options.decompose_rules = True
+    read_into(PROGRAM + "\nmark (a : n) => split1 (a)\n", solver)
+    solver.fill_sort("n", 5)
+    solver.add_assertion("mark n1")
+    solver.unfold_instance()
+    assert [p.heads[0].parts[0] for p in solver.decompositions[0][1][:-1]] == [
+        "#split1 1", "#split1 2",
+    ]
+    assert "split1" not in solver.auxiliary_predicates()
+    assert "split1 n1" in solver.show_model(solver.model_with([])[1])
+    with pytest.raises(AssertionError):
+        read_into("p (a : n) => #split1 (a)", HornSolver())
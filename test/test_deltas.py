@@ -0,0 +1,89 @@
+import pytest
+
+from artale.deltas import delta_ranges, delta_indices, delta_assignments
+from artale.test.programs import (
+    EXCLUSIVE, NOWHERE, answers, atom_names, ground_trees, make_solver,
+)
+
+PROGRAM = EXCLUSIVE + NOWHERE + '''
+near (t : tile, s : tile), at (c : ch, t) => seen (c, s)
+'''
+
+def test_delta_ranges():
+    assert delta_ranges([3, 2], [3, 2]) == []
+    assert delta_ranges([4, 2], [3, 1]) == [
+        (range(3, 4), range(2)),
+        (range(3), range(1, 2)),
+    ]
+    indices = list(delta_indices([3, 3], [2, 2]))
+    assert len(indices) == len(set(indices)) == 9 - 4
+    assert all(max(i, j) == 2 for i, j in indices)
+
+def test_delta_assignments():
+    assignments = list(delta_assignments([[7, 8], [5, 6, 9]], [2, 2]))
+    assert assignments == [(0, 7, 2, 9), (1, 8, 2, 9)]
+
+def named_clauses(solver):
+    reverse = solver.reverse_literal_map
+    return {
+        frozenset(("-" if l < 0 else "") + reverse[abs(l)] for l in c)
+        for c in solver.cnf_clauses
+    }
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_unfold_delta(compiled):
+    solver = make_solver(PROGRAM, {"tile": 2, "ch": 1}, compiled_grounding=compiled)
+    solver.add_assertion("near tile1 tile2")
+    solver.unfold_instance()
+    solver.unfold_una()
+    solver.fill_sort("tile", 4)
+    solver.add_element("ch", "hero")
+    solver.unfold_delta()
+    reference = make_solver(PROGRAM, {"tile": 4, "ch": 1}, compiled_grounding=compiled)
+    reference.add_element("ch", "hero")
+    reference.add_assertion("near tile1 tile2")
+    reference.unfold_instance()
+    reference.unfold_una()
+    assert named_clauses(solver) == named_clauses(reference)
+    assert len(solver.any_clauses) == 1
+    sat, model = solver.model_with(["at hero tile4", "not lost hero"])
+    assert sat
+    nowhere = [f"not at hero tile{i}" for i in range(1, 5)]
+    assert solver.model_with(nowhere + ["not lost hero"]) == (False, [])
+
+FREE = "free (t : tile) => free (t.next)"
+
+def cycle(solver, n):
+    solver.fill_sort("tile", n)
+    for i in range(n):
+        solver.assign("next", f"tile{i + 1}", f"tile{(i + 1) % n + 1}")
+
+def test_new_function_values():
+    solver = make_solver(FREE, {})
+    cycle(solver, 2)
+    solver.unfold_instance()
+    solver.fill_sort("tile", 3)
+    solver.assign("next", "tile3", "tile1")
+    assert solver.changed_values() == []
+    solver.unfold_delta()
+    assert solver.model_with(["free tile3", "not free tile2"]) == (False, [])
+
+def test_changed_function_values():
+    solver = make_solver(FREE, {})
+    cycle(solver, 2)
+    solver.unfold_instance()
+    cycle(solver, 3)
+    assert solver.changed_values() == [("next", "tile2")]
+    with pytest.raises(AssertionError):
+        solver.unfold_delta()
+    solver.reset_instance()
+    solver.unfold_instance()
+    assert solver.model_with(["free tile2", "not free tile3"]) == (False, [])
+
+def test_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    grown = ground_trees(3)
+    grown.fill_sort("node", 4)
+    grown.unfold_delta()
+    assert answers(grown, names) == answers(plain, names)
@@ -0,0 +1,84 @@
+import pytest
+
+from artale.test.programs import PLACEMENT, answers, atom_names, ground_trees, make_solver
+
+def solver(simplified=False):
+    solver = make_solver(PLACEMENT, {"ch": 2, "tile": 3})
+    solver.unfold_instance()
+    if simplified:
+        solver.simplify()
+    return solver
+
+def projection(solver, model, predicate):
+    names = [solver.reverse_literal_map[l] for l in model if l > 0]
+    return frozenset(n for n in names if n.startswith(predicate))
+
+@pytest.mark.parametrize("simplified", [False, True])
+def test_iter_models(simplified):
+    enumerated = solver(simplified)
+    models = list(enumerated.iter_models(project_on=["at"]))
+    assert len(models) == 9
+    assert len({projection(enumerated, m, "at") for m in models}) == 9
+    assert len(list(enumerated.iter_models())) == 24
+    assert len(list(enumerated.iter_models(project_on=["at"], limit=4))) == 4
+    fixed = enumerated.iter_models(project_on=["at"], statements=["at ch1 tile2"])
+    assert len(list(fixed)) == 3
+    assert enumerated.model_with(["at ch1 tile2", "at ch2 tile2"])[0]
+    shown = enumerated.show_model(models[0], show_false=True)
+    assert "at ch1 tile1" in shown and "blocking" not in shown
+
+def test_seen_projection():
+    enumerated = solver()
+    models = list(enumerated.iter_models(project_on=["seen"]))
+    seen = {projection(enumerated, m, "seen") for m in models}
+    assert len(models) == len(seen) == 7
+
+def test_closed_enumeration():
+    enumerated = solver()
+    models = enumerated.iter_models(project_on=["at"])
+    next(models)
+    models.close()
+    assert len(list(enumerated.iter_models(project_on=["at"]))) == 9
+    assert enumerated.cnf_clauses.tolist() == solver().cnf_clauses.tolist()
+
+@pytest.mark.parametrize("simplified", [False, True])
+def test_coverage(simplified):
+    covered = solver(simplified)
+    covered.add_clause([-covered.literal_map["at ch1 tile3"]])
+    facts = [f"at ch{c} tile{t}" for c in range(1, 3) for t in range(1, 4)]
+    statements = facts + ["not seen tile1"]
+    models, witnesses, unsatisfiable = covered.coverage(statements)
+    assert unsatisfiable == ["at ch1 tile3"]
+    assert set(witnesses) == set(statements) - {"at ch1 tile3"}
+    assert len(models) < len(witnesses)
+    for statement, position in witnesses.items():
+        literal = covered.literal_map[statement]
+        assert literal in models[position]
+    assert len(list(covered.iter_models(project_on=["at"]))) == 6
+
+@pytest.mark.parametrize("simplified", [False, True])
+def test_backbone(simplified):
+    fixed = solver(simplified)
+    assert fixed.backbone() == (set(), set())
+    fixed.add_clause([fixed.literal_map["at ch1 tile2"]])
+    true, false = fixed.backbone(["at"])
+    assert true == {"at ch1 tile2"}
+    assert false == {"at ch1 tile1", "at ch1 tile3"}
+    assert fixed.backbone(["at"]) is fixed.backbone(["at"])
+    true, false = fixed.backbone()
+    assert "seen tile2" in true
+    fixed.add_clause([fixed.literal_map["at ch2 tile2"]])
+    true, false = fixed.backbone(["seen"])
+    assert true == {"seen tile2"}
+    assert false == set()
+    fixed.add_clause([fixed.literal_map["at ch2 tile3"]])
+    assert fixed.backbone() is None
+
+def test_trees_spec():
+    tree = ground_trees()
+    phrases = [n for n in atom_names(tree) if n.startswith("phrase ")]
+    models = list(tree.iter_models(project_on=["phrase"]))
+    projections = {projection(tree, m, "phrase") for m in models}
+    assert len(projections) == len(models)
+    satisfiable = {n for n, sat in answers(tree, phrases).items() if sat}
+    assert set().union(*projections) == satisfiable
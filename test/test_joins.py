@@ -0,0 +1,73 @@
+import pytest
+
+from artale.joins import FactIndex, open_predicates
+from artale.models import HornSolver
+from artale.parser import read_into
+from artale.test.programs import answers, atom_names, ground_trees
+
+paths = '''
+edge (a : node, b : node) => reach (a, b)
+
+reach (a : node, b : node), edge (b, c : node) => reach (a, c)
+'''
+
+def make_paths(join, n=5):
+    solver = HornSolver()
+    solver.options.join_grounding = join
+    read_into(paths, solver)
+    solver.fill_sort("node", n)
+    for i in range(1, n):
+        solver.add_assertion(f"edge node{i} node{i + 1}")
+    solver.unfold_instance()
+    return solver
+
+def test_open_predicates():
+    solver = HornSolver()
+    read_into("p (a : s), q (a) => r (a)\n\nq (a : s) v t (a)", solver)
+    assert open_predicates(solver.rules, solver.sorts) == {"r", "q", "t"}
+    assert solver.closed_predicates() == {solver.atoms.predicate_ids["p"]}
+
+def test_fact_index():
+    index = FactIndex([(0, 1, 2), (0, 1, 3), (0, 2, 3), (1, 1)])
+    assert index.count(0, 2) == 3
+    assert sorted(index.matches(0, 2, ((0, 1),))) == [(1, 2), (1, 3)]
+    assert index.matches(0, 2, ((1, 2),)) == [(1, 2)]
+    assert index.matches(1, 2, ()) == []
+
+def test_joined_facts():
+    solver = HornSolver()
+    solver.options.join_grounding = True
+    read_into("p (a : s), q (a) => r (a)", solver)
+    solver.fill_sort("s", 3)
+    solver.add_assertion("p s2")
+    solver.add_assertion("q s2")
+    solver.add_assertion("q s3")
+    solver.unfold_instance()
+    r = solver.literal_map["r s2"]
+    clauses = [c.tolist() for c in solver.cnf_clauses if len(c) > 1]
+    assert clauses == [[r, -solver.literal_map["p s2"], -solver.literal_map["q s2"]]]
+
+def test_join_grounding():
+    plain = make_paths(False)
+    joined = make_paths(True)
+    assert len(joined.cnf_clauses) < len(plain.cnf_clauses)
+    sat, model = joined.get_model()
+    assert sat
+    assert ("reach", "node1", "node5") in joined.get_relations(model, ["reach"])
+    assert len(joined.get_relations(model, ["edge"])) == 4
+
+def test_late_assertions():
+    solver = make_paths(True)
+    solver.add_assertion("reach node5 node1")
+    solver.add_assertion("not edge node5 node1")
+    with pytest.raises(AssertionError, match="edge node5 node1"):
+        solver.add_assertion("edge node5 node1")
+    make_paths(False).add_assertion("edge node5 node1")
+
+def test_trees_spec():
+    # 'before' is in no head, so it is closed: false unless asserted
+    plain = ground_trees()
+    names = atom_names(plain)
+    closed = ["not " + n for n in names if n.split()[0] == "before"]
+    joined = ground_trees(join_grounding=True)
+    assert answers(joined, names) == answers(plain, names, closed)
@@ -0,0 +1,157 @@
+import pytest
+
+from artale.kernels import compile_rule, check_kernel
+from artale.models import HornSolver, group_rules
+from artale.parser import read_into
+from artale.specs import trees
+from artale.test.programs import (
+    EXCLUSIVE, MOVES, NOWHERE, RELATIONS, answers, atom_names, ground_trees, make_world,
+)
+
+PROGRAM = MOVES + EXCLUSIVE + NOWHERE + RELATIONS
+
+def make_solver():
+    return make_world(PROGRAM, 4)
+
+def test_kernels_match_string_grounding():
+    solver = make_solver()
+    solver.reserve_blocks(solver.rules)
+    for rule in solver.rules:
+        assert check_kernel(rule, solver)
+
+def test_kernels_match_on_trees():
+    solver = HornSolver()
+    read_into(trees, solver)
+    solver.fill_sort("node", 4)
+    solver.reserve_blocks(solver.rules)
+    for rule in solver.rules:
+        assert check_kernel(rule, solver)
+
+def test_hoisting():
+    solver = make_solver()
+    source = compile_rule(solver.rules[1], solver).source
+    assert "values" in source
+    assert "get_relations" not in source
+    lookup = [l for l in source.split("\n") if "= F" in l][0]
+    assert lookup.startswith(" " * 8 + "t")
+
+def test_function_tables():
+    solver = make_solver()
+    solver.reserve_blocks(solver.rules)
+    source = compile_rule(solver.rules[0], solver).source
+    assert "values" not in source
+    assert "find" not in source
+    assert solver.evaluate("tile1.next.next") == "tile3"
+    solver.assign("next", "tile2", "tile1")
+    assert solver.evaluate("tile1.next.next") == "tile1"
+    with pytest.raises(KeyError):
+        solver.evaluate("tile1.previous")
+
+def test_checked_unfolding():
+    solver = make_solver()
+    solver.options.check_kernels = True
+    solver.unfold_instance()
+    assert solver.get_model()[0]
+
+def test_static_comparisons():
+    solver = HornSolver()
+    read_into('''here (t : tile, s : tile) => t = s
+
+exit (t : tile), not exit (any : tile), t != any => False
+
+start (t : tile), t = s => here (s : tile, t)
+''', solver)
+    solver.fill_sort("tile", 3)
+    solver.reserve_blocks(solver.rules)
+    for rule in solver.rules:
+        assert check_kernel(rule, solver)
+    solver.unfold_instance()
+    assert not any("=" in atom for atom in solver.literal_map)
+    here = solver.literal_map["here tile1 tile2"]
+    start = solver.literal_map["start tile2"]
+    clauses = [c.tolist() for c in solver.cnf_clauses]
+    assert [-here] in clauses
+    assert [solver.literal_map["here tile2 tile2"], -start] in clauses
+    assert len(clauses) == 9
+
+@pytest.mark.parametrize("define_any", [False, True])
+def test_undecided_comparisons(define_any):
+    solver = HornSolver()
+    solver.options.define_any = define_any
+    read_into('''left (a : node, b : node), left (a, b), b != c => False
+
+left (a : node, b : node), a.up = b => root (a)
+
+left (a : node, any : node), a.up != any => lone (a)
+
+left (a : node, b : node) => a = b.up
+
+root (a : node) v a.up = a
+''', solver)
+    solver.fill_sort("node", 3)
+    solver.assign("up", "node1", "node2")
+    solver.assign("up", "node2", "top")
+    solver.assign("up", "node3", "node3")
+    solver.reserve_blocks(solver.rules)
+    for rule in solver.rules:
+        assert check_kernel(rule, solver)
+    solver.unfold_instance()
+    assert "node1 != c" in solver.literal_map.keys()
+    assert "node2 = top" in solver.literal_map.keys()
+    assert "node1 = node2" not in solver.literal_map.keys()
+    assert solver.model_with(["left node1 node2"])[0]
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_grouped_unfolding(compiled):
+    program = '''
+    a : A, b : A, c : C {
+        p(a), q(b, c) => r(a, b)
+        r(b, a), s(c) => t(a, c)
+        r(a, b), a != b => u(c)
+        p(a) => s(a)
+        not q(a, any : C) => p(a)
+    }
+    '''
+    clause_sets = []
+    for grouped in [False, True]:
+        solver = HornSolver()
+        solver.options.compiled_grounding = compiled
+        solver.options.grouped_grounding = grouped
+        read_into(program, solver)
+        solver.fill_sort("A", 3)
+        solver.fill_sort("C", 2)
+        solver.unfold_instance()
+        reverse = solver.reverse_literal_map
+        clause_sets.append(sorted(
+            sorted(("-" if l < 0 else "") + reverse[abs(l)] for l in c)
+            for c in solver.cnf_clauses
+        ))
+    assert clause_sets[0] == clause_sets[1]
+    groups = group_rules([r for r in solver.rules if "any" not in r.variables])
+    assert list(groups) == [("A", "A", "C")]
+    assert len(groups[("A", "A", "C")]) == 4
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_any_definitions(compiled):
+    program = '''
+    phrase (a : node), not left (a, any : node) => False
+
+    phrase (a : node), phrase (b : node), not left (a, any : node) => pair (a, b)
+    '''
+    solver = HornSolver()
+    solver.options.compiled_grounding = compiled
+    solver.options.check_kernels = compiled
+    solver.options.define_any = True
+    read_into(program, solver)
+    solver.fill_sort("node", 3)
+    solver.unfold_instance()
+    assert len(solver.definitions) == 3
+    assert max(len(c) for c in solver.cnf_clauses) == 4
+    assert solver.model_with(["phrase node1", "not left node1 node2"])[0]
+    assert not solver.model_with(["phrase node1"] +
+        [f"not left node1 node{i}" for i in range(1, 4)])[0]
+
+def test_any_definitions_on_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    assert answers(ground_trees(define_any=True), names) == answers(plain, names)
@@ -53,12 +53,7 @@ def test_unfolding():
     solver.unfold_instance()
     solver.unfold_una()
 
-    models = []
-
-    for m in range(1, 101):
-        res = solver.solver.solve([m])
-        if res:
-            models.append(solver.solver.get_model())
+    models = list(solver.iter_models(limit=100))
 
     print("No. models: ", len(models))
 
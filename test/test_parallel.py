@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from artale import kernels, parallel
+from artale.models import GroundingOptions, HornSolver
+from artale.parser import read_into
+from artale.specs import trees
+from artale.test.programs import (
+    EXCLUSIVE, MOVES, NOWHERE, RELATIONS, answers, atom_names, ground_trees, make_world,
+)
+
+pytestmark = pytest.mark.skipif(not parallel.available(), reason="needs fork")
+
+PROGRAM = MOVES + EXCLUSIVE + NOWHERE + RELATIONS + '''
+start (empty) => free (empty.next)
+'''
+
+def make_solver(workers):
+    solver = make_world(PROGRAM, 5, workers=workers)
+    solver.assign("next", "empty", "tile1")
+    return solver
+
+def unfolded(solver):
+    solver.unfold_instance()
+    clauses = [c.tolist() for c in solver.cnf_clauses]
+    atoms = [solver.reverse_literal_map[v] for v in range(1, len(solver.atoms) + 1)]
+    return clauses, atoms
+
+def test_parallel_matches_sequential():
+    assert unfolded(make_solver(3)) == unfolded(make_solver(1))
+
+def test_kernels_compiled_before_forking(monkeypatch):
+    parent = os.getpid()
+    compile_rule = kernels.compile_rule
+    def compile_in_parent(*args, **kwargs):
+        assert os.getpid() == parent, "Kernel compiled in a worker"
+        return compile_rule(*args, **kwargs)
+    monkeypatch.setattr(kernels, "compile_rule", compile_in_parent)
+    assert unfolded(make_solver(2)) == unfolded(make_solver(1))
+
+def test_parallel_trees():
+    solvers = []
+    for workers in [1, 2]:
+        solver = HornSolver()
+        solver.options.workers = workers
+        read_into(trees, solver)
+        solver.fill_sort("node", 6)
+        solvers.append(solver)
+    assert unfolded(solvers[1]) == unfolded(solvers[0])
+
+def test_shards():
+    solver = make_solver(1)
+    rule = solver.rules[0]
+    assert parallel.shards(solver, rule, 2) == [(0, 2), (2, 5)]
+    assert parallel.shards(solver, rule, 8) == [(k, k + 1) for k in range(5)]
+
+@pytest.mark.parametrize("flags", [
+    {"join_grounding": True},
+    {"vectorized_grounding": True},
+    {"rule_selectors": True},
+    {"grouped_grounding": True},
+    {"compiled_grounding": False},
+])
+def test_incompatible_modes(flags):
+    solver = make_solver(2)
+    for name, value in flags.items():
+        setattr(solver.options, name, value)
+    with pytest.raises(AssertionError):
+        solver.unfold_instance()
+
+def test_grounding_strategy():
+    solver = make_solver(2)
+    assert solver.grounding_strategy() == "parallel"
+    solver.options.workers = 1
+    solver.options.grouped_grounding = True
+    assert solver.grounding_strategy() == "grouped"
+    solver.options.join_grounding = True
+    with pytest.raises(AssertionError, match="grouped grounding and join grounding"):
+        solver.grounding_strategy()
+    solver.options.grouped_grounding = False
+    solver.options.rule_selectors = True
+    solver.options.forward_chaining = True
+    with pytest.raises(AssertionError, match="forward chaining"):
+        solver.grounding_strategy()
+    options = GroundingOptions(workers=2, grouped_grounding=True)
+    with pytest.raises(AssertionError, match="parallel grounding and grouped grounding"):
+        HornSolver(options).grounding_strategy()
+
+def test_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    assert answers(ground_trees(workers=2), names) == answers(plain, names)
@@ -275,3 +275,27 @@ def test_make_rule():
     assert Relation(['pepa', 'char']) in r2.body
     
    
+
+def test_rule_blocks():
+
+    program = '''
+    a : A, b : A, c : C {
+        p(a) => q(a)
+        q(b, a), r(b, c) => s(b)
+    }
+
+    t (x : A) => u (x)
+    '''
+
+    assert normalize(program).split("\n\n")[0] == "{a : A, b : A, c : C} p (a) => q (a)"
+
+    solver = HornSolver()
+    read_into(program, solver)
+    rules = [(r.as_string(), r.variables, r.sorts) for r in solver.rules]
+
+    assert rules == [
+        ("p a => q a", ["a"], ["A"]),
+        ("q b a, r b c => s b", ["b", "a", "c"], ["A", "A", "C"]),
+        ("t x => u x", ["x"], ["A"]),
+    ]
+    assert [r.scope for r in solver.rules] == [{"a": "A", "b": "A", "c": "C"}] * 2 + [{}]
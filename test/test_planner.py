@@ -0,0 +1,78 @@
+import pytest
+
+from artale.planner import BUDGET_CHECK, Budget, BudgetExceeded, estimate, plan
+from artale.test.programs import EXCLUSIVE, NOWHERE, ground_trees, make_solver, read_spec
+
+PROGRAM = EXCLUSIVE + NOWHERE + '''
+near (t : tile, s : tile), at (c : ch, t) => seen (c, s), moved (c)
+'''
+
+def solver(tiles=10, define_any=False):
+    return make_solver(PROGRAM, {"tile": tiles, "ch": 2}, define_any=define_any)
+
+def test_estimates():
+    exclusive, disjunction, lost, seen = solver().rules
+    assert estimate(exclusive, solver()).clauses == 200
+    assert estimate(exclusive, solver()).literals == 400
+    assert estimate(disjunction, solver()).literals == 2 * 20
+    assert estimate(lost, solver()).assignments == 2
+    assert estimate(lost, solver()).literals == 2 * 11
+    assert estimate(lost, solver(define_any=True)).literals == 2 * 2
+    assert estimate(seen, solver()).clauses == 2 * 200
+    assert estimate(seen, solver()).literals == 2 * 200 * 3
+    generic = solver()
+    generic.options.compiled_grounding = False
+    assert estimate(lost, generic).clauses == 2 * 10
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_estimates_bound_clauses(compiled):
+    unfolded = solver()
+    unfolded.options.compiled_grounding = compiled
+    unfolded.unfold_instance()
+    assert len(unfolded.cnf_clauses) <= sum(e.clauses for e in plan(unfolded))
+    assert plan(unfolded)[0].clauses == 200
+    assert unfolded.clause_count == len(unfolded.cnf_clauses)
+    assert "total" in unfolded.plan()
+
+def test_budget_abort():
+    limited = solver(tiles=50)
+    limited.options.budget = Budget(clauses=1000)
+    with pytest.raises(BudgetExceeded) as error:
+        limited.unfold_instance()
+    assert "over budget, estimate: 5000 clauses > 1000" in error.value.report
+    assert limited.options.budget.skipped == [limited.rules[0]]
+    assert len(limited.cnf_clauses) == 0
+
+def test_budget_skip():
+    limited = solver(tiles=50)
+    limited.options.budget = Budget(clauses=4000, skip=True)
+    limited.unfold_instance()
+    exclusive, disjunction, lost, seen = limited.rules
+    assert limited.options.budget.skipped == [exclusive, seen]
+    assert len(limited.cnf_clauses) == 100 + 2
+    assert limited.options.budget.report().count("over budget") == 2
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_budget_cut_off(compiled):
+    limited = solver(tiles=50)
+    limited.options.compiled_grounding = compiled
+    limited.options.budget = Budget(clauses=12000, skip=True)
+    limited.unfold_instance()
+    assert limited.options.budget.skipped == [limited.rules[3]]
+    lost = 2 if compiled else 100
+    assert len(limited.cnf_clauses) == 4900 + 100 + lost + 2 * 4 * BUDGET_CHECK
+
+def test_budget_seconds():
+    limited = solver()
+    limited.options.budget = Budget(seconds=0, skip=True)
+    limited.unfold_instance()
+    assert limited.options.budget.skipped == limited.rules
+
+def test_trees_spec():
+    plain = ground_trees()
+    assert len(plain.cnf_clauses) <= sum(e.clauses for e in plan(plain))
+    limited = make_solver(read_spec("trees"), {"node": 4})
+    limited.options.budget = Budget(clauses=10 ** 6)
+    limited.unfold_instance()
+    assert limited.options.budget.skipped == []
+    assert limited.cnf_clauses.tolist() == plain.cnf_clauses.tolist()
@@ -0,0 +1,75 @@
+import pytest
+
+from artale.relevance import dead_predicates, irrelevant_rules, prune
+from artale.test.programs import answers, atom_names, ground_trees, make_solver
+
+PROGRAM = '''
+edge (a : n, b : n), mark (b) => reach (a)
+
+wall (a : n), not door (a) => blocked (a)
+
+ghost (a : n) => haunted (a)
+
+color (a : n) v plain (a)
+
+red (a : n), blue (a) => False
+'''
+
+def solver(prune_rules=True, join=False, queries=None):
+    flags = {} if prune_rules is None else {"prune_rules": prune_rules}
+    solver = make_solver(PROGRAM, {"n": 4}, join_grounding=join, queries=queries, **flags)
+    for a, b in [(1, 2), (2, 3)]:
+        solver.add_assertion(f"edge n{a} n{b}")
+    solver.add_assertion("mark n3")
+    solver.add_assertion("wall n4")
+    return solver
+
+def test_dead_predicates():
+    rules = solver().rules
+    dead = dead_predicates(rules, {}, {"edge", "mark", "wall"})
+    assert dead == {"door", "ghost", "red", "blue"}
+
+def test_irrelevant_rules():
+    rules = solver().rules
+    assert irrelevant_rules(rules, {}, {"reach"}, set()) == {1, 2, 3}
+    assert irrelevant_rules(rules, {}, {"blocked"}, set()) == {0, 2, 3}
+    assert irrelevant_rules(rules, {}, {"reach"}, {"plain"}) == {1, 2}
+    assert irrelevant_rules(rules, {}, {"red"}, set()) == {0, 1, 2, 3}
+
+def test_prune():
+    rules = solver().rules
+    kept, report = prune(rules, {}, asserted={"edge", "mark", "wall"}, closed=True)
+    assert [r.as_string() for r in kept] == [
+        "edge a b, mark b => reach a",
+        "wall a => blocked a",
+        "color a, plain a => False",
+    ]
+    assert [r is None for _, r, _ in report] == [False, True, True]
+
+@pytest.mark.parametrize("join", [False, True])
+def test_pruned_unfolding(join):
+    queries = {"reach", "blocked"}
+    pruned = solver(join=join, queries=queries)
+    full = solver(prune_rules=False, join=join)
+    pruned.unfold_instance()
+    full.unfold_instance()
+    assert "ghost a => haunted a: dropped" in pruned.pruning_report()
+    assert len(pruned.cnf_clauses) < len(full.cnf_clauses)
+    for a in range(1, 5):
+        for name in [f"reach n{a}", f"blocked n{a}"]:
+            for literals in [[name], ["not " + name]]:
+                assert pruned.model_with(literals)[0] == full.model_with(literals)[0]
+
+@pytest.mark.parametrize("join", [False, True])
+def test_opt_in(join):
+    default = solver(prune_rules=None, join=join, queries={"reach"})
+    full = solver(prune_rules=False, join=join)
+    default.unfold_instance()
+    full.unfold_instance()
+    assert default.prunings == []
+    assert default.cnf_clauses.tolist() == full.cnf_clauses.tolist()
+
+def test_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    assert answers(ground_trees(prune_rules=True), names) == answers(plain, names)
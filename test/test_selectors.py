@@ -0,0 +1,80 @@
+import pytest
+
+from artale.parser import make_rules
+from artale.test.programs import (
+    EXCLUSIVE, PLACED, PLACEMENT, answers, atom_names, ground_trees, make_solver,
+)
+
+EDITED = EXCLUSIVE + PLACED + '''
+at (c : ch, t : tile), at (d : ch, t), c != d => False
+'''
+
+QUERIES = [
+    [],
+    ["at ch1 tile1", "at ch2 tile1"],
+    ["at ch1 tile1", "at ch1 tile2"],
+    ["not seen tile1", "at ch1 tile1"],
+    ["not at ch1 tile1", "not at ch1 tile2", "not at ch1 tile3"],
+]
+
+def solver(program=PLACEMENT, selectors=True, vectorized=False):
+    solver = make_solver(
+        program, {"ch": 2, "tile": 3},
+        rule_selectors=selectors, vectorized_grounding=vectorized,
+    )
+    solver.unfold_instance()
+    return solver
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_guarded_clauses(vectorized):
+    guarded = solver(vectorized=vectorized)
+    plain = solver(selectors=False, vectorized=vectorized)
+    assert len(guarded.selectors) == 3
+    for query in QUERIES:
+        assert guarded.model_with(query)[0] == plain.model_with(query)[0]
+
+def test_disabled_rules():
+    guarded = solver()
+    exclusive, total, seen = guarded.rules
+    query = ["at ch1 tile1", "at ch1 tile2"]
+    assert not guarded.model_with(query)[0]
+    assert guarded.model_with(query, disabled=[exclusive])[0]
+    sat, model = guarded.get_model(disabled=[total])
+    assert sat
+    query = ["not at ch1 tile1", "not at ch1 tile2", "not at ch1 tile3"]
+    assert guarded.model_with(query, disabled=[total])[0]
+    assert guarded.model_with(["at ch1 tile1", "not seen tile1"], disabled=[seen])[0]
+
+def test_update_rules():
+    guarded = solver()
+    sat_solver = guarded.solver
+    guarded.update_rules(make_rules(EDITED, guarded))
+    edited = solver(EDITED, selectors=False)
+    assert guarded.solver is sat_solver
+    assert len(guarded.rules) == len(guarded.selectors) == 3
+    assert guarded.model_with(["at ch1 tile1", "not seen tile1"])[0]
+    for query in QUERIES:
+        if not any("seen" in s for s in query):
+            assert guarded.model_with(query)[0] == edited.model_with(query)[0]
+    models = list(guarded.iter_models(project_on=["at"]))
+    assert len(models) == len(list(edited.iter_models(project_on=["at"]))) == 6
+    shown = guarded.show_model(models[0], show_false=True)
+    assert "at ch1 tile1" in shown and "selected" not in shown
+
+def test_trees_spec():
+    plain = ground_trees()
+    names = atom_names(plain)
+    guarded = ground_trees(rule_selectors=True)
+    assert answers(guarded, names) == answers(plain, names)
+
+@pytest.mark.parametrize("split", [False, True])
+def test_split_added_rules(split):
+    solver = make_solver(
+        "p (x : a, y : a), q (y, z : a) => r (z)", {"a": 4},
+        rule_selectors=True, decompose_rules=split,
+    )
+    solver.unfold_instance()
+    added = make_rules("m (u : a, y : a), n (y, w : a) => o (w)", solver)
+    solver.update_rules(solver.rules + added)
+    assert len(solver.decompositions) == (2 if split else 0)
+    assert solver.model_with(["m a1 a2", "n a2 a3", "q a2 a4", "not r a4"])[0]
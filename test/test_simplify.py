@@ -0,0 +1,75 @@
+import pytest
+
+from artale.models import HornSolver
+from artale.parser import read_into
+from artale.simplify import simplify
+
+def test_simplify():
+    clauses = [[1], [-1, 2, 3], [2, -2, 4], [3, 4, 5], [5, 4, 3], [4, 5], [-6, 7]]
+    simplification = simplify(clauses)
+    assert simplification.satisfiable
+    assert simplification.fixed == {1: True}
+    assert sorted(simplification.clauses.tolist()) == [[-5, 6], [1, 2], [3, 4]]
+    assert simplification.old_variables == [0, 2, 3, 4, 5, 6, 7]
+    model = simplification.model([1, -2, 3, -4, 5], 8)
+    assert model == [1, 2, -3, 4, -5, 6, -7, -8]
+
+def test_conflict():
+    simplification = simplify([[1], [-1, 2], [-2, -1]])
+    assert not simplification.satisfiable
+    assert len(simplification.clauses) == 0
+
+def test_horn_propagation():
+    clauses = [[1], [-1, 2], [-2, -3], [3, 4, 5], [-2, 6, 7], [6, 7, 8], [-4, -5]]
+    simplification = simplify(clauses, subsumption=False)
+    assert simplification.fixed == {1: True, 2: True, 3: False}
+    assert sorted(simplification.clauses.tolist()) == [[-1, -2], [1, 2], [3, 4], [3, 4, 5]]
+    assert simplification.report().split("\n") == [
+        "3 of 8 variables fixed (2 true, 1 false), 0 only in satisfied clauses",
+        "clauses: 7 -> 4, literals: 16 -> 9",
+    ]
+    assert len(simplify(clauses).clauses) == 3
+
+def test_translate():
+    simplification = simplify([[1], [-2], [3, 4]])
+    assert simplification.translate([1, 5]) is None
+    assert simplification.translate([2, -5, 3]) == [-3, 1]
+    assert simplification.assumption(-2) is True
+    assert simplification.assumption(2) is False
+    assert simplification.assumption(6) is True
+
+def test_solver_simplify():
+    solver = HornSolver()
+    read_into("p (a : s) => q (a)\n\nq (a : s), r (a) => False\n\nq (a : s) v r (a)", solver)
+    solver.fill_sort("s", 3)
+    solver.add_assertion("p s1")
+    solver.unfold_instance()
+    clauses = len(solver.cnf_clauses)
+    simplification = solver.simplify()
+    assert len(simplification.clauses) < clauses
+    assert len(solver.cnf_clauses) == clauses
+    sat, model = solver.get_model()
+    assert sat
+    assert solver.literal_map["q s1"] in model
+    assert -solver.literal_map["r s1"] in model
+    assert solver.model_with(["r s1"]) == (False, [])
+    sat, model = solver.model_with(["r s2"])
+    assert sat
+    assert -solver.literal_map["q s2"] in model
+    solver.add_assertion("not q s2")
+    sat, model = solver.get_model()
+    assert solver.literal_map["r s2"] in model
+
+def test_presolve():
+    solver = HornSolver()
+    solver.options.presolve = True
+    read_into("p (a : s) => q (a)\n\nq (a : s), r (a) => False\n\nq (a : s) v r (a)", solver)
+    solver.fill_sort("s", 3)
+    solver.add_assertion("p s1")
+    solver.unfold_instance()
+    assert solver.simplification.fixed[solver.literal_map["r s1"]] is False
+    assert solver.model_with(["r s1"]) == (False, [])
+    assert solver.model_with(["r s2"])[0]
+    solver.options.retain_clauses = False
+    with pytest.raises(AssertionError, match="not retained"):
+        solver.grounding_strategy()
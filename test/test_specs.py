@@ -0,0 +1,41 @@
+import pytest
+
+from artale.kernels import check_kernel
+from artale.specs import trees
+from artale.test.programs import make_solver, read_spec
+
+MODES = ["compiled", "strings", "vectorized"]
+
+def solver(spec, mode, n=5):
+    solver = make_solver(
+        spec, {"node": n},
+        compiled_grounding=mode != "strings",
+        vectorized_grounding=mode == "vectorized",
+    )
+    solver.unfold_instance()
+    return solver
+
+def satisfiable_atoms(solver, predicates):
+    names = [n for n in solver.literal_map.keys() if n.split()[:1] in predicates]
+    return {n: solver.model_with([n])[0] for n in names}
+
+def test_unsorted_comparisons():
+    # 'c' has no sort in "left (a, b), left (a, b), b != c => False", so
+    # its comparisons are atoms instead of making every 'left' atom false
+    predicates = [["left"], ["right"], ["phrase"]]
+    atoms = [satisfiable_atoms(solver(read_spec("trees"), m), predicates) for m in MODES]
+    assert atoms[0] == atoms[1] == atoms[2]
+    assert atoms[0]["left node1 node2"] and atoms[0]["phrase node1"]
+    assert sum(atoms[0].values()) == 65
+
+@pytest.mark.parametrize("spec", ["trees", "cfg"])
+def test_spec_kernels(spec):
+    checked = solver(read_spec(spec), "compiled", 3)
+    for rule in checked.rules:
+        assert check_kernel(rule, checked)
+
+@pytest.mark.parametrize("mode", MODES)
+def test_trees_models(mode):
+    tree = solver(trees, mode)
+    assert tree.model_with(["left node1 node2"])[0]
+    assert tree.model_with(["phrase node1"])[0]
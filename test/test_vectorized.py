@@ -0,0 +1,95 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from artale.models import HornSolver
+from artale.parser import read_into
+from artale.specs import trees
+from artale.vectorized import clause_matrices
+
+def ground(vectorized):
+    solver = HornSolver()
+    solver.options.vectorized_grounding = vectorized
+    read_into(trees, solver)
+    solver.fill_sort("node", 5)
+    solver.unfold_instance()
+    return solver
+
+def readable(solver):
+    clauses = set()
+    for c in solver.cnf_clauses:
+        clauses.add(frozenset(solver.reverse_literal_map[abs(a)] + str(a > 0) for a in c))
+    return clauses
+
+def test_vectorized_matches_scalar():
+    assert readable(ground(True)) == readable(ground(False))
+
+def test_matrix_shape():
+    solver = HornSolver()
+    read_into("left (n : node, m : node), right (n, m) => False", solver)
+    solver.fill_sort("node", 3)
+    solver.reserve_blocks(solver.rules)
+    [matrix] = clause_matrices(solver.rules[0], solver)
+    assert matrix.shape == (9, 2)
+    assert matrix.dtype == np.int32
+    assert (matrix < 0).all()
+
+def test_fallback_on_functions():
+    solver = HornSolver()
+    read_into("free (t : tile) => free (t.next)", solver)
+    solver.fill_sort("tile", 2)
+    solver.reserve_blocks(solver.rules)
+    assert clause_matrices(solver.rules[0], solver) is None
+
+def test_comparison_masks():
+    solver = HornSolver()
+    read_into("left (n : node, m : node), left (n, o : node), m != o => False", solver)
+    solver.fill_sort("node", 3)
+    solver.reserve_blocks(solver.rules)
+    [matrix] = clause_matrices(solver.rules[0], solver)
+    assert matrix.shape == (18, 2)
+    assert (matrix[:, 0] != matrix[:, 1]).all()
+
+def test_function_tables():
+    solvers = []
+    for vectorized in [True, False]:
+        solver = HornSolver()
+        solver.options.vectorized_grounding = vectorized
+        read_into("free (t : tile), t.next != t.next.next => free (t.next.next)", solver)
+        solver.fill_sort("tile", 3)
+        for i in range(3):
+            solver.assign("next", f"tile{i + 1}", f"tile{(i + 1) % 3 + 1}")
+        solver.reserve_blocks(solver.rules)
+        solvers.append(solver)
+    [matrix] = clause_matrices(solvers[0].rules[0], solvers[0])
+    assert matrix.shape == (3, 2)
+    for solver in solvers:
+        solver.unfold_instance()
+    assert readable(solvers[0]) == readable(solvers[1])
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 7, 27, 100])
+def test_chunks(chunk_size):
+    solver = HornSolver()
+    read_into("left (n : node, m : node), right (m, o : node) => left (n, o)", solver)
+    solver.fill_sort("node", 3)
+    solver.reserve_blocks(solver.rules)
+    [whole] = clause_matrices(solver.rules[0], solver)
+    chunks = list(clause_matrices(solver.rules[0], solver, chunk_size))
+    assert all(len(m) <= chunk_size for m in chunks)
+    assert (np.concatenate(chunks) == whole).all()
+
+@pytest.mark.parametrize("program", [
+    "left (n : node, m : node), left (n, o : node) => right (m, o)",
+    "left (n : node, m : node), left (o : node, m), left (n, m) => False",
+    "left (n : node, m : node) v left (m, n)",
+])
+def test_repeated_body_literals(program):
+    clauses = []
+    for vectorized in [True, False]:
+        solver = HornSolver()
+        solver.options.vectorized_grounding = vectorized
+        read_into(program, solver)
+        solver.fill_sort("node", 3)
+        solver.unfold_instance()
+        clauses.append(sorted(sorted(c.tolist()) for c in solver.cnf_clauses))
+    assert clauses[0] == clauses[1]
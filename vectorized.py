@@ -0,0 +1,302 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from artale import models
+from artale.atoms import COMPARISONS, EQUALS, positive
+from artale.functions import term_values
+
+DOT = "."
+CHUNK_SIZE = 2 ** 16
+
+
+def available():
+    return np is not None
+
+
+def relation_columns(rule, solver, domain_ids):
+    '''
+
+    Return a function mapping each relation of a rule to a triple (base,
+    terms, sign) such that the literal of the relation for the assignment
+    with indices i is sign * (base + sum(offsets[i[v]] for v, offsets in
+    terms)), or None if some relation cannot be computed this way (it
+    uses 'any', predicate variables, functions undefined on some
+    assignment, or has no block covering the domains).
+
+    '''
+
+    position = {v: i for i, v in enumerate(rule.variables)}
+    tables = solver.function_tables()
+
+    def plan(relation):
+
+        parts = [p.strip() for p in relation.parts]
+        symbols = {s.strip() for p in parts for s in p.split(DOT)}
+
+        predicate, *arguments = parts
+        predicate, sign = positive(predicate)
+
+        if predicate in position:
+            return None
+
+        if not symbols & position.keys():
+            return solver.ground_atom(relation), [], 1
+
+        values = [term_values(a, position, domain_ids, tables) for a in arguments]
+
+        if None in values or predicate not in solver.atoms.predicate_ids:
+            return None
+
+        predicate_id = solver.atoms.predicate_ids[predicate]
+        cover = solver.atoms.cover(predicate_id, [v for _, v in values])
+
+        if cover is None:
+            return None
+
+        block, offsets = cover
+        terms = [(k, o) for (k, _), o in zip(values, offsets)]
+
+        return block.base, terms, sign
+
+    return plan
+
+
+def is_comparison(relation):
+    parts = [p.strip() for p in relation.parts]
+    return len(parts) == 3 and parts[1] in COMPARISONS
+
+
+def comparison_mask(relation, rule, solver, domain_ids):
+    '''
+
+    Return a function evaluating a comparison on a chunk of assignments
+    (given as the index arrays of numpy.unravel_index()), as a boolean
+    array, or return None if some function in it is undefined on some
+    assignment, or some side may not evaluate to a constant in a sort (so
+    that the comparison is ground into an atom, see HornSolver.compare()).
+
+    '''
+
+    left, comparison, right = [p.strip() for p in relation.parts]
+    position = {v: i for i, v in enumerate(rule.variables)}
+    tables = solver.function_tables()
+    known = solver.sorted_constants()
+
+    def ids(term):
+        root = term.split(DOT)[0].strip()
+        if root not in position:
+            constant = solver.atoms.constant(solver.evaluate(term))
+            if constant not in known:
+                return None
+            return lambda index: constant
+        values = term_values(term, position, domain_ids, tables)
+        if values is None:
+            return None
+        k, values = values
+        if any(v not in known for v in values):
+            return None
+        values = np.asarray(values)
+        return lambda index: values[index[k]]
+
+    left, right = ids(left), ids(right)
+
+    if left is None or right is None:
+        return None
+
+    def mask(index):
+        equal = np.broadcast_to(left(index) == right(index), index[0].shape)
+        return equal if comparison == EQUALS else ~equal
+
+    return mask
+
+
+def column(spec, index):
+    '''
+
+    Compute the literals of a relation for a chunk of assignments, given
+    as the index arrays of numpy.unravel_index().
+
+    '''
+
+    base, terms, sign = spec
+    literals = np.full(index[0].shape, base, dtype=np.int64)
+
+    for v, offsets in terms:
+        literals += np.asarray(offsets, dtype=np.int64)[index[v]]
+
+    return sign * literals
+
+
+def clause_matrices(rule, solver, chunk_size=CHUNK_SIZE):
+    '''
+
+    Ground a rule by computing its clauses with NumPy, and return an
+    iterator over int32 matrices with one row per assignment and one
+    column per literal (one matrix per rule head, or a single matrix for
+    constraints and disjunctions, for every chunk of at most chunk_size
+    assignments, in the order given by itertools.product()). Applications
+    of constant functions are looked up in the tables of
+    HornSolver.function_tables().
+
+    Return None if NumPy is not available or some relation in the rule
+    has no block of variables covering its domains (see atoms.Block), in
+    which case the rule must be grounded by the scalar path.
+
+    '''
+
+    if np is None:
+        return None
+
+    if any(models.is_any(v) for v in rule.variables):
+        return None
+
+    domains = [solver.sorts[s] for s in rule.sorts]
+    domain_ids = [[solver.atoms.constant(c) for c in d] for d in domains]
+    plan = relation_columns(rule, solver, domain_ids)
+
+    if any(is_comparison(r) for r in rule.heads):
+        return None
+
+    masks = [
+        comparison_mask(r, rule, solver, domain_ids)
+        for r in rule.body if is_comparison(r)
+    ]
+
+    heads = [plan(r) for r in rule.heads]
+    body = [plan(r) for r in rule.body if not is_comparison(r)]
+
+    if None in heads or None in body or None in masks:
+        return None
+
+    unique_body = []
+    for spec in body:
+        if spec not in unique_body:
+            unique_body.append(spec)
+
+    shape = tuple(len(d) for d in domains)
+
+    return chunk_matrices(rule, shape, heads, unique_body, masks, chunk_size)
+
+
+def repeatable(body):
+    '''
+
+    Return the pairs (i, j), i < j, of body relations (given by their
+    specs, see relation_columns()) which may have the same literal on
+    some assignment: those with the same sign, from the same block or
+    without variables.
+
+    '''
+
+    return [
+        (i, j)
+        for j, (base_j, terms_j, sign_j) in enumerate(body)
+        for i, (base_i, terms_i, sign_i) in enumerate(body[:j])
+        if sign_i == sign_j and (base_i == base_j or not terms_i or not terms_j)
+    ]
+
+
+def chunk_matrices(rule, shape, heads, body, masks, chunk_size):
+    '''
+
+    Yield the clause matrices of clause_matrices(), one chunk of at most
+    chunk_size assignments at a time.
+
+    Body literals repeated in a row are kept once, as in
+    HornSolver.literal_clauses(), so rows with repeated literals are
+    yielded in narrower matrices (see unique_columns()).
+
+    '''
+
+    repeats = repeatable(body)
+    # Body columns follow the head column in the clauses of implications
+    first = 1 if rule.heads and models.IS_DISJUNCTION not in rule.flags else 0
+    repeats = [(i + first, j + first) for i, j in repeats]
+
+    total = int(np.prod(shape, dtype=np.int64))
+
+    for start in range(0, total, chunk_size):
+
+        stop = min(start + chunk_size, total)
+        if shape:
+            index = np.unravel_index(np.arange(start, stop), shape)
+        else:
+            index = (np.zeros(stop - start, dtype=np.int64),)
+
+        body_columns = [column(spec, index) for spec in body]
+
+        if models.IS_DISJUNCTION in rule.flags:
+            matrices = [body_columns]
+
+        else:
+            negated_body = [-c for c in body_columns]
+            if rule.heads:
+                matrices = [[column(h, index)] + negated_body for h in heads]
+            else:
+                matrices = [negated_body]
+
+        matrices = [np.stack(columns, axis=1) for columns in matrices if columns]
+
+        if masks:
+            # Comparisons are evaluated statically (see
+            # HornSolver.ground_clauses()), keeping only the rows where the
+            # clause is not trivially satisfied.
+            values = [mask(index) for mask in masks]
+            if models.IS_DISJUNCTION in rule.flags:
+                keep = ~np.logical_or.reduce(values)
+            else:
+                keep = np.logical_and.reduce(values)
+            matrices = [m[keep] for m in matrices]
+
+        if rule.may_clash():
+            matrices = [m[~tautologies(m)] for m in matrices]
+
+        if repeats:
+            matrices = [u for m in matrices for u in unique_columns(m, repeats)]
+
+        for m in matrices:
+            if len(m):
+                yield m.astype(np.int32)
+
+
+def unique_columns(matrix, repeats):
+    '''
+
+    Split a clause matrix by the columns repeating an earlier column of
+    the same row, among the pairs of columns in 'repeats', and return
+    a matrix for each pattern of repeated columns, leaving them out.
+
+    '''
+
+    repeated = np.zeros(matrix.shape, dtype=bool)
+
+    for i, j in repeats:
+        repeated[:, j] |= matrix[:, i] == matrix[:, j]
+
+    if not repeated.any():
+        return [matrix]
+
+    patterns, inverse = np.unique(repeated, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    return [matrix[inverse == k][:, ~p] for k, p in enumerate(patterns)]
+
+
+def tautologies(matrix):
+    '''
+
+    Return a boolean array marking the rows of a clause matrix holding
+    some literal and its negation.
+
+    '''
+
+    clashes = np.zeros(len(matrix), dtype=bool)
+    width = matrix.shape[1]
+
+    for i in range(width):
+        for j in range(i + 1, width):
+            clashes |= matrix[:, i] == -matrix[:, j]
+
+    return clashes